@@ -78,9 +78,20 @@ class Breakout(GameApp):
         lastclick   [GPoint, None if no click occurred in the last frame]:
                     last position clicked
         time        [int >=0]:
-                    time of the countdown to the beginning of the game
-        _scoremssg  [GLabel, or None if there is no message to display]
+                    number of physics ticks spent counting down to the
+                    beginning of the game
+        _accum      [float >= 0]:
+                    seconds of real time not yet simulated; always less than
+                    one physics tick after update
+        _alpha      [float in 0..1]:
+                    how far the display is between the last two physics
+                    ticks, used to interpolate the drawing
+        _scoremssg  [GLabel or GBitmapText, or None if there is no message
+                    to display]
                     the currently active message
+        _labels     [dict of str to GLabel or GBitmapText]:
+                    the labels made so far, by the name of the message they
+                    show; they are reused whenever that message is shown
     """
     
     
@@ -102,15 +113,12 @@ class Breakout(GameApp):
         message 
         (in attribute _mssg) saying that the user should press to play a
         game."""
-        
-        self._state=STATE_INACTIVE
-        self._game=None
-        self._scoremssg=None
-        self._mssg=GLabel(text='Press any key to play')
-        self._mssg.font_size=20
-        self._mssg.x=GAME_WIDTH/2
-        self._mssg.y=GAME_HEIGHT/2
-        self.time=0
+        # The score changes often, so it is drawn from a bitmap font
+        score=GBitmapText(text='Score: 0',chars='Score: 0123456789',
+                          font_name='Arial.ttf',font_size=11.5,
+                          x=GAME_WIDTH-30,y=GAME_HEIGHT-12)
+        self._labels={'score':score}
+        self._stopGame()
     
     def update(self,dt):
         """Animates a single frame in the game.
@@ -191,51 +199,39 @@ game.  That is the purpose of the class Play.  The primary purpose of
         should 
         describe them here.
         
+        The game is simulated with a fixed time step, independent of the
+        frame rate.  The time dt is added to an accumulator, and the game
+        runs one physics tick (1/PHYSICS_RATE seconds) for every full tick in
+        the accumulator, at most MAX_CATCHUP_TICKS per frame.  Any backlog
+        beyond that is dropped, so a long stall slows the game down instead
+        of making it jump.  The time left over is used to interpolate the
+        drawing between the last two ticks.
+        
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
         
         assert isinstance(dt,int) or isinstance(dt,float)
         assert dt>0
+        ticks=self._advanceClock(dt)
         self._determineState()
         if self._state==STATE_INACTIVE:
-            self.start()
+            self._endGame()
+            self._stopGame()
         if self._state==STATE_NEWGAME:
             self._animateNewGame()
         if self._state==STATE_COUNTDOWN:
-            if self.time==0:
-                self._mssg=GLabel(text='3')
-                self._mssg.x=GAME_WIDTH/2
-                self._mssg.y=GAME_HEIGHT/2
-                self._mssg.font_size=30
-            elif self.time==60:
-                self._mssg=GLabel(text='2')
-                self._mssg.x=GAME_WIDTH/2
-                self._mssg.y=GAME_HEIGHT/2
-                self._mssg.font_size=30
-            elif self.time==120:
-                self._mssg=GLabel(text='1')
-                self._mssg.x=GAME_WIDTH/2
-                self._mssg.y=GAME_HEIGHT/2
-                self._mssg.font_size=30
-            elif self.time==180:
-                self._game.serveBall()
-                self._mssg=None
-                self._state=STATE_ACTIVE
-            if self.time<180:
-                self.time=self.time+1
-            self._animateCountdown()
+            ticks=self._animateCountdown(ticks)
         if self._state==STATE_ACTIVE:
-            self._animateActive()
+            self._animateActive(ticks)
         if self._state==STATE_PAUSED:
             self._animatePause()
         if self._state==STATE_COMPLETE and self._game!=None:
             self._animateComplete()
-            self._scoremssg=GLabel(text='Score: '+str(self._game.getScore()))
-            self._scoremssg.x=GAME_WIDTH/2
-            self._scoremssg.y=GAME_HEIGHT/2+50
-            self._scoremssg.font_size=25
-            self._game=None
+            self._scoremssg=self._message('final',
+                                          'Score: '+str(self._game.getScore()),
+                                          GAME_WIDTH/2,GAME_HEIGHT/2+50,25)
+            self._endGame()
             
     
     def draw(self):
@@ -256,9 +252,78 @@ game.  That is the purpose of the class Play.  The primary purpose of
         if self._scoremssg!=None:
             self._scoremssg.draw(self.view)
         if self._game!=None:
-            self._game.draw(self.view)
+            self._game.draw(self.view,self._alpha)
     
     # HELPER METHODS FOR THE STATES GO HERE
+    def _stopGame(self):
+        """Puts the application in STATE_INACTIVE, with a message saying
+        that the user should press a key to play a game."""
+        self._state=STATE_INACTIVE
+        self._game=None
+        self._scoremssg=None
+        self._mssg=self._message('title','Press any key to play',
+                                 GAME_WIDTH/2,GAME_HEIGHT/2,20)
+        self.time=0
+        self._accum=0.0
+        self._alpha=1.0
+    
+    def _message(self,name,text,x,y,size):
+        """Returns: the label for the message name, showing text.
+        
+        There is one label for each message, made centered at (x,y) in the
+        given font size the first time it is needed and kept in _labels.
+        After that, only its text changes, which is free when the text is
+        the same as before (such as the score on most frames).
+        
+        Parameter name: The name of the message
+        Precondition: name is a string
+        
+        Parameter text: The message
+        Precondition: text is a string
+        
+        Parameter x, y: The center of the label
+        Precondition: x and y are numbers (int or float)
+        
+        Parameter size: The font size
+        Precondition: size is a number (int or float) > 0"""
+        if name in self._labels:
+            self._labels[name].text=text
+        else:
+            label=GLabel(text=text,font_size=size)
+            label.x=x
+            label.y=y
+            self._labels[name]=label
+        return self._labels[name]
+    
+    def _endGame(self):
+        """Takes the game (if there is one) off the screen and drops it.
+        
+        Play keeps its paddle, balls and bricks attached to the view
+        between frames, so they stay on the screen until taken off."""
+        if self._game!=None:
+            self._game.detach(self.view)
+            self._game=None
+    
+    def _advanceClock(self,dt):
+        """Returns: the number of physics ticks to run this frame.
+
+        This method adds dt to the time accumulator and takes out the
+        whole ticks, capped at MAX_CATCHUP_TICKS.  It also sets _alpha to
+        the fraction of a tick left over.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float) > 0"""
+        step=1.0/PHYSICS_RATE
+        self._accum=self._accum+dt
+        ticks=0
+        while self._accum>=step and ticks<MAX_CATCHUP_TICKS:
+            self._accum=self._accum-step
+            ticks=ticks+1
+        if ticks==MAX_CATCHUP_TICKS:
+            self._accum=min(self._accum,step)
+        self._alpha=min(self._accum/step,1.0)
+        return ticks
+    
     def _determineState(self):
         """Determines the current state of the game and assigns
         it to self._state."""
@@ -267,24 +332,24 @@ game.  That is the purpose of the class Play.  The primary purpose of
         if change and self._state==STATE_INACTIVE:
             self._state=STATE_NEWGAME
             self._mssg=None
-        elif self._game!=None and self._game._ball==None:
+        elif self._game!=None and self._game.waitingForServe():
             self._state=STATE_COUNTDOWN
-        elif self._state==STATE_ACTIVE and self._game._ball.top<=0:
-            if self._game._tries!=0:
-                self._game._tries=self._game._tries-1
-                if self._game._tries!=0:
+        elif self._state==STATE_ACTIVE and self._game.ballLost():
+            if self._game.getTries()!=0:
+                self._game.loseTry()
+                if self._game.getTries()!=0:
                     self._state=STATE_PAUSED
                 else:
                     self._state=STATE_COMPLETE
-            if self._game._tries==0:
+            if self._game.getTries()==0:
                 self._state=STATE_COMPLETE
         elif self._state==STATE_ACTIVE:
-            if self._game._tries==0 or len(self._game.getBricks())==0:
+            if self._game.getTries()==0 or not self._game.hasBricks():
                 self._state=STATE_COMPLETE
-        elif (self._state==STATE_ACTIVE and self._game._tries!=0 and
-                           len(self._game.getBricks())==0):
+        elif (self._state==STATE_ACTIVE and self._game.getTries()!=0 and
+                           not self._game.hasBricks()):
             self._state=STATE_COMPLETE    
-        elif change and self._state==STATE_PAUSED and self._game._tries>0:
+        elif change and self._state==STATE_PAUSED and self._game.getTries()>0:
             self._state=STATE_COUNTDOWN
         if self._state==STATE_ACTIVE and self.input.is_key_down('1'):   
             self._state=STATE_INACTIVE
@@ -300,42 +365,73 @@ game.  That is the purpose of the class Play.  The primary purpose of
         self._game=Play(tries=NUMBER_TURNS)
         self._game.updatePaddle(self.input)
         
-    def _animateCountdown(self):
-        """The three-second timer is initialized
-        in the above method update(dt), so this method
-        simply allows for the user to move the paddle
-        in STATE_COUNTDOWN."""
-        self._game.updatePaddle(self.input)
+    def _animateCountdown(self,ticks):
+        """Runs the three-second timer, and allows for the
+        user to move the paddle in STATE_COUNTDOWN.
+        
+        Each physics tick counts down one tick of the timer.  Once
+        the timer runs out, the ball is served and the state
+        switches to STATE_ACTIVE; the ticks of this frame that are
+        left over belong to the active game, so the paddle is not
+        moved twice in the same tick.
+        
+        Returns: the number of ticks left over for STATE_ACTIVE (0
+        if the countdown is still going)
+        
+        Parameter ticks: The number of physics ticks to run
+        Precondition: ticks is an int >= 0"""
+        end=COUNTDOWN_SECONDS*PHYSICS_RATE
+        while ticks>0 and self.time<end:
+            self._game.beginTick()
+            self._game.updatePaddle(self.input)
+            self.time=self.time+1
+            ticks=ticks-1
+        if self.time>=end:
+            self._game.serveBall()
+            self._mssg=None
+            self._state=STATE_ACTIVE
+            return ticks
+        count=str(COUNTDOWN_SECONDS-self.time/PHYSICS_RATE)
+        self._mssg=self._message('countdown',count,GAME_WIDTH/2,
+                                 GAME_HEIGHT/2,30)
+        return 0
     
-    def _animateActive(self):
+    def _animateActive(self,ticks):
         """This method is called right when the ball is
         served, meaning right when the state is STATE_ACTIVE,
         and it allows for the ball to move on its own. It also
         allows for the ball to, if any color disappears, change
-        to a different color."""
-        self._mssg=GLabel(text='Press 1 to restart game')
-        self._mssg.x=GAME_WIDTH/7
-        self._mssg.y=GAME_HEIGHT-12
-        self._mssg.font_size=11.5
-        self._scoremssg=GLabel(text='Score: '+str(self._game.getScore()))
-        self._scoremssg.x=GAME_WIDTH-30
-        self._scoremssg.y=GAME_HEIGHT-12
-        self._scoremssg.font_size=11.5
+        to a different color.
+        
+        Parameter ticks: The number of physics ticks to run
+        Precondition: ticks is an int >= 0"""
+        self._mssg=self._message('hint','Press 1 to restart game',
+                                 GAME_WIDTH/7,GAME_HEIGHT-12,11.5)
+        self._scoremssg=self._message('score',
+                                      'Score: '+str(self._game.getScore()),
+                                      GAME_WIDTH-30,GAME_HEIGHT-12,11.5)
             
-        self._game.updatePaddle(self.input)
-        self._game.updateBall()
-        self._game.change_color()
+        for tick in range(ticks):
+            self._game.beginTick()
+            self._game.updatePaddle(self.input)
+            self._game.updateBall()
+            self._game.change_color()
+            if self._game.ballLost():
+                break
         
     def _animatePause(self):
         """Presents a message in the middle of the window
         when the player loses a ball but still has tries
         remaining. The next time the player presses a key,
-        the state returns to STATE_ACTIVE."""
-        self._mssg=(GLabel(text=str(self._game._tries)+' tries left! Press any '
-                           +'key to get a new ball'))
-        self._mssg.x=GAME_WIDTH/2
-        self._mssg.y=GAME_HEIGHT/2
-        self._mssg.font_size=20
+        the state returns to STATE_ACTIVE.
+        
+        No physics ticks run while paused, so the game is drawn
+        where it stopped, without interpolating."""
+        self._game.endTicks()
+        self._alpha=1.0
+        self._mssg=self._message('pause',str(self._game.getTries())
+                                 +' tries left! Press any key to get a new ball',
+                                 GAME_WIDTH/2,GAME_HEIGHT/2,20)
         
     
     def _animateComplete(self):
@@ -345,17 +441,13 @@ game.  That is the purpose of the class Play.  The primary purpose of
         there are still bricks left. The player wins when there
         is at least one try left but no more bricks left."""
         self._score=BRICKS_IN_ROW*BRICK_ROWS
-        if self._game._tries==0 and len(self._game.getBricks())>0:
-            self._mssg=GLabel(text='You lost!')
-            self._mssg.x=GAME_WIDTH/2
-            self._mssg.y=GAME_HEIGHT/2
-            self._mssg.font_size=50
-        elif self._game._tries!=0 and len(self._game.getBricks())==0:
+        if self._game.getTries()==0 and self._game.hasBricks():
+            self._mssg=self._message('lost','You lost!',GAME_WIDTH/2,
+                                     GAME_HEIGHT/2,50)
+        elif self._game.getTries()!=0 and not self._game.hasBricks():
             self._state=STATE_COMPLETE
-            self._mssg=GLabel(text='You won!')
-            self._mssg.x=GAME_WIDTH/2
-            self._mssg.y=GAME_HEIGHT/2
-            self._mssg.font_size=80
+            self._mssg=self._message('won','You won!',GAME_WIDTH/2,
+                                     GAME_HEIGHT/2,80)
     
     
         
@@ -27,6 +27,19 @@ PADDLE_WIDTH  = 70
 PADDLE_HEIGHT = 11
 #: the distance of the (bottom of the) paddle from the bottom
 PADDLE_OFFSET = 30
+#: the distance the paddle moves in one physics tick while an arrow is held
+PADDLE_SPEED  = 10
+#: the number of zones across the paddle, each with its own bounce angle
+PADDLE_ZONES  = 16
+#: the bounce angle (in degrees from straight up) off the ends of the paddle,
+#: for the slowest balls
+PADDLE_MAX_ANGLE  = 60
+#: the bounce angle off the ends of the paddle for the fastest balls
+PADDLE_FAST_ANGLE = 40
+#: the number of ball speed buckets, from slowest to fastest, in the bounce table
+PADDLE_SPEED_BUCKETS = 8
+#: the range of ball speeds (in pixels per tick) covered by each speed bucket
+PADDLE_BUCKET_SPEED  = 5.0
 
 
 ######### BRICK CONSTANTS #########
@@ -51,6 +64,31 @@ BRICK_WIDTH    = GAME_WIDTH / BRICKS_IN_ROW - BRICK_SEP_H
 
 #: the diameter of the ball in pixels
 BALL_DIAMETER = 25
+#: the most paddle and brick collisions resolved for a ball in one tick
+BALL_MAX_CONTACTS = 4
+#: the number of balls put in play by each serve (more than 1 is multi-ball)
+BALLS_PER_SERVE = 1
+#: the farthest a ball moves in one sub-step while it is near the paddle, a
+#: brick or a wall
+BALL_MAX_STEP = BALL_DIAMETER/2
+#: the most sub-steps a ball's motion is split into in one physics tick
+BALL_MAX_SUBSTEPS = 8
+#: the number of steps per pixel of the ball coordinates in fixed-point mode
+#: (a power of 2, so that every coordinate on the grid is exact in a float)
+FIXED_POINT_SCALE = 256
+
+
+######### TIMING CONSTANTS #########
+
+#: the number of physics ticks per second (velocities are in pixels per tick)
+PHYSICS_RATE = 60
+#: the most physics ticks run in one frame to catch up after a slow frame
+MAX_CATCHUP_TICKS = 5
+#: the fewest frames per second the window is lowered to when the game is slow
+#: (at least PHYSICS_RATE/MAX_CATCHUP_TICKS, so the game never falls behind)
+MIN_FPS = 30
+#: the number of seconds in the countdown before a serve
+COUNTDOWN_SECONDS = 3
 
 
 ######### GAME CONSTANTS #########
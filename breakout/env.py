@@ -0,0 +1,182 @@
+"""Environment module for Breakout
+
+This module lets a program play Breakout one step at a time, in the style of
+an OpenAI Gym environment, for training and testing paddle agents:
+
+    env = BreakoutEnv(frameskip=4)
+    obs = env.reset(seed=1)
+    done = False
+    while not done:
+        obs, reward, done, info = env.step(agent(obs))
+
+The game is a Simulation, so no window (or Kivy) is needed.  The observation
+is written into the same NumPy array on every step instead of a new one; an
+agent that wants to keep an observation must copy it.  An agent that learns
+from pixels can get them from render, which draws the game in software.
+
+Like the models, this module only accesses constants.py (and the simulation
+and the rasterizer)."""
+import numpy as np
+from constants import *
+from simulation import Simulation
+from raster import Framebuffer
+
+
+class BreakoutEnv(object):
+    """An instance is a game of Breakout that is played one step at a time.
+
+    A step takes an action for the paddle (0 to stay still, 1 to move left,
+    2 to move right) and repeats it for frameskip physics ticks.  The reward
+    is the increase in Play.getScore over those ticks (10 for each brick
+    destroyed).  Balls are served at the start of the game and as soon as
+    the last one is lost, and the episode is done when the game is won or
+    lost (or after limit ticks, if there is a limit).
+
+    The observation is a float32 array with the following entries:
+
+        0             the x of the paddle
+        1 + 4*k ...   the x, y, vx and vy of ball k, for k in
+                      0..BALLS_PER_SERVE-1 (all 0 if there is no such ball)
+        after those   1 for each brick still in play and 0 for each brick
+                      destroyed, in the brick order of BrickField
+
+    INSTANCE ATTRIBUTES:
+        _sim       [Simulation]: the game
+        _frameskip [int > 0]: the number of ticks each step lasts
+        _limit     [int > 0 or None]: the most ticks in an episode, or None for
+                   no limit
+        _obs       [float32 array]: the observation, rewritten on every step
+        _balls     [float32 array of shape (BALLS_PER_SERVE,4)]: the part of
+                   _obs with the balls (a view of it)
+        _bricks    [float32 array]: the part of _obs with the bricks (a view
+                   of it)
+        _info      [dict]: the extra information returned by step, updated in
+                   place
+        _frame     [Framebuffer or None]: the pixels drawn by render, or None
+                   until render is first called
+    """
+
+    #: the action that keeps the paddle still
+    NOOP  = 0
+    #: the action that moves the paddle left
+    LEFT  = 1
+    #: the action that moves the paddle right
+    RIGHT = 2
+
+    # GETTERS
+    def getSimulation(self):
+        """Returns: the Simulation being played"""
+        return self._sim
+
+    def getObservation(self):
+        """Returns: the observation array.
+
+        This is the array rewritten by every step, not a copy."""
+        return self._obs
+
+    def getActionCount(self):
+        """Returns: the number of actions (actions are 0 up to this - 1)"""
+        return 3
+
+    # INITIALIZER
+    def __init__(self,frameskip=1,limit=None,tries=NUMBER_TURNS):
+        """Initializes a new environment.  Call reset to start a game.
+
+        Parameter frameskip: The number of ticks each step lasts
+        Precondition: frameskip is an int > 0
+
+        Parameter limit: The most ticks in an episode, or None for no limit
+        Precondition: limit is None or an int > 0
+
+        Parameter tries: The number of tries in a game
+        Precondition: tries is an int > 0"""
+        assert isinstance(frameskip,int) and frameskip>0
+        assert limit is None or (isinstance(limit,int) and limit>0)
+        self._sim=Simulation(tries)
+        self._frameskip=frameskip
+        self._limit=limit
+        nbricks=BRICKS_IN_ROW*BRICK_ROWS
+        self._obs=np.zeros(1+4*BALLS_PER_SERVE+nbricks,dtype=np.float32)
+        self._balls=self._obs[1:1+4*BALLS_PER_SERVE].reshape(BALLS_PER_SERVE,4)
+        self._bricks=self._obs[1+4*BALLS_PER_SERVE:]
+        self._info={'score':0,'tries':tries,'frames':0}
+        self._frame=None
+
+    # EPISODE METHODS
+    def reset(self,seed=None):
+        """Returns: the first observation of a new game.
+
+        The game starts with the paddle in the middle, every brick in play,
+        and a ball already served.
+
+        Parameter seed: The seed of the game, or None for an unpredictable
+        game
+        Precondition: seed is a hashable value, such as an int, or None"""
+        self._sim.reset(seed)
+        self._sim.serveBall()
+        self._observe()
+        return self._obs
+
+    def step(self,action):
+        """Returns: (observation,reward,done,info) after playing an action.
+
+        The action is repeated for frameskip ticks, or until the episode is
+        done.  The observation is the array returned by every step (see
+        getObservation), and info is a dict with the 'score', 'tries' and
+        'frames' (ticks) of the game so far; it too is the same dict on
+        every step.
+
+        Parameter action: The action to play
+        Precondition: action is an int in 0..2"""
+        assert action in (0,1,2), 'action %s is not 0, 1 or 2' % repr(action)
+        sim=self._sim
+        move=(0,-1,1)[action]
+        score=sim.getScore()
+        done=self._isDone()
+        for frame in range(self._frameskip):
+            if done:
+                break
+            sim.step(move)
+            if sim.ballLost():
+                sim.loseTry()
+                if not sim.isOver():
+                    sim.serveBall()
+            done=self._isDone()
+        self._observe()
+        return self._obs,sim.getScore()-score,done,self._info
+
+    def render(self):
+        """Returns: the pixels of the game as it is now, as a uint8 array of
+        shape (GAME_HEIGHT,GAME_WIDTH,3).
+
+        The game is drawn as Play would draw it, by the software rasterizer
+        in raster.py, so no window is needed.  Row 0 is the top of the
+        window.  The array is the same on every call, and is redrawn by
+        each call; an agent that wants to keep a frame must copy it."""
+        if self._frame is None:
+            self._frame=Framebuffer()
+        self._frame.drawSimulation(self._sim)
+        return self._frame.getPixels()
+
+    # HELPER METHODS
+    def _isDone(self):
+        """Returns: True if the episode is done: the game is over, or it has
+        reached the limit of ticks"""
+        sim=self._sim
+        return (sim.isOver() or
+                (self._limit is not None and sim.getFrames()>=self._limit))
+
+    def _observe(self):
+        """Writes the state of the game into the observation and info."""
+        sim=self._sim
+        self._obs[0]=sim.getPaddle().x
+        pos=sim.getBalls().getPositions()
+        vel=sim.getBalls().getVelocities()
+        n=len(pos)
+        self._balls[:n,:2]=pos
+        self._balls[:n,2:]=vel
+        self._balls[n:]=0
+        self._bricks[:]=sim.getBricks().getAlive()
+        self._info['score']=sim.getScore()
+        self._info['tries']=sim.getTries()
+        self._info['frames']=sim.getFrames()
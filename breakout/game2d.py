@@ -15,17 +15,18 @@ import kivy.app
 from kivy.graphics import *
 from kivy.graphics.instructions import *
 from kivy.core.audio import SoundLoader
+from kivy.core.text import Label as CoreLabel, DEFAULT_FONT
 from kivy.config import Config
 from kivy.clock  import Clock
 from kivy.metrics import dp
 
 # Widgets necessary for some technical workarounds
 from kivy.uix.floatlayout import FloatLayout
-from kivy.uix.label import Label
 from kivy.uix.image import Image
 
 # Additional miscellaneous modules
-import os, sys, os.path
+import os, sys, os.path, time
+import collections
 import numpy as np
 import colormodel
 
@@ -574,7 +575,7 @@ class GObject(object):
         assert value > 0, 'value %s is not positive' % `value`
         self._width = float(value)
         if self._defined:
-            self._reset()
+            self._resize()
     
     @property
     def height(self):
@@ -591,7 +592,7 @@ class GObject(object):
         assert value > 0, 'value %s is not positive' % `value`
         self._height = float(value)
         if self._defined:
-            self._reset()
+            self._resize()
     
     @property
     def scale(self):
@@ -668,9 +669,7 @@ class GObject(object):
             else:
                 value = colormodel.RGB.CreateName(c).glColor()
         
-        self._fillcolor = Color(value[0],value[1],value[2],value[3])
-        if self._defined:
-            self._reset()
+        self._fillcolor.rgba = value
     
     @property
     def linecolor(self):
@@ -699,9 +698,7 @@ class GObject(object):
             else:
                 value = colormodel.RGB.CreateName(c).glColor()
         
-        self._linecolor = Color(value[0],value[1],value[2],value[3])
-        if self._defined:
-            self._reset()
+        self._linecolor.rgba = value
     
     @property
     def name(self):
@@ -903,11 +900,18 @@ class GObject(object):
         # Set the properties.
         self._defined = False
         
+        # The node that holds the drawing cache in a view the object is attached to
+        self._node = InstructionGroup()
+        
         # Create the Kivy transforms for position and size
         self._trans  = Translate(0,0,0)
         self._rotate = Rotate(angle=0,axis=(0,0,1))
         self._scale  = Scale(1,1,1)
         
+        # The colors are changed in place, so drawing caches can share them
+        self._fillcolor = Color(1,1,1,1)
+        self._linecolor = Color(0,0,0,1)
+        
         # Now update these with the keywords; size first
         if 'width'  in keywords:
             self.width  = keywords['width'] 
@@ -1005,17 +1009,30 @@ class GObject(object):
             :param view: view to draw to
             **Precondition**: an *instance of* `GView`
         
-        Ideally, the view should be the one provided by `GameApp`."""
+        Ideally, the view should be the one provided by `GameApp`.
+        
+        The shape is only drawn for the current animation frame.  A shape that is
+        on the screen frame after frame is cheaper to attach to the view instead (see
+        the method `attach` in `GView`).  Do not draw a shape that is attached."""
         view.draw(self._cache)
     
     # HIDDEN METHODS
     def _reset(self):
         """Resets the drawing cache"""
         self._cache = InstructionGroup()
+        self._node.clear()
+        self._node.add(self._cache)
         self._cache.add(PushMatrix())
         self._cache.add(self._trans)
         self._cache.add(self._rotate)
         self._cache.add(self._scale)
+    
+    def _resize(self):
+        """Updates the drawing cache after a change to the width or height.
+        
+        By default this resets the drawing cache.  Subclasses whose drawing cache
+        can be resized in place should override this method."""
+        self._reset()
 
 
 class GRectangle(GObject):
@@ -1046,7 +1063,11 @@ class GRectangle(GObject):
         assert _is_num(value), 'value %s is not a number' % `value`
         assert value >= 0, 'value %s is negative' % `value`
         self._linewidth = value
-        if self._defined:
+        if not self._defined:
+            pass
+        elif self._line is not None and value > 0:
+            self._line.width = value
+        else:
             self._reset()
     
     
@@ -1080,17 +1101,27 @@ class GRectangle(GObject):
         x = -self.width/2.0
         y = -self.height/2.0
         
-        fill = Rectangle(pos=(x,y), size=(self.width, self.height))
+        self._fill = Rectangle(pos=(x,y), size=(self.width, self.height))
         self._cache.add(self._fillcolor)
-        self._cache.add(fill)
+        self._cache.add(self._fill)
         
+        self._line = None
         if self.linewidth > 0:
-            line = Line(rectangle=(x,y,self.width,self.height),joint='miter',
-                        close=True,width=self.linewidth)
+            self._line = Line(rectangle=(x,y,self.width,self.height),joint='miter',
+                              close=True,width=self.linewidth)
             self._cache.add(self._linecolor)
-            self._cache.add(line)
+            self._cache.add(self._line)
         
         self._cache.add(PopMatrix())
+    
+    def _resize(self):
+        """Resizes the fill and border of the drawing cache in place"""
+        x = -self.width/2.0
+        y = -self.height/2.0
+        self._fill.pos  = (x,y)
+        self._fill.size = (self.width,self.height)
+        if self._line is not None:
+            self._line.rectangle = (x,y,self.width,self.height)
 
 
 class GEllipse(GRectangle):
@@ -1157,16 +1188,26 @@ class GEllipse(GRectangle):
         x = -self.width/2.0
         y = -self.height/2.0
         
-        fill = Ellipse(pos=(x,y), size=(self.width,self.height))
+        self._fill = Ellipse(pos=(x,y), size=(self.width,self.height))
         self._cache.add(self._fillcolor)
-        self._cache.add(fill)
+        self._cache.add(self._fill)
         
+        self._line = None
         if self._linewidth > 0:
-            line = Line(ellipse=(x,y,self.width,self.height),close=True,width=self.linewidth)
+            self._line = Line(ellipse=(x,y,self.width,self.height),close=True,width=self.linewidth)
             self._cache.add(self._linecolor)
-            self._cache.add(line)
+            self._cache.add(self._line)
         
         self._cache.add(PopMatrix())
+    
+    def _resize(self):
+        """Resizes the fill and border of the drawing cache in place"""
+        x = -self.width/2.0
+        y = -self.height/2.0
+        self._fill.pos  = (x,y)
+        self._fill.size = (self.width,self.height)
+        if self._line is not None:
+            self._line.ellipse = (x,y,self.width,self.height)
 
 
 class GImage(GRectangle):
@@ -1235,18 +1276,84 @@ class GImage(GRectangle):
         x = -self.width/2.0
         y = -self.height/2.0
         
-        fill = Rectangle(pos=(x,y), size=(self.width, self.height),source=self.source)
+        self._fill = Rectangle(pos=(x,y), size=(self.width, self.height),source=self.source)
         self._cache.add(self._fillcolor)
-        self._cache.add(fill)
+        self._cache.add(self._fill)
         
+        self._line = None
         if self.linewidth > 0:
-            line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
+            self._line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
             self._cache.add(self._linecolor)
-            self._cache.add(line)
+            self._cache.add(self._line)
         
         self._cache.add(PopMatrix())
 
 
+class _TextCache(object):
+    """Hidden class for the textures of rendered text, shared by every `GLabel`.
+
+    Rendering a string to a texture is the expensive part of a label, and a game
+    shows the same few strings (messages, scores) over and over.  The textures are
+    keyed by the text and its font, and the least recently used one is dropped
+    once there are more than `capacity` of them.  A label keeps its own texture,
+    so dropping one from the cache never takes it off the screen.
+
+    The text is rendered in white; a label tints it with its `linecolor`."""
+
+    def __init__(self,capacity=128):
+        """**Constructor**: Creates a new, empty cache.
+
+            :param capacity: the most textures to keep
+            **Precondition**: an int > 0
+        """
+        self.capacity = capacity
+        self._data = collections.OrderedDict()
+
+    def __len__(self):
+        """**Returns**: The number of textures in this cache."""
+        return len(self._data)
+
+    def fetch(self,text,font_name,font_size,bold,halign):
+        """**Returns**: The texture of the text in the given font.
+
+            :param text: the text to render
+            **Precondition**: a string
+
+            :param font_name: the font file
+            **Precondition**: a font name, as in `GLabel`
+
+            :param font_size: the size of the font in points
+            **Precondition**: an int or float > 0
+
+            :param bold: whether the text is bold
+            **Precondition**: a bool
+
+            :param halign: the alignment of the lines in multiline text
+            **Precondition**: one of 'left', 'right', or 'center'
+
+        The text is only rendered if it is not in the cache already."""
+        key = (text,font_name,font_size,bold,halign)
+        if key in self._data:
+            texture = self._data.pop(key)
+        else:
+            label = CoreLabel(text=text,font_name=font_name,font_size=font_size,
+                              bold=bold,halign=halign)
+            label.refresh()
+            texture = label.texture
+            while len(self._data) >= self.capacity:
+                self._data.popitem(last=False)
+        self._data[key] = texture
+        return texture
+
+    def clear(self):
+        """Drops every texture from this cache."""
+        self._data.clear()
+
+
+# The cache used by all labels
+_TEXT_CACHE = _TextCache()
+
+
 class GLabel(GRectangle):
     """Instances represent an (uneditable) text label
     
@@ -1281,22 +1388,23 @@ class GLabel(GRectangle):
     @font_size.setter
     def font_size(self,value):
         assert _is_num(value), 'value %s is not a number' % `value`
-        self._fsize = value
-        self._label.font_size = value
-        self._label.texture_update()
+        if value != self._fsize:
+            self._fsize = value
+            self._render()
     
     @property
     def font_name(self):
         """File name for the .ttf file to use as a font
         
         **Invariant**: Must be a string referring to a .ttf file in folder Fonts"""
-        return self._label.font_name
+        return self._fname
     
     @font_name.setter
     def font_name(self,value):
         assert _is_font_file(value), 'value %s is not a font name' % `value`
-        self._label.font_name = value
-        self._label.texture_update()
+        if value != self._fname:
+            self._fname = value
+            self._render()
     
     @property
     def bold(self):
@@ -1307,13 +1415,14 @@ class GLabel(GRectangle):
         `ComicSans.ttf` and `ComicSansBold.ttf` for an example.
         
         **Invariant**: Must be a boolean"""
-        return self._label.bold
+        return self._bold
 
     @bold.setter
     def bold(self,value):
         assert type(value) == bool, `value`+' is not a bool'
-        self._label.bold = value
-        self._label.texture_update()
+        if value != self._bold:
+            self._bold = value
+            self._render()
 
     @property
     def text(self):
@@ -1323,14 +1432,19 @@ class GLabel(GRectangle):
         lines in the presence of the escape character '\\n'. The `width` and `height` of 
         this label will grow to ensure that the text will fit in the rectangle.
         
+        Assigning the text the label already has costs nothing, and a new text is only
+        rendered if no label has shown it recently.  So it is fine to assign the text 
+        of a label (such as a score) every frame.
+        
         **Invariant**: Must be a string"""
-        return self._label.text
+        return self._text
     
     @text.setter
     def text(self,value):
         assert type(value) == str, 'value %s is not a string' % `value`
-        self._label.text = value
-        self._label.texture_update()
+        if value != self._text:
+            self._text = value
+            self._render()
     
     @property
     def halign(self):
@@ -1347,10 +1461,9 @@ class GLabel(GRectangle):
     @halign.setter
     def halign(self,value):
         assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % `value`
-        self._halign = value
-        self._label.halign = value
-        if self._defined:
-            self._reset()
+        if value != self._halign:
+            self._halign = value
+            self._render()
     
     @property
     def valign(self):
@@ -1368,9 +1481,8 @@ class GLabel(GRectangle):
     def valign(self,value):
         assert value in ('top','middle','bottom'), 'value %s is not a valid vertical alignment' % `value`
         self._valign = value
-        self._label.valign = value
         if self._defined:
-            self._reset()
+            self._place()
     
     
     # REDEFINED PROPERTIES
@@ -1550,17 +1662,20 @@ class GLabel(GRectangle):
         self._hanchor = 'center'
         self._vanchor = 'center'
         
-        self._label = Label(**keywords)
-        self._label.size_hint = (None,None)
+        self._text  = keywords['text'] if 'text' in keywords else ''
+        self._fsize = keywords['font_size'] if 'font_size' in keywords else 15
+        self._fname = keywords['font_name'] if 'font_name' in keywords else DEFAULT_FONT
+        self._bold  = keywords['bold'] if 'bold' in keywords else False
+        self._glyph = None
+        self._halign = None
         
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
-        self.halign = keywords['halign'] if 'halign' in keywords else 'center'
         self.valign = keywords['valign'] if 'valign' in keywords else 'middle'
+        self.halign = keywords['halign'] if 'halign' in keywords else 'center'
         
         GObject.__init__(self,**keywords)
         self._reset()
         self._defined = True
-        self._label.bind(texture_size=self._callback)
     
     def __str__(self):
         """**Returns**: A string representation of this object."""
@@ -1572,63 +1687,105 @@ class GLabel(GRectangle):
                 % (s,`self.text`,`self.x`,`self.y`,`self.angle`)
     
     # HIDDEN METHODS
-    def _callback(self,instance=None,value=None):
-        """Workaround to deal with parameter requirements for callbacks"""
-        if self._defined:
+    def _render(self):
+        """Renders the text again after a change to it or its font.
+        
+        The texture comes from the shared text cache.  If the text still fits in the
+        rectangle, only the texture of the drawing cache is changed; otherwise the 
+        rectangle grows and the drawing cache is reset."""
+        self._texture = _TEXT_CACHE.fetch(self._text,self._fname,self._fsize,
+                                          self._bold,self._halign)
+        if not self._defined:
+            return
+        
+        width, height = self._texsize()
+        if width > self.width or height > self.height:
             self._reset()
+        else:
+            self._place()
     
-    def _reset(self):
-        """Resets the drawing cache"""
-        # Set up the label at the center.
-        self._label.size = self._label.texture_size
-        self._label.center = (0,0)
-        self._label.color = self.linecolor
-        
-        # Resize the outside if necessary
-        self._defined = False
-        self.width  = max(self.width, self._label.width)
-        self.height = max(self.height,self._label.height)
-        self._defined = True
-        
-        # Reset the absolute anchor
-        if self._hanchor == 'left':
-            self._trans.x = self._ha+self.width/2.0
-        elif self._hanchor == 'right':
-            self._trans.x = self._ha-self.width/2.0
-        
-        # Reset the absolute anchor
-        if self._vanchor == 'top':
-            self._trans.y = self._hv-self.height/2.0
-        elif self._vanchor == 'bottom':
-            self._trans.y = self._hv+self.height/2.0
+    def _texsize(self):
+        """**Returns**: The size of the rendered text as a (width,height) tuple"""
+        if self._texture is None:
+            return (0,0)
+        return tuple(self._texture.size)
+    
+    def _place(self):
+        """Puts the rendered text in the drawing cache at its alignment, in place."""
+        if self._glyph is None:
+            return
         
-        # Reset the label anchor.
+        width, height = self._texsize()
         if self.halign == 'left':
-            self._label.x = -self.width/2.0
+            x = -self.width/2.0
         elif self.halign == 'right':
-            self._label.right = self.width/2.0
+            x = self.width/2.0-width
+        else:
+            x = -width/2.0
         
-        # Reset the label anchor.
         if self.valign == 'top':
-            self._label.top = self.height/2.0
+            y = self.height/2.0-height
         elif self.valign == 'bottom':
-            self._label.bottom = -self.height/2.0
+            y = -self.height/2.0
+        else:
+            y = -height/2.0
+        
+        self._glyph.texture = self._texture
+        self._glyph.pos  = (x,y)
+        self._glyph.size = (width,height)
+    
+    def _reset(self):
+        """Resets the drawing cache"""
+        # Resize the outside if necessary
+        width, height = self._texsize()
+        self._defined = False
+        self.width  = max(self.width, width)
+        self.height = max(self.height,height)
+        self._defined = True
+        self._anchor()
         
         GObject._reset(self)
         x = -self.width/2.0
         y = -self.height/2.0
         
-        fill = Rectangle(pos=(x,y), size=(self.width,self.height))
+        self._fill = Rectangle(pos=(x,y), size=(self.width,self.height))
         self._cache.add(self._fillcolor)
-        self._cache.add(fill)
-        self._cache.add(self._label.canvas)
+        self._cache.add(self._fill)
         
+        # The text is rendered in white, and tinted by the line color
+        self._glyph = Rectangle()
+        self._place()
+        self._cache.add(self._linecolor)
+        self._cache.add(self._glyph)
+        
+        self._line = None
         if self._linewidth > 0:
-            line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
-            self._cache.add(line)
+            self._line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
+            self._cache.add(self._line)
         
         self._cache.add(PopMatrix())
+    
+    def _resize(self):
+        """Resizes the drawing cache in place, unless the text no longer fits"""
+        width, height = self._texsize()
+        if width > self.width or height > self.height:
+            self._reset()
+        else:
+            self._anchor()
+            GRectangle._resize(self)
+            self._place()
+    
+    def _anchor(self):
+        """Moves the label so that its anchored edges stay where they were set"""
+        if self._hanchor == 'left':
+            self._trans.x = self._ha+self.width/2.0
+        elif self._hanchor == 'right':
+            self._trans.x = self._ha-self.width/2.0
+        
+        if self._vanchor == 'top':
+            self._trans.y = self._hv-self.height/2.0
+        elif self._vanchor == 'bottom':
+            self._trans.y = self._hv+self.height/2.0
 
 
 ################# PATH PRIMITIVES #################
@@ -2072,6 +2229,478 @@ class GPolygon(GPath):
         self._cache.add(PopMatrix())
 
 
+################# BATCHED PRIMITIVES #################
+pass 
+# #mark BATCHED PRIMITIVES
+
+
+class GBrickBatch(GObject):
+    """Instances represent many solid rectangles, drawn as a single mesh.
+    
+    Each `GRectangle` is drawn with its own matrix, color and rectangle commands, so a
+    hundred of them take hundreds of graphics commands every frame.  This class draws
+    a whole layer of rectangles (such as the bricks of a game) as one Kivy `Mesh`
+    instead: two triangles per rectangle, with the color of each rectangle given per
+    vertex.  The rectangles must be axis-aligned, and are never rotated on their own.
+    
+    The rectangles are given in the coordinates of the view, as a list `boxes` of
+    (left,bottom,right,top) tuples, with a matching list `colors` of their fill colors.
+    The attributes `x` and `y` are an offset for the whole batch, and start at 0.
+    
+    Rectangles can be removed (but not added back) with the methods `remove` and 
+    `remove_many`.  The rectangle is collapsed to a point in place; the mesh is not 
+    rebuilt.  Only the vertices of the removed rectangles are changed, but Kivy takes
+    the vertices of a mesh as a whole list, so the list is sent to the mesh once per 
+    call.  To remove several rectangles at once, give them all to `remove_many`.
+    
+    The attributes `width` and `height` are immutable.  They are the size of the
+    bounding box of all of the rectangles, removed or not."""
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def width(self):
+        """The horizontal width of the bounding box of the rectangles.
+        
+        **Invariant**: Must be an int or float > 0."""
+        return self._width
+    
+    @property
+    def height(self):
+        """The vertical height of the bounding box of the rectangles.
+        
+        **Invariant**: Must be an int or float > 0."""
+        return self._height
+    
+    @property
+    def count(self):
+        """The number of rectangles not yet removed.
+        
+        **Invariant**: Must be an int >= 0."""
+        return self._count
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """**Constructor**: Creates a new batch of solid rectangles
+        
+            :param keywords: dictionary of keyword arguments 
+            **Precondition**: See below.
+        
+        To use the constructor for this class, you should provide it with a list of 
+        keyword arguments that initialize various attributes. For example, to create a 
+        red and a blue square, use the constructor call
+        
+            GBrickBatch(boxes=[(0,0,10,10),(20,0,30,10)],
+                        colors=[colormodel.RED,colormodel.BLUE])
+        
+        This class supports the same keywords as `GObject`, though some of them are 
+        unused, as the `width` and `height` attributes are immutable.  The primary
+        keywords for this class are `boxes` and `colors`."""
+        self._defined = False
+        boxes  = keywords['boxes']  if 'boxes'  in keywords else []
+        colors = keywords['colors'] if 'colors' in keywords else []
+        assert len(boxes) == len(colors), 'there are %d boxes but %d colors' % (len(boxes),len(colors))
+        for box in boxes:
+            assert _is_num_tuple(box,4), 'value %s is not a valid box' % `box`
+        for color in colors:
+            assert _is_color(color), 'value %s is not a valid color' % `color`
+        self._boxes = np.array(boxes,dtype=float).reshape(len(boxes),4)
+        self._colors = colors
+        self._count = len(boxes)
+        self._alive = np.ones(len(boxes),dtype=bool)
+        keywords = dict(keywords)
+        keywords.pop('width',None)
+        keywords.pop('height',None)
+        GObject.__init__(self,**keywords)
+        if len(boxes):
+            self._width  = max(float(self._boxes[:,2].max()-self._boxes[:,0].min()),1.0)
+            self._height = max(float(self._boxes[:,3].max()-self._boxes[:,1].min()),1.0)
+        self._make_mesh()
+        self._reset()
+        self._defined = True
+    
+    def __len__(self):
+        """**Returns**: The number of rectangles not yet removed."""
+        return self._count
+    
+    
+    # PUBLIC METHODS
+    def contains(self,x,y):
+        """**Returns**: True if one of the rectangles not removed contains the point (x,y),
+        False otherwise.
+        
+            :param x: x coordinate of point to check
+            **Precondition**: an int or float
+            
+            :param y: y coordinate of point to check
+            **Precondition**: an int or float"""
+        px = x-self.x
+        py = y-self.y
+        boxes = self._boxes
+        inside = ((boxes[:,0] < px) & (px < boxes[:,2]) & 
+                  (boxes[:,1] < py) & (py < boxes[:,3]) & self._alive)
+        return bool(inside.any())
+    
+    def remove(self,i):
+        """Removes the rectangle at position i in `boxes` from the screen.
+        
+            :param i: the rectangle to remove
+            **Precondition**: an int in 0..len(boxes)-1
+        
+        The four corners of the rectangle are moved onto one point, so it no longer
+        covers any pixels.  Only the vertices change; the mesh is kept.  Removing a 
+        rectangle that was already removed does nothing."""
+        self.remove_many([i])
+    
+    def remove_many(self,indices):
+        """Removes the rectangles at the given positions in `boxes` from the screen.
+        
+            :param indices: the rectangles to remove
+            **Precondition**: a list (or int array) of ints in 0..len(boxes)-1
+        
+        This is the same as calling `remove` on each of them, except that the vertices
+        are sent to the mesh only once, and not at all if no rectangle was removed.
+        Rectangles that were already removed are skipped.
+        
+        The vertex list is kept between calls, and only the entries of the removed 
+        rectangles are rewritten.  Kivy has no way to upload part of a mesh, so the 
+        whole list is still copied to the mesh; that is one copy per call, which is 
+        once a frame in a game that gathers the bricks hit in each frame."""
+        index = np.asarray(indices,dtype=int).ravel()
+        index = np.unique(index[self._alive[index]])
+        if len(index) == 0:
+            return
+        self._alive[index] = False
+        self._count = self._count-len(index)
+        self._verts[index,:,0:2] = self._verts[index,0:1,0:2]
+        flat = self._flat
+        for i in index.tolist():
+            flat[16*i:16*i+16] = self._verts[i].ravel().tolist()
+        self._mesh.vertices = flat
+    
+    def is_removed(self,i):
+        """**Returns**: True if the rectangle at position i in `boxes` was removed.
+        
+            :param i: the rectangle to check
+            **Precondition**: an int in 0..len(boxes)-1"""
+        return not self._alive[i]
+    
+    
+    # HIDDEN METHODS
+    def _make_mesh(self):
+        """Creates the mesh and the color palette for this batch.
+        
+        The default Kivy shader colors a mesh with a texture, so the colors are stored 
+        in a texture with one pixel per color, and each vertex gets the texture 
+        coordinates of the pixel with the color of its rectangle."""
+        palette = []
+        index = []
+        for color in self._colors:
+            if type(color) in [colormodel.RGB, colormodel.HSV]:
+                color = color.glColor()
+            elif len(color) == 3:
+                color = list(color)+[1.0]
+            color = tuple(int(round(c*255)) for c in color)
+            if not color in palette:
+                palette.append(color)
+            index.append(palette.index(color))
+        
+        size = max(len(palette),1)
+        self._texture = Texture.create(size=(size,1),colorfmt='rgba')
+        self._texture.mag_filter = 'nearest'
+        self._texture.min_filter = 'nearest'
+        pixels = np.zeros((size,4),dtype=np.uint8)
+        if palette:
+            pixels[:] = palette
+        self._texture.blit_buffer(pixels.tobytes(),colorfmt='rgba',bufferfmt='ubyte')
+        
+        # Four vertices (x,y,u,v) per rectangle, counter-clockwise from bottom left
+        n = len(self._boxes)
+        self._verts = np.empty((n,4,4))
+        left, bottom, right, top = self._boxes.T
+        self._verts[:,:,0] = np.column_stack((left,right,right,left))
+        self._verts[:,:,1] = np.column_stack((bottom,bottom,top,top))
+        self._verts[:,:,2] = ((np.array(index,dtype=float)+0.5)/size)[:,np.newaxis]
+        self._verts[:,:,3] = 0.5
+        self._verts[~self._alive,:,0:2] = self._verts[~self._alive,0:1,0:2]
+        
+        quads = 4*np.arange(n)[:,np.newaxis]+np.array([0,1,2,2,3,0])
+        self._flat = self._verts.ravel().tolist()
+        self._mesh = Mesh(vertices=self._flat,
+                          indices=quads.ravel().tolist(),
+                          mode='triangles',texture=self._texture)
+    
+    def _reset(self):
+        """Resets the drawing cache"""
+        GObject._reset(self)
+        self._cache.add(Color(1,1,1,1))
+        self._cache.add(self._mesh)
+        self._cache.add(PopMatrix())
+
+
+class _GlyphAtlas(object):
+    """Hidden class for the glyphs of a bitmap font, rendered once into one texture.
+    
+    The characters are rendered side by side as a single line of text, so the atlas
+    costs one texture however many characters it has.  The edge between two glyphs is 
+    the width of the text up to that character, as measured by the font.
+    
+    Atlases are shared: use the method `fetch` instead of the constructor."""
+    
+    # The atlases made so far, by characters and font
+    _atlases = {}
+    
+    @classmethod
+    def fetch(cls,chars,font_name,font_size,bold):
+        """**Returns**: The atlas for the given characters and font.
+        
+            :param chars: the characters of the font
+            **Precondition**: a nonempty string with no repeated or newline characters
+            
+            :param font_name: the font file
+            **Precondition**: a font name, as in `GLabel`
+            
+            :param font_size: the size of the font in points
+            **Precondition**: an int or float > 0
+            
+            :param bold: whether the text is bold
+            **Precondition**: a bool
+        
+        The atlas is only made the first time it is asked for."""
+        key = (chars,font_name,font_size,bold)
+        if not key in cls._atlases:
+            cls._atlases[key] = cls(chars,font_name,font_size,bold)
+        return cls._atlases[key]
+    
+    def __init__(self,chars,font_name,font_size,bold):
+        """**Constructor**: Renders the characters into a new atlas.
+        
+        See `fetch` for the parameters."""
+        label = CoreLabel(text=chars,font_name=font_name,font_size=font_size,bold=bold)
+        label.refresh()
+        self.texture = label.texture
+        self.height = float(self.texture.height)
+        self._index = dict((c,k) for (k,c) in enumerate(chars))
+        
+        edges = [0.0]+[float(label.get_extents(chars[:k])[0]) for k in range(1,len(chars)+1)]
+        edges = np.array(edges)
+        self._advance = np.diff(edges)
+        
+        # Texture coordinates, which are flipped for rendered text
+        coords = self.texture.tex_coords
+        self._u = coords[0]+(coords[2]-coords[0])*edges/max(self.texture.width,1)
+        self._v = (coords[1],coords[1],coords[5],coords[5])
+    
+    def has_char(self,c):
+        """**Returns**: True if the character c is in this atlas, False otherwise.
+        
+            :param c: the character to check
+            **Precondition**: a string of length 1"""
+        return c in self._index
+    
+    def layout(self,text):
+        """**Returns**: The vertices of the text centered at (0,0), and its width.
+        
+            :param text: the text to lay out
+            **Precondition**: a string of characters in this atlas
+        
+        The vertices are an array of shape (len(text),4,4), with the (x,y,u,v) of the 
+        four corners of each glyph, counter-clockwise from the bottom left."""
+        k = np.array([self._index[c] for c in text],dtype=int)
+        right = np.cumsum(self._advance[k])
+        left = right-self._advance[k]
+        width = float(right[-1]) if len(text) else 0.0
+        
+        verts = np.empty((len(text),4,4))
+        verts[:,:,0] = np.column_stack((left,right,right,left))-width/2.0
+        verts[:,:,1] = (-self.height/2.0,-self.height/2.0,self.height/2.0,self.height/2.0)
+        verts[:,:,2] = np.column_stack((self._u[k],self._u[k+1],self._u[k+1],self._u[k]))
+        verts[:,:,3] = self._v
+        return verts, width
+
+
+class GBitmapText(GObject):
+    """Instances represent a short line of text drawn from a bitmap font.
+    
+    A `GLabel` lays out and renders its text again whenever it changes.  This class 
+    renders the characters it can show once, into a texture shared by every instance
+    with the same characters and font, and draws its text as one Kivy `Mesh` with a 
+    quad per character.  Changing the text only changes the vertices of the mesh.  
+    This makes it a good fit for text that changes often, such as a score.
+    
+    The characters that can be shown are given by the keyword `chars`, which defaults 
+    to the digits and a space.  The text is a single line, and is always centered at 
+    (x,y).  As with `GLabel`, the background color is `fillcolor`, while `linecolor` is
+    the color of the text.
+    
+    The attributes `chars`, `font_size`, `font_name` and `bold` can only be given to 
+    the constructor.  The attributes `width` and `height` are immutable; they are the
+    size of the current text."""
+    
+    #: the characters a bitmap text can show unless given others
+    DIGITS = ' 0123456789'
+    
+    # MUTABLE PROPERTIES
+    @property
+    def text(self):
+        """Text for this object.
+        
+        Every character in the text must be one of `chars`.  Changing the text changes
+        the vertices of the mesh, but never renders anything.
+        
+        **Invariant**: Must be a string of characters in `chars`"""
+        return self._text
+    
+    @text.setter
+    def text(self,value):
+        assert type(value) == str, 'value %s is not a string' % `value`
+        if value == self._text:
+            return
+        for c in value:
+            assert self._atlas.has_char(c), 'character %s is not in the font' % `c`
+        self._text = value
+        if self._defined:
+            self._layout()
+    
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def chars(self):
+        """The characters that this object can show.
+        
+        **Invariant**: Must be a nonempty string with no repeated characters."""
+        return self._chars
+    
+    @property
+    def font_size(self):
+        """Size of the text font in points.
+        
+        **Invariant**: Must be a positive number (int or float)"""
+        return self._fsize
+    
+    @property
+    def font_name(self):
+        """File name for the .ttf file to use as a font
+        
+        **Invariant**: Must be a string referring to a .ttf file in folder Fonts"""
+        return self._fname
+    
+    @property
+    def bold(self):
+        """Boolean indicating whether or not the text should be bold.
+        
+        **Invariant**: Must be a boolean"""
+        return self._bold
+    
+    @property
+    def width(self):
+        """The horizontal width of the text.
+        
+        **Invariant**: Must be an int or float > 0."""
+        return self._width
+    
+    @property
+    def height(self):
+        """The vertical height of the text.
+        
+        **Invariant**: Must be an int or float > 0."""
+        return self._height
+    
+    
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """**Constructor**: Creates a new bitmap text.
+        
+            :param keywords: dictionary of keyword arguments 
+            **Precondition**: See below.
+        
+        To use the constructor for this class, you should provide it with a list of 
+        keyword arguments that initialize various attributes. For example, to create a 
+        score that can show digits and the word 'Score:', use the constructor call
+        
+            GBitmapText(text='Score: 0',chars='Score: 0123456789',font_size=12)
+        
+        This class supports the same keywords as `GObject`, though some of them are 
+        unused, as the `width` and `height` attributes are immutable.  The other keywords 
+        are `text`, `chars`, `font_size`, `font_name` and `bold`."""
+        self._defined = False
+        self._chars = keywords['chars'] if 'chars' in keywords else self.DIGITS
+        self._fsize = keywords['font_size'] if 'font_size' in keywords else 15
+        self._fname = keywords['font_name'] if 'font_name' in keywords else DEFAULT_FONT
+        self._bold  = keywords['bold'] if 'bold' in keywords else False
+        assert type(self._chars) == str and len(self._chars) > 0, \
+                'value %s is not a nonempty string' % `self._chars`
+        assert len(set(self._chars)) == len(self._chars) and not '\n' in self._chars, \
+                'value %s has repeated characters' % `self._chars`
+        assert _is_num(self._fsize) and self._fsize > 0, \
+                'value %s is not a positive number' % `self._fsize`
+        assert self._fname == DEFAULT_FONT or _is_font_file(self._fname), \
+                'value %s is not a font name' % `self._fname`
+        assert type(self._bold) == bool, `self._bold`+' is not a bool'
+        
+        self._atlas = _GlyphAtlas.fetch(self._chars,self._fname,self._fsize,self._bold)
+        self._text = ''
+        self.text = keywords['text'] if 'text' in keywords else ''
+        
+        keywords = dict(keywords)
+        keywords.pop('width',None)
+        keywords.pop('height',None)
+        GObject.__init__(self,**keywords)
+        self._height = max(self._atlas.height,1.0)
+        
+        self._mesh = Mesh(mode='triangles',texture=self._atlas.texture)
+        self._fill = Rectangle()
+        self._layout()
+
+        # The edges could not be placed before the size of the text was known
+        if not 'x' in keywords:
+            if 'left' in keywords:
+                self.left = keywords['left']
+            elif 'right' in keywords:
+                self.right = keywords['right']
+        if not 'y' in keywords:
+            if 'bottom' in keywords:
+                self.bottom = keywords['bottom']
+            elif 'top' in keywords:
+                self.top = keywords['top']
+
+        self._reset()
+        self._defined = True
+    
+    def __str__(self):
+        """**Returns**: A string representation of this object."""
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,text=%s,center=(%s,%s),angle=%s]' \
+                % (s,`self.text`,`self.x`,`self.y`,`self.angle`)
+    
+    
+    # HIDDEN METHODS
+    def _layout(self):
+        """Puts the glyphs of the text in the mesh, and fits the background to them."""
+        verts, width = self._atlas.layout(self._text)
+        self._width = max(width,1.0)
+        
+        quads = 4*np.arange(len(self._text))[:,np.newaxis]+np.array([0,1,2,2,3,0])
+        self._mesh.vertices = verts.ravel().tolist()
+        self._mesh.indices = quads.ravel().tolist()
+        self._fill.pos  = (-self._width/2.0,-self._height/2.0)
+        self._fill.size = (self._width,self._height)
+    
+    def _reset(self):
+        """Resets the drawing cache"""
+        GObject._reset(self)
+        self._cache.add(self._fillcolor)
+        self._cache.add(self._fill)
+        
+        # The text is rendered in white, and tinted by the line color
+        self._cache.add(self._linecolor)
+        self._cache.add(self._mesh)
+        self._cache.add(PopMatrix())
+
+
 ################# SCENE GRAPH #################
 pass 
 # #mark SCENE GRAPH
@@ -2565,6 +3194,17 @@ class GView(FloatLayout):
     `GObject` instances to the `draw` method.  You must do this every animation frame,
     as the game is constantly clearing the window.
     
+    Alternatively, a shape can be attached to the view with the method `attach`.  An
+    attached shape stays on the screen, frame after frame, until it is detached; any
+    change to it (such as moving it) shows up on its own.  This saves rebuilding the
+    whole window every frame for shapes that are always there, such as the bricks.
+    Attached shapes are drawn in order of their depth `z` (lowest first), and below
+    anything drawn with `draw`.
+    
+    The shapes at one depth can also be cached with the method `cache_layer`.  They
+    are then drawn into an offscreen image, which is drawn to the window as a single
+    rectangle.  The image is only drawn again when one of those shapes changes.
+    
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should 
     only use the one provided in the `input` attribute of `GameApp`. See the  class 
@@ -2581,7 +3221,11 @@ class GView(FloatLayout):
         You should only use use the object provided in the `view` attribute  of 
         `GameApp`. See the class `GameApp` for more information."""
         FloatLayout.__init__(self)
-        self._frame = InstructionGroup()
+        self._frame  = InstructionGroup()
+        self._scene  = InstructionGroup()
+        self._layers = {}
+        self._depth  = {}
+        self._cached = {}
         self.bind(pos=self._reset)
         self.bind(size=self._reset)
         self._reset()
@@ -2602,22 +3246,172 @@ class GView(FloatLayout):
         """Clears the contents of the view.
         
         This method is called for you automatically at the start of the animation
-        frame.  That way, you are not drawing images on top of one another."""
+        frame.  That way, you are not drawing images on top of one another.
+        
+        Shapes attached to the view are not cleared."""
         self._frame.clear()
     
+    def attach(self,obj,z=0):
+        """Attaches a shape to this view, so that it is drawn every frame.
+        
+            :param obj: the shape to attach
+            **Precondition**: an *instance of* `GObject`
+            
+            :param z: the depth of the shape
+            **Precondition**: an int or float
+        
+        The shape stays on the screen until it is detached; there is no need to draw
+        it.  Shapes are drawn in order of depth, so a shape with a higher `z` is drawn
+        on top of one with a lower `z`.  Shapes of the same depth are drawn in the order
+        they were attached.
+        
+        Attaching a shape that is already attached changes its depth (or does nothing
+        if the depth is the same)."""
+        assert isinstance(obj,GObject), 'value %s is not a GObject' % `obj`
+        assert _is_num(z), 'value %s is not a number' % `z`
+        if obj in self._depth:
+            if self._depth[obj] == z:
+                return
+            self._layers[self._depth[obj]].remove(obj._node)
+        if not z in self._layers:
+            self._layers[z] = InstructionGroup()
+            self._restack()
+        self._layers[z].add(obj._node)
+        self._depth[obj] = z
+    
+    def detach(self,obj):
+        """Detaches a shape from this view, taking it off the screen.
+        
+            :param obj: the shape to detach
+            **Precondition**: an *instance of* `GObject`
+        
+        This does nothing if the shape is not attached."""
+        if obj in self._depth:
+            self._layers[self._depth.pop(obj)].remove(obj._node)
+    
+    def is_attached(self,obj):
+        """**Returns**: True if the shape is attached to this view.
+        
+            :param obj: the shape to check
+            **Precondition**: an *instance of* `GObject`"""
+        return obj in self._depth
+    
+    def cache_layer(self,z,cached=True):
+        """Caches the shapes attached at depth z in an offscreen image (or stops).
+        
+            :param z: the depth of the layer
+            **Precondition**: an int or float
+            
+            :param cached: whether to cache the layer
+            **Precondition**: a bool
+        
+        A cached layer is drawn into a Kivy `Fbo` the size of the view, and the window 
+        only draws the texture of the `Fbo`, as one rectangle.  The `Fbo` is drawn again 
+        only when a shape in the layer changes, so a layer that rarely changes (such as a
+        wall of bricks, or text that stays put) costs the same every frame however many
+        shapes it has.  A layer that changes every frame should not be cached, as it is 
+        then drawn twice.
+        
+        The layer stays cached as shapes are attached to it and detached from it.  A 
+        depth can be cached before any shape is attached there."""
+        assert _is_num(z), 'value %s is not a number' % `z`
+        assert type(cached) == bool, `cached`+' is not a bool'
+        if cached == (z in self._cached):
+            return
+        if cached:
+            self._cached[z] = None
+        else:
+            fbo = self._cached.pop(z)
+            if not fbo is None:
+                fbo.remove(self._layers[z])
+        if not z in self._layers:
+            self._layers[z] = InstructionGroup()
+        self._restack()
+    
+    def is_layer_cached(self,z):
+        """**Returns**: True if the layer at depth z is cached.
+        
+            :param z: the depth of the layer
+            **Precondition**: an int or float"""
+        return z in self._cached
     
     
     # HIDDEN METHODS
+    def _restack(self):
+        """Rebuilds the scene from the layers, in order of depth.
+        
+        A cached layer is put in its `Fbo` (which is made if it does not exist yet), and
+        the scene gets the `Fbo` and a rectangle with its texture."""
+        self._scene.clear()
+        scale = dp(1)
+        for depth in sorted(self._layers):
+            if not depth in self._cached:
+                self._scene.add(self._layers[depth])
+                continue
+            
+            fbo = self._cached[depth]
+            if fbo is None:
+                fbo = Fbo(size=(max(int(self.width),1),max(int(self.height),1)))
+                fbo.add(ClearColor(0,0,0,0))
+                fbo.add(ClearBuffers())
+                # The same transform as the window, shifted to the corner of the Fbo
+                fbo.add(Translate(-self.x,-self.y))
+                fbo.add(Scale(scale,scale,scale))
+                fbo.add(self._layers[depth])
+                self._cached[depth] = fbo
+            self._scene.add(fbo)
+            self._scene.add(Color(1,1,1,1))
+            self._scene.add(Rectangle(pos=(self.x/scale,self.y/scale),texture=fbo.texture,
+                                      size=(self.width/scale,self.height/scale)))
+    
     def _reset(self,obj=None,value=None):
         """Resets the view canvas in response to a resizing event"""
+        # The offscreen images must match the new size
+        for depth in self._cached:
+            if not self._cached[depth] is None:
+                self._cached[depth].remove(self._layers[depth])
+                self._cached[depth] = None
+        self._restack()
+        
         self.canvas.clear()
         self.canvas.add(Color(1,1,1))
         self.canvas.add(Rectangle(pos=self.pos,size=self.size))
         # Work-around for Retina Macs
         self.canvas.add(Scale(dp(1),dp(1),dp(1)))
+        self.canvas.add(self._scene)
         self.canvas.add(self._frame)
 
 
+def _skip_draw(dt,period,update,draw,skips,limit):
+    """Returns: True if the draw of an animation frame should be skipped
+    
+    A draw is only skipped if the frame came in late (dt is more than a period),
+    and the time it is late, plus the time `update` took and `draw` usually takes,
+    is more than a period, so drawing would make the next frame late as well.  A 
+    frame that is on time is always drawn, however long `update` and `draw` take.  
+    No more than limit draws are skipped in a row.
+    
+    Parameter dt: The time in seconds since the last frame
+    Precondition: dt is a number >= 0
+    
+    Parameter period: The time in seconds of one frame
+    Precondition: period is a number > 0
+    
+    Parameter update: The time in seconds `update` took in this frame
+    Precondition: update is a number >= 0
+    
+    Parameter draw: The average time in seconds `draw` takes
+    Precondition: draw is a number >= 0
+    
+    Parameter skips: The number of draws skipped in a row before this frame
+    Precondition: skips is an int >= 0
+    
+    Parameter limit: The most draws to skip in a row
+    Precondition: limit is an int >= 0"""
+    late = dt-period
+    return skips < limit and late > 0 and late+update+draw > period
+
+
 ################# PRIMARY APP CLASS #################
 pass 
 # #mark PRIMARY APP CLASS
@@ -2639,8 +3433,27 @@ class GameApp(kivy.app.App):
     
     **draw**: This method draws all of the objects to the screen.  The only 
     thing you should have in this method are calls to `self.view.draw()`.
+    
+    The app measures how long `update` and `draw` take.  If a frame is running late,
+    it skips `draw` for that frame (but never `update`), and the window keeps the
+    shapes of the last frame drawn.  If the two together keep taking most of a frame,
+    it lowers the number of frames per second, down to `minfps`, and raises it back
+    towards `fps` once they are fast again.  The attributes `rate`, `skipped`,
+    `update_time` and `draw_time` show what it decided, and why.  Since the frame
+    rate can change, `update` should move the game by the time `dt` it is given.
     """
     
+    # The weight of the newest frame in the average times of update and draw
+    _PACE_WEIGHT = 0.1
+    # The most draws skipped in a row
+    _PACE_SKIPS  = 3
+    # The fraction of a frame update and draw may take before the rate is lowered
+    _PACE_HIGH   = 0.9
+    # The fraction of a frame update and draw must take to raise the rate again
+    _PACE_LOW    = 0.6
+    # The most the rate is raised at a time
+    _PACE_RISE   = 1.25
+    
     # MUTABLE ATTRIBUTES
     @property
     def fps(self):
@@ -2657,9 +3470,28 @@ class GameApp(kivy.app.App):
     def fps(self,value):
         assert _is_num(value), 'value %s is not a number' % `value`
         assert value > 0, 'value %s is not positive' % `value`
-        Clock.unschedule(self._refresh)
         self._fps = value
-        Clock.schedule_interval(self._refresh,1.0/self._fps)
+        self._schedule(value)
+    
+    @property
+    def minfps(self):
+        """The fewest frames-per-second to animate when the game is slow
+        
+        If `update` and `draw` take too long for `fps`, the frame rate is lowered, but
+        never below this value (or `fps`, if that is smaller).  By default this is the
+        same as `fps`, so the frame rate is never lowered; the draws may still be
+        skipped.
+        
+        **Invariant**: Must be an int or float > 0."""
+        return self._minfps
+    
+    @minfps.setter
+    def minfps(self,value):
+        assert _is_num(value), 'value %s is not a number' % `value`
+        assert value > 0, 'value %s is not positive' % `value`
+        self._minfps = value
+        if self._rate < min(value,self._fps):
+            self._schedule(min(value,self._fps))
     
     
     # IMMUTABLE PROPERTIES
@@ -2698,6 +3530,38 @@ class GameApp(kivy.app.App):
         **Invariant**: Must be instance of GInput."""
         return self._input
     
+    @property
+    def rate(self):
+        """The number of frames-per-second animated right now
+        
+        This is `fps` unless the game was too slow for it (see `minfps`).
+        
+        **Invariant**: Must be an int or float > 0."""
+        return self._rate
+    
+    @property
+    def skipped(self):
+        """The number of frames whose `draw` was skipped because they ran late
+        
+        **Invariant**: Must be an int >= 0."""
+        return self._skipped
+    
+    @property
+    def update_time(self):
+        """The average time in seconds taken by `update` in the recent frames
+        
+        **Invariant**: Must be a float >= 0."""
+        return self._utime
+    
+    @property
+    def draw_time(self):
+        """The average time in seconds taken by `draw` in the recent frames
+        
+        Frames whose `draw` was skipped do not count.
+        
+        **Invariant**: Must be a float >= 0."""
+        return self._dtime
+    
     
     # BUILT-IN METHODS
     def __init__(self,**keywords):
@@ -2721,15 +3585,25 @@ class GameApp(kivy.app.App):
         w = keywords['width']  if  'width' in keywords else 0.0
         h = keywords['height'] if 'height' in keywords else 0.0
         f = keywords['fps']    if 'fps'    in keywords else 60.0
+        m = keywords['minfps'] if 'minfps' in keywords else f
 
         assert _is_num(w), 'width %s is not a number' % `w`
         assert _is_num(h), 'height %s is not a number' % `h`
         assert _is_num(f), 'fps %s is not a number' % `value`
         assert f > 0, 'fps %s is not positive' % `value`
+        assert _is_num(m), 'minfps %s is not a number' % `m`
+        assert m > 0, 'minfps %s is not positive' % `m`
         
         self._gwidth = w
         self._gheight = h
         self._fps = f
+        self._minfps = m
+        self._rate = f
+        self._utime = 0.0
+        self._dtime = 0.0
+        self._skipped = 0
+        self._skips = 0
+        self._frames = 0
         Config.set('graphics', 'width', str(self.width))
         Config.set('graphics', 'height', str(self.height))
         # Tell Kivy to build the application
@@ -2805,7 +3679,7 @@ class GameApp(kivy.app.App):
         
         This method is a callback-proxy for method `start`.  It handles important issues 
         behind the scenes, particularly with setting the FPS"""
-        Clock.schedule_interval(self._refresh,1.0/self.fps)
+        self._schedule(self._rate)
         self.start()
     
     def _refresh(self,dt):
@@ -2815,9 +3689,61 @@ class GameApp(kivy.app.App):
             **Precondition**: a number (int or float)
         
         This method a callback-proxy for the methods `update` and `draw`.  It handles
-        important issues behind the scenes, particularly with clearing the window."""
-        self.view.clear()
+        important issues behind the scenes, particularly with clearing the window.
+        Only the shapes drawn with `draw` are cleared; attached shapes stay.
+        
+        The window is not cleared or drawn if the frame came in late, and `update` and
+        `draw` would make the next frame late too (see the function `_skip_draw`).  A
+        frame that is on time is always drawn."""
+        period = 1.0/self._rate
+        start = time.time()
         self.update(dt)
-        self.draw()
+        middle = time.time()
+        weight = self._PACE_WEIGHT
+        self._utime += weight*(middle-start-self._utime)
+        
+        if _skip_draw(dt,period,middle-start,self._dtime,self._skips,self._PACE_SKIPS):
+            self._skips += 1
+            self._skipped += 1
+        else:
+            self._skips = 0
+            self.view.clear()
+            self.draw()
+            self._dtime += weight*(time.time()-middle-self._dtime)
+        
+        # Look at the rate about once a second
+        self._frames += 1
+        if self._frames >= self._rate:
+            self._frames = 0
+            self._pace()
+    
+    def _pace(self):
+        """Lowers or raises the frame rate to fit the time taken by `update` and `draw`.
+        
+        The rate is lowered (no further than `minfps`) when they take most of a frame,
+        so that they take a little less.  It is raised (no further than `fps`) a step at
+        a time when they take much less than a frame."""
+        load = self._utime+self._dtime
+        floor = min(self._minfps,self._fps)
+        rate = self._rate
+        if load > self._PACE_HIGH/rate and rate > floor:
+            rate = max(floor,self._PACE_HIGH/load)
+        elif load < self._PACE_LOW/rate and rate < self._fps:
+            rate = min(self._fps,rate*self._PACE_RISE)
+            if load > 0:
+                rate = min(rate,self._PACE_HIGH/load)
+        if rate != self._rate:
+            self._schedule(rate)
+    
+    def _schedule(self,rate):
+        """Animates the game at the given number of frames per second.
+        
+            :param rate: the frames per second
+            **Precondition**: a number (int or float) > 0
+        """
+        Clock.unschedule(self._refresh)
+        self._rate = rate
+        self._frames = 0
+        Clock.schedule_interval(self._refresh,1.0/rate)
     
     
@@ -28,12 +28,13 @@ import math
 # If you need extra information from Play, then it should be a parameter in your
 #method, and Play should pass it as a argument when it calls the method.
 
+
 class Paddle(GRectangle):
     """An instance is the game paddle.
     
-    This class contains a method to detect collision with the ball, as well as
-    move it
-    left and right.  You may wish to add more features to this class.
+    This class only draws the paddle; the paddle that the ball collides with
+    is a PaddleBody in simulation.py, which Play keeps it in step with.  You
+    may wish to add more features to this class.
     
     The attributes of this class are those inherited from GRectangle.
     
@@ -46,31 +47,14 @@ class Paddle(GRectangle):
     def __init__(self,x,y,width,height,fillcolor):
         GRectangle.__init__(self,x=x,y=y,width=width,height=height,
                             fillcolor=fillcolor)
-        GRectangle(x=x,y=y,width=width,height=height,
-                   fillcolor=fillcolor).linecolor=fillcolor
-    
-    # METHODS TO MOVE THE PADDLE AND CHECK FOR COLLISIONS
-    def collides(self,ball):
-        """Returns: True if the ball collides with this paddle
-        
-        Parameter ball: The ball to check
-        Precondition: ball is of class Ball"""
-        if ball._vy<0:
-            a=self.contains(ball.x-BALL_DIAMETER/2,ball.y+BALL_DIAMETER/2)
-            b=self.contains(ball.x-BALL_DIAMETER/2,ball.y-BALL_DIAMETER/2)
-            c=self.contains(ball.x+BALL_DIAMETER/2,ball.y+BALL_DIAMETER/2)
-            d=self.contains(ball.x+BALL_DIAMETER/2,ball.y-BALL_DIAMETER/2)
-            if a or b or c or d:
-                return True
     
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
 
 class Brick(GRectangle):
     """An instance is a game brick.
     
-    This class contains a method to detect collision with the ball.  You may
-    wish to 
-    add more features to this class.
+    The collisions with the ball are done on the bricks of a BrickField in
+    simulation.py.  You may wish to add more features to this class.
     
     The attributes of this class are those inherited from GRectangle.
     
@@ -85,22 +69,8 @@ class Brick(GRectangle):
         as the GRectangle class. The only adjustment in this case
         is that the linecolor of the brick is set equal to the fillcolor."""
         GRectangle.__init__(self,left=left,y=y,width=width,
-                            height=height,fillcolor=fillcolor)
-        GRectangle(left=left,y=y,width=width,height=height,
-                   fillcolor=fillcolor).linecolor=fillcolor
-    
-    # METHOD TO CHECK FOR COLLISION
-    def collides(self,ball):
-        """Returns: True if the ball collides with this brick
-        
-        Parameter ball: The ball to check
-        Precondition: ball is of class Ball"""
-        a=self.contains(ball.x-BALL_DIAMETER/2,ball.y+BALL_DIAMETER/2)
-        b=self.contains(ball.x-BALL_DIAMETER/2,ball.y-BALL_DIAMETER/2)
-        c=self.contains(ball.x+BALL_DIAMETER/2,ball.y+BALL_DIAMETER/2)
-        d=self.contains(ball.x+BALL_DIAMETER/2,ball.y-BALL_DIAMETER/2)
-        if a or b or c or d:
-            return True
+                            height=height,fillcolor=fillcolor,
+                            linecolor=fillcolor)
     
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
 
@@ -145,8 +115,6 @@ class Ball(GEllipse):
         velocity is different every time a new ball is constructed."""
         GEllipse.__init__(self,x=x,y=y,width=width,height=height,
                           fillcolor=fillcolor)
-        GEllipse(x=x,y=y,width=width,height=height,
-                 fillcolor=fillcolor).linecolor=fillcolor
         self._vx=random.uniform(1.0,5.0) 
         self._vx=self._vx*random.choice([-1,1])
         self._vy=(-5.0)
@@ -154,9 +122,5 @@ class Ball(GEllipse):
     
     
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
-    def incspeed(self):
-        self._vx = self._vx * 1.05
-        self._vy = self._vy * 1.05
 
 # IF YOU NEED ADDITIONAL MODEL CLASSES, THEY GO HERE
-    
@@ -7,11 +7,15 @@ you are expected to make a new instance of Play.
 
 The subcontroller Play manages the paddle, ball, and bricks.  These are model
 objects.  
-Their classes are defined in models.py."""
+Their classes are defined in models.py.  The game itself (the physics and the
+score) is a Simulation, defined in simulation.py; Play wraps it to show it on
+the screen and play its sounds."""
 from constants import *
 from game2d import *
 from models import *
+from simulation import Simulation
 import colormodel
+import numpy as np
 
 
 # PRIMARY RULE: Play can only access attributes in models.py via getters/setters
@@ -22,7 +26,7 @@ import colormodel
 class Play(object):
     """An instance controls a single game of breakout.
     
-    This subcontroller has a reference to the ball, paddle, and bricks. It
+    This subcontroller has a reference to the balls, paddle, and bricks. It
     animates the 
     ball, removing any bricks as necessary.  When the game is won, it stops
     animating.  
@@ -34,9 +38,12 @@ class Play(object):
     
     INSTANCE ATTRIBUTES:
         _paddle [Paddle]: the paddle to play with 
-        _bricks [list of Brick]: the list of bricks still remaining 
-        _ball   [Ball, or None if waiting for a serve]:  the ball to animate
-        _tries  [int >= 0]: the number of tries left 
+        _bricks [GBrickBatch]: the drawable for all of the bricks, with one
+                rectangle per brick index; the rectangles of the bricks
+                destroyed up to the last draw are removed
+        _sim    [Simulation]: the game itself; the balls, the bricks still
+                remaining, the paddle position, the score and the number of
+                tries left
     
     As you can see, all of these attributes are hidden.  You may find that you
     want to
@@ -56,58 +63,90 @@ class Play(object):
                   
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
     
-        _score [int >= 0]: player's score
+        _views  [list of Ball]: the drawables for the balls in play, attached
+                to the view
+        _color  [color]: the color of the balls
+        _shown  [color or None]: the color last given to the drawables in
+                _views
+        _prev   [tuple or None]: (ball positions, paddle x) at the start of
+                the last physics tick.  None if no tick has run since the last
+                serve or the last call to endTicks.
+        _saucer [Sound]: the sound of the ball hitting a brick
+        _cup    [Sound]: the sound of the ball hitting the paddle
     """
     
     
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getBricks(self):
-        """Returns: list of bricks"""
-        return self._bricks
+        """Returns: the bricks still remaining.
+
+        The result is a BrickField; len() of it is the number of bricks
+        left."""
+        return self._sim.getBricks()
+    
+    def hasBricks(self):
+        """Returns: True if there are bricks left"""
+        return not self._sim.getBricks().isEmpty()
     
     def getScore(self):
         """Returns: player's score"""
-        return self._score
+        return self._sim.getScore()
+    
+    def getTries(self):
+        """Returns: the number of tries left"""
+        return self._sim.getTries()
+    
+    def getSubsteps(self):
+        """Returns: the number of sub-steps the balls took in the last call
+        to updateBall.  It is at most BALL_MAX_SUBSTEPS."""
+        return self._sim.getSubsteps()
+    
+    def getStateHash(self):
+        """Returns: a hash of the state of the game, as a string of hex
+        digits.
+
+        Two games made with the same seed and played with the same actions
+        have the same hash, so replays and games in lockstep can be checked
+        by comparing hashes.  In fixed-point mode the hash is also the same
+        on every machine (see Simulation.getStateHash)."""
+        return self._sim.getStateHash()
+    
+    def waitingForServe(self):
+        """Returns: True if no ball has been served in this game yet"""
+        return self._sim.waitingForServe()
+    
+    def ballLost(self):
+        """Returns: True if balls have been served but none are left in play"""
+        return self._sim.ballLost()
     
     # INITIALIZER (standard form) TO CREATE PADDLES AND BRICKS
-    def __init__(self,tries):
+    def __init__(self,tries,seed=None,fixed=False):
         """Initializes the paddle and full set of bricks.
         The default brick pattern is ten rows of ten bricks.
         Every two rows is a different color, summing to a total
         of five colors: red (top), orange, yellow, green, and
-        cyan (bottom)."""
+        cyan (bottom).
+        
+        Parameter seed: The seed of the random ball velocities, or None for
+        an unpredictable game
+        Precondition: seed is a hashable value, such as an int, or None
+        
+        Parameter fixed: True to play the game in fixed-point mode, so that
+        it plays out the same on every machine (see Simulation)
+        Precondition: fixed is a bool"""
         assert isinstance(tries,int) and tries>=0
-        self._brickno = BRICKS_IN_ROW*BRICK_ROWS
-        self._score=0
-        self._ball=None
-        self._tries=tries
+        self._sim=Simulation(tries,seed,fixed)
+        self._views=[]
+        self._color=colormodel.CYAN
+        self._shown=None
+        self._prev=None
         self._paddle=Paddle(GAME_WIDTH/2,PADDLE_OFFSET+PADDLE_HEIGHT/2,
                             PADDLE_WIDTH,PADDLE_HEIGHT,colormodel.BLACK)
-        self._bricks=[]
-        row_no=1     # row number (starting from top row)
-        brick_no=1   # brick number in each row (from left to right)
-        left=BRICK_SEP_H/2
-        y=GAME_HEIGHT-BRICK_Y_OFFSET-(BRICK_HEIGHT/2)
-        while row_no<=BRICK_ROWS:
-            if row_no%10<=2 and row_no%10>0:
-                fillcolor=colormodel.RED
-            elif row_no%10>=3 and row_no%10<=4:
-                fillcolor=colormodel.ORANGE
-            elif row_no%10>=5 and row_no%10<=6:
-                fillcolor=colormodel.YELLOW
-            elif row_no%10>=7 and row_no%10<=8:
-                fillcolor=colormodel.GREEN
-            elif row_no%10>=9 or row_no%10==0:
-                fillcolor=colormodel.CYAN
-            while brick_no<=BRICKS_IN_ROW:
-                self._bricks.append(Brick(left,y,BRICK_WIDTH,
-                                          BRICK_HEIGHT,fillcolor))
-                left=left+BRICK_WIDTH+BRICK_SEP_H
-                brick_no=brick_no+1
-            left=BRICK_SEP_H/2
-            brick_no=1
-            y=y-BRICK_HEIGHT-BRICK_SEP_V
-            row_no=row_no+1
+        bricks=self._sim.getBricks()
+        self._bricks=GBrickBatch(boxes=[bricks.getBox(i) for i in bricks],
+                                 colors=[bricks.getColor(i) for i in bricks])
+        self._saucer=Sound('saucer1.wav')
+        self._cup=Sound('cup1.wav')
 
     # UPDATE METHODS TO MOVE PADDLE, SERVE AND MOVE THE BALL
     def serveBall(self):
@@ -115,9 +154,34 @@ class Play(object):
         vertical velocities right when the countdown ends (meaning
         right when the state switches to STATE_ACTIVE). Because
         the velocity components are random, the ball moves in a
-        different direction each time a new one is served."""
-        self._ball=Ball(x=GAME_WIDTH/2,y=GAME_HEIGHT/2,width=BALL_DIAMETER/2,
-                        height=BALL_DIAMETER/2,fillcolor=colormodel.CYAN)
+        different direction each time a new one is served.
+        
+        BALLS_PER_SERVE balls are served at once, each in its own
+        direction."""
+        self._prev=None
+        self._sim.serveBall()
+    
+    def loseTry(self):
+        """Uses up one try, if there are any left."""
+        self._sim.loseTry()
+    
+    def beginTick(self):
+        """Starts a physics tick.
+        
+        Breakout calls this before each fixed time step.  It remembers the
+        positions of the balls and paddle so that draw can interpolate
+        between this tick and the next one."""
+        self._prev=(self._sim.getBalls().getPositions().copy(),
+                    self._sim.getPaddle().x)
+    
+    def endTicks(self):
+        """Stops interpolating the drawing between physics ticks.
+        
+        Breakout calls this while no physics ticks run (such as when the
+        game is paused), so that draw shows the balls and paddle where they
+        are instead of blending in where they were a tick ago.  The next
+        call to beginTick starts interpolating again."""
+        self._prev=None
     
     def updatePaddle(self,input):
         """Called in Breakout whenever the state
@@ -132,74 +196,125 @@ class Play(object):
         Parameter input: user input
         Precondition: input is a GInput object"""
         assert isinstance(input,GInput)
-        dx=0
-        colors=[colormodel.RED,colormodel.ORANGE,
-                colormodel.YELLOW,colormodel.GREEN,colormodel.CYAN]
+        action=0
         if input.is_key_down('left'):
-            dx-=10
+            action-=1
         if input.is_key_down('right'):
-            dx+=10
-        if self._paddle.x+dx+PADDLE_WIDTH/2>=GAME_WIDTH:
-            self._paddle.right=min(self._paddle.right,GAME_WIDTH)
-        elif self._paddle.x+dx-PADDLE_WIDTH/2<=0:
-            self._paddle.left=max(self._paddle.left,0)
-        else:
-            self._paddle.x=self._paddle.x+dx            
+            action+=1
+        self._sim.movePaddle(action)
         
     def updateBall(self):
         """Called in Breakout whenever the state of
         the game is STATE_ACTIVE. This method simply
-        moves the ball by adding the ball's velocity
+        moves the balls by adding each ball's velocity
         components to its coordinates in the window.
-        It also causes the ball to bounce upon interaction
+        It also causes the balls to bounce upon interaction
         with the paddle and the bricks, and each bounce
-        upon a brick causes the brick to disappear."""
-        saucer1=Sound('saucer1.wav')
-        cup1=Sound('cup1.wav')
-        self._ball.x=self._ball.x+self._ball._vx
-        self._ball.y=self._ball.y+self._ball._vy
-        if self._paddle.collides(self._ball):
-            cup1.play()
-            self._ball._vy=(-self._ball._vy)
-        for x in self._bricks:
-            if x.collides(self._ball):
-                self._ball.incspeed()
-                self._score=self._score+10
-                saucer1.play()
-                self._bricks.remove(x)
-                self._ball._vy=(-self._ball._vy)
-        self.bounceEdge()
+        upon a brick causes the brick to disappear.
+        Balls that fall out of the bottom of the window
+        are taken out of play.
+
+        The physics and the score are done by the Simulation; this method
+        plays the sounds for the collisions it records.  A fast ball near
+        the paddle, a brick or a wall is moved in several sub-steps in one
+        tick (see getSubsteps)."""
+        if self._sim.stepBalls():
+            self._saucer.play()
+        if self._sim.getEvents().getPaddleHits():
+            self._cup.play()
         
     # DRAW METHOD TO DRAW THE PADDLES, BALL, AND BRICKS
     
-    def draw(self,view):
-        """Draws the paddle, the ball, and the bricks,
+    def draw(self,view,alpha=1.0):
+        """Draws the paddle, the balls, and the bricks,
         regardless of how many bricks there are remaining.
         
+        The balls and paddle are drawn at the fraction alpha of the way from
+        their positions at the start of the last physics tick to their
+        current positions.  This keeps the motion smooth when the display
+        runs at a different rate than the physics.
+        
+        The drawables are attached to the view (see GView.attach) rather
+        than drawn anew every frame: the bricks (all in one GBrickBatch) at
+        the bottom, then the paddle, then the balls.  Each frame only moves
+        them, attaches the balls just served, detaches the balls lost, and
+        removes the bricks destroyed since the last frame from the batch.
+        Call detach to take them off the view once the game is over.
+        
+        Parameter view: game window
+        Precondition: view is a GView object
+        
+        Parameter alpha: The interpolation factor
+        Precondition: alpha is a float in 0..1"""
+        assert isinstance(view,GView)
+        pos=self._sim.getBalls().getPositions()
+        self._paddle.x=self._sim.getPaddle().x
+        if alpha<1.0 and self._prev!=None:
+            prev,px=self._prev
+            self._paddle.x=px+(self._paddle.x-px)*alpha
+            if prev.shape==pos.shape:
+                pos=prev+(pos-prev)*alpha
+        self._syncViews(view,pos)
+        self._syncBricks(view)
+        view.attach(self._paddle,1)
+    
+    def detach(self,view):
+        """Takes the paddle, the balls and the bricks off the view.
+        
         Parameter view: game window
         Precondition: view is a GView object"""
         assert isinstance(view,GView)
-        for x in self._bricks:
-            x.draw(view)
-        self._paddle.draw(view)
-        if self._ball!=None:
-            self._ball.draw(view)
+        view.detach(self._paddle)
+        for ball in self._views:
+            view.detach(ball)
+        view.detach(self._bricks)
       
     # HELPER METHODS FOR PHYSICS AND COLLISION DETECTION
     
-    def bounceEdge(self):
-        """Adjusts the ball's horizontal and vertical velocities
-        so that the ball bounces when it reaches each edge of
-        the window"""
-        if self._ball._vy>0:
-            if self._ball.y>=GAME_HEIGHT:
-                self._ball._vy=(-self._ball._vy)
-        if self._ball._vx>0:
-            if self._ball.right>=GAME_WIDTH:
-                self._ball._vx=(-self._ball._vx)
-        if self._ball._vx<0:
-            if self._ball.left<=0:
-                self._ball._vx=(-self._ball._vx)
+    def _syncBricks(self,view):
+        """Attaches the brick batch, and removes the bricks destroyed from it.
+        
+        Bricks are only ever destroyed, so the batch is up to date as long
+        as it has as many rectangles left as there are bricks alive.  The
+        batch is alone in a cached layer of the view (see
+        GView.cache_layer), which is only drawn again when a brick is
+        removed.  The bricks destroyed since the last frame are removed with
+        one call to GBrickBatch.remove_many, so the mesh gets its vertices
+        once per frame however many there are.
+        
+        Parameter view: game window
+        Precondition: view is a GView object"""
+        view.cache_layer(0)
+        view.attach(self._bricks,0)
+        bricks=self._sim.getBricks()
+        if self._bricks.count==len(bricks):
+            return
+        self._bricks.remove_many(np.flatnonzero(~bricks.getAlive()))
+    
+    def _syncViews(self,view,pos):
+        """Moves the ball drawables to the given positions, creating and
+        attaching or detaching drawables so that there is one per ball.
+        
+        Parameter view: game window
+        Precondition: view is a GView object
+        
+        Parameter pos: The positions of the balls
+        Precondition: pos is a float array of shape (n,2)"""
+        while len(self._views)<len(pos):
+            self._views.append(Ball(x=GAME_WIDTH/2,y=GAME_HEIGHT/2,
+                                    width=BALL_DIAMETER/2,
+                                    height=BALL_DIAMETER/2,
+                                    fillcolor=self._color))
+            view.attach(self._views[-1],2)
+        for ball in self._views[len(pos):]:
+            view.detach(ball)
+        del self._views[len(pos):]
+        for k in range(len(pos)):
+            self._views[k].x=float(pos[k,0])
+            self._views[k].y=float(pos[k,1])
+            if self._shown!=self._color:
+                self._views[k].fillcolor=self._color
+        self._shown=self._color
                 
     # ADD ANY ADDITIONAL METHODS (FULLY SPECIFIED) HER
     
@@ -212,9 +327,7 @@ class Play(object):
         ball turns green. Once the last green brick disappears,
         the ball turns yellow. And once the last yellow brick disappears,
         the ball turns red."""
-        colors=[colormodel.RED,colormodel.ORANGE,colormodel.YELLOW,
-                colormodel.GREEN,colormodel.CYAN]
-        for x in self._bricks:
-            if x.fillcolor not in colors:
-                self._ball.fillcolor=x.fillcolor
+        color=self._sim.getBricks().getLastColor()
+        if color is not None:
+            self._color=color
 
@@ -0,0 +1,589 @@
+"""Software rasterizer module for Breakout
+
+This module draws the game into a NumPy array of pixels, without Kivy, a
+window or a GL context.  It is meant for pixel observations for agents, and
+for comparing frames against saved images in regression tests:
+
+    frame = Framebuffer()
+    frame.drawSimulation(sim)
+    pixels = frame.getPixels()
+
+The pixels are a uint8 array of shape (height,width,3) that every drawing
+writes into; a program that wants to keep a frame must copy it.  Row 0 is the
+top of the window, as in an image file, while the shapes are given in the
+coordinates of the game, with y going up.
+
+A pixel is covered by a shape when its center is inside the shape.  A
+rectangle that is not rotated is filled with a single slice assignment, and
+any other shape with a mask computed over its bounding box, so there is no
+Python loop over the pixels.  Colors with an alpha below 1 are blended with
+the pixels already there.
+
+The frame keeps a list of the blocks of pixels that were drawn into (its
+damage), so that a program that encodes or sends the frames can skip the parts
+that did not change.  Between two frames of a game, drawSimulation only
+repaints the blocks under the paddle and the balls, where they were and where
+they are now, those of the bricks destroyed in between, and those of any other
+shape drawn in between.
+
+The shapes of game2d (GRectangle, GEllipse, GPath, GTriangle and GPolygon)
+can be drawn with drawObject, moved, rotated and scaled by their matrix.  The
+shapes are only looked at through their attributes, so this module does not
+import game2d (or Kivy).  It only accesses constants.py (and colormodel, for
+the colors)."""
+import math
+import numpy as np
+import colormodel
+from constants import *
+
+
+# The number of segments in the outline of an ellipse
+_ellipse_segments = 32
+
+# The shapes of game2d that drawObject can draw, most specific first
+_shape_names = ('GTriangle','GPolygon','GPath','GEllipse','GRectangle')
+
+
+def _shape_name(obj):
+    """Returns: the name of the kind of game2d shape obj is, or None
+
+    This is the first name in _shape_names that is the name of the class of
+    obj or of one of its base classes, so a GImage is a 'GRectangle'.
+
+    Parameter obj: The shape
+    Precondition: NONE"""
+    names=[cls.__name__ for cls in type(obj).__mro__]
+    for name in _shape_names:
+        if name in names:
+            return name
+    return None
+
+
+def _paint_color(color):
+    """Returns: the color as (rgb,alpha), where rgb is a uint8 array of the
+    red, green and blue in 0..255 and alpha is a float in 0..1
+
+    Parameter color: The color
+    Precondition: color is a colormodel RGB or HSV, or a sequence of 3 or 4
+    numbers in 0..1"""
+    if isinstance(color,(colormodel.RGB,colormodel.HSV)):
+        color=color.glColor()
+    rgb=np.round(np.asarray(color[:3],dtype=float)*255).astype(np.uint8)
+    alpha=float(color[3]) if len(color)>3 else 1.0
+    return rgb,alpha
+
+
+# The color of the window behind the game, as in GView
+_background = _paint_color(colormodel.WHITE)
+
+# The grids of strips of the bricks made so far, by frame and field size
+_brick_layouts = {}
+
+
+def _brick_layout(bricks,width,height):
+    """Returns: (xs,ys,rows,cols,rgb), the grid of strips of the bricks in a
+    frame of the given size.
+
+    The bricks are laid out in a grid (see BrickField), so the first and last
+    pixel columns of the bricks cut the frame into vertical strips, their
+    pixel rows cut it into horizontal strips, and each brick fills one cell of
+    strips.  xs and ys are the int arrays of the edges of the strips, from 0
+    to the width and from 0 to the height of the frame.  Brick i fills the
+    cell in strip rows[i] from the top and strip cols[i] from the left, or
+    covers no pixel if rows[i] is -1.  rgb is the (n,3) uint8 array of the
+    colors of the bricks, drawn on the background.  The bricks cover the same
+    pixels as with Framebuffer.fillRect.
+
+    Every game has the same brick layout, from constants.py, so the result
+    is only worked out once for each size of frame and field, and shared by
+    all of the frames.
+
+    Parameter bricks: The bricks
+    Precondition: bricks is a BrickField
+
+    Parameter width, height: The size of the frame
+    Precondition: width and height are ints > 0"""
+    n=len(bricks.getAlive())
+    key=(width,height,n)
+    if key in _brick_layouts:
+        return _brick_layouts[key]
+    boxes=np.array([bricks.getBox(i) for i in range(n)]).reshape(n,4)
+    left,bottom,right,top=boxes.T
+    # The pixels of each brick, as in Framebuffer._cols and _rows
+    col0=np.clip(np.ceil(left-0.5).astype(int),0,width)
+    col1=np.clip(np.ceil(right-0.5).astype(int),col0,width)
+    row0=np.clip(np.floor(height-0.5-top).astype(int)+1,0,height)
+    row1=np.clip(np.floor(height-0.5-bottom).astype(int)+1,row0,height)
+    xs=np.unique(np.concatenate(([0,width],col0,col1)))
+    ys=np.unique(np.concatenate(([0,height],row0,row1)))
+    rows=np.where((col0<col1)&(row0<row1),np.searchsorted(ys,row0),-1)
+    cols=np.searchsorted(xs,col0)
+    rgb=np.empty((n,3),dtype=np.uint8)
+    for i in range(n):
+        color,alpha=_paint_color(bricks.getColor(i))
+        if alpha<1.0:
+            color=np.round(_background[0]*(1.0-alpha)+
+                           color*alpha).astype(np.uint8)
+        rgb[i]=color
+    _brick_layouts[key]=(xs,ys,rows,cols,rgb)
+    return _brick_layouts[key]
+
+
+class Framebuffer(object):
+    """An instance is a frame of pixels that shapes are drawn into.
+
+    The methods that draw take the color of the shape as a colormodel color
+    or a list of floats, as the attributes of a GObject do.
+
+    The bricks change far less often than the paddle and the balls, so
+    drawSimulation keeps a copy of the frame with only the bricks drawn.  A
+    new frame is made by copying back the blocks under the paddle and balls
+    of the last frame, and drawing them again where they are now.
+
+    A block of pixels is given as (left,top,right,bottom), the columns left
+    to right-1 and the rows top to bottom-1, with row 0 at the top.
+
+    INSTANCE ATTRIBUTES:
+        _pixels [uint8 array of shape (height,width,3)]: the frame
+        _xs     [float array of shape (width,)]: the x of the center of
+                each column of pixels
+        _ys     [float array of shape (height,)]: the y of the center of
+                each row of pixels
+        _wall   [uint8 array of shape (height,width,3) or None]: the frame
+                with only the bricks drawn, or None if no bricks were drawn
+                yet
+        _alive  [bool array or None]: the bricks drawn in _wall (see
+                BrickField.getAlive), or None if _wall is not drawn yet
+        _damage [list of blocks]: the blocks drawn into since the last call to
+                drawSimulation or resetDamage
+        _sprites [list of blocks or None]: the blocks that differ from _wall:
+                those drawn into by the last call to drawSimulation after the
+                bricks, and those drawn into since.  None if the frame was
+                cleared since, or if drawSimulation was never called
+    """
+
+    # GETTERS
+    def getPixels(self):
+        """Returns: the uint8 array of shape (height,width,3) of the pixels.
+
+        This is the array drawn into, not a copy."""
+        return self._pixels
+
+    def getWidth(self):
+        """Returns: the width of the frame in pixels"""
+        return self._pixels.shape[1]
+
+    def getHeight(self):
+        """Returns: the height of the frame in pixels"""
+        return self._pixels.shape[0]
+
+    def getDamage(self):
+        """Returns: the list of the blocks of pixels drawn into since the last
+        call to drawSimulation or resetDamage.
+
+        Each block is a tuple (left,top,right,bottom) of ints: the columns
+        left to right-1 and the rows top to bottom-1, with row 0 at the top of
+        the frame.  The blocks may overlap, and the pixels outside of them
+        are the same as before.  After drawSimulation, this is the blocks
+        that changed since the frame before it.
+
+        This is the list kept by the frame, not a copy."""
+        return self._damage
+
+    # INITIALIZER
+    def __init__(self,width=GAME_WIDTH,height=GAME_HEIGHT):
+        """Initializes a white frame.
+
+        Parameter width: The width of the frame in pixels
+        Precondition: width is an int > 0
+
+        Parameter height: The height of the frame in pixels
+        Precondition: height is an int > 0"""
+        assert isinstance(width,int) and width>0
+        assert isinstance(height,int) and height>0
+        self._pixels=np.empty((height,width,3),dtype=np.uint8)
+        self._xs=np.arange(width)+0.5
+        self._ys=height-0.5-np.arange(height)
+        self._wall=None
+        self._alive=None
+        self._damage=[]
+        self._sprites=None
+        self.clear()
+
+    # DRAWING METHODS
+    def clear(self,color=colormodel.WHITE):
+        """Fills the whole frame with a color (white by default, like GView).
+
+        Parameter color: The color
+        Precondition: color is a colormodel color or a list of 3 or 4 floats
+        in 0..1"""
+        # Filling one row and copying it is much faster than broadcasting the
+        # color over the whole frame
+        self._pixels[0]=_paint_color(color)[0]
+        self._pixels[1:]=self._pixels[0]
+        self._damage=[self._whole()]
+        self._sprites=None
+
+    def resetDamage(self):
+        """Empties the list of the blocks drawn into (see getDamage)."""
+        self._damage=[]
+
+    def fillRect(self,left,bottom,right,top,color):
+        """Fills an axis-aligned rectangle.
+
+        Parameter left, bottom, right, top: The edges of the rectangle
+        Precondition: they are numbers, with left<=right and bottom<=top
+
+        Parameter color: The color
+        Precondition: color is a colormodel color or a list of 3 or 4 floats
+        in 0..1"""
+        self._paint(self._rows(bottom,top),self._cols(left,right),None,
+                    _paint_color(color))
+
+    def fillEllipse(self,x,y,width,height,color):
+        """Fills an axis-aligned ellipse.
+
+        Parameter x, y: The center of the ellipse
+        Precondition: x and y are numbers (int or float)
+
+        Parameter width, height: The size of the ellipse
+        Precondition: width and height are numbers > 0
+
+        Parameter color: The color
+        Precondition: color is a colormodel color or a list of 3 or 4 floats
+        in 0..1"""
+        rx=width/2.0
+        ry=height/2.0
+        rows=self._rows(y-ry,y+ry)
+        cols=self._cols(x-rx,x+rx)
+        dx=(self._xs[cols]-x)/rx
+        dy=(self._ys[rows]-y)/ry
+        mask=dy[:,np.newaxis]**2+dx[np.newaxis,:]**2<=1.0
+        self._paint(rows,cols,mask,_paint_color(color))
+
+    def fillTriangles(self,points,color):
+        """Fills the union of some triangles.
+
+        Each pixel is painted once, even where the triangles overlap.
+
+        Parameter points: The corners of the triangles
+        Precondition: points is a float array of shape (n,3,2)
+
+        Parameter color: The color
+        Precondition: color is a colormodel color or a list of 3 or 4 floats
+        in 0..1"""
+        self._fillShapes(np.asarray(points,dtype=float).reshape(-1,3,2),
+                         np.zeros((0,3)),_paint_color(color))
+
+    def drawLine(self,points,width,color,closed=False):
+        """Draws a path of line segments with round joins.
+
+        Parameter points: The points of the path
+        Precondition: points is a float array of shape (n,2), n>=2
+
+        Parameter width: The width of the line
+        Precondition: width is a number >= 0
+
+        Parameter color: The color
+        Precondition: color is a colormodel color or a list of 3 or 4 floats
+        in 0..1
+
+        Parameter closed: True to join the last point back to the first
+        Precondition: closed is a bool"""
+        points=np.asarray(points,dtype=float).reshape(-1,2)
+        if width<=0 or len(points)<2:
+            return
+        start=points if closed else points[:-1]
+        end=np.roll(points,-1,axis=0) if closed else points[1:]
+        d=end-start
+        length=np.hypot(d[:,0],d[:,1])
+        keep=length>0
+        side=np.column_stack((-d[keep,1],d[keep,0]))/length[keep,np.newaxis]
+        side=side*(width/2.0)
+        a=start[keep]+side
+        b=end[keep]+side
+        c=end[keep]-side
+        e=start[keep]-side
+        tris=np.concatenate((np.stack((a,b,c),axis=1),
+                             np.stack((c,e,a),axis=1)))
+        discs=np.column_stack((points,np.full(len(points),width/2.0)))
+        self._fillShapes(tris,discs,_paint_color(color))
+
+    def drawObject(self,obj):
+        """Draws a shape from game2d, moved, rotated and scaled by its matrix.
+
+        A GRectangle (including a GImage or GLabel, which are drawn as their
+        background rectangle), a GEllipse, a GPath, a GTriangle and a
+        GPolygon are drawn with their fill and their border, like they are
+        drawn by a GView.
+
+        The kind of shape is found from the name of its class (see
+        _shape_name), and its matrix is only used through the method
+        _transform of GMatrix, so this does not import game2d.
+
+        Parameter obj: The shape to draw
+        Precondition: obj is a GRectangle, GEllipse, GPath, GTriangle or
+        GPolygon"""
+        name=_shape_name(obj)
+        assert name is not None, ('%s is not a shape that can be drawn' %
+                                  repr(obj))
+        matrix=obj.matrix
+        origin=np.array(matrix._transform(0,0)[:2],dtype=float)
+        ux=np.array(matrix._transform(1,0)[:2],dtype=float)-origin
+        uy=np.array(matrix._transform(0,1)[:2],dtype=float)-origin
+        shift=origin
+        axes=np.column_stack((ux,uy))
+        scale=math.sqrt(abs(np.linalg.det(axes)))
+        if name in ('GTriangle','GPolygon'):
+            points=np.array(obj.points,dtype=float).reshape(-1,2)
+            if name=='GTriangle':
+                tris=points[np.newaxis]
+            else:
+                fan=np.zeros((len(points),3,2))
+                fan[:,1]=points
+                fan[:,2]=np.roll(points,-1,axis=0)
+                tris=fan
+            self.fillTriangles(tris.dot(axes.T)+shift,obj.fillcolor)
+            self.drawLine(points.dot(axes.T)+shift,obj.linewidth*scale,
+                          obj.linecolor,True)
+        elif name=='GPath':
+            points=np.array(obj.points,dtype=float).reshape(-1,2)
+            self.drawLine(points.dot(axes.T)+shift,obj.linewidth*scale,
+                          obj.linecolor)
+        elif name=='GEllipse':
+            rx=obj.width/2.0
+            ry=obj.height/2.0
+            if axes[0,1]==0 and axes[1,0]==0:
+                self.fillEllipse(shift[0],shift[1],2*rx*abs(axes[0,0]),
+                                 2*ry*abs(axes[1,1]),obj.fillcolor)
+            else:
+                self._fillAffine(axes,shift,rx,ry,obj.fillcolor)
+            if obj.linewidth>0:
+                angle=np.linspace(0,2*np.pi,_ellipse_segments,endpoint=False)
+                points=np.column_stack((rx*np.cos(angle),ry*np.sin(angle)))
+                self.drawLine(points.dot(axes.T)+shift,obj.linewidth*scale,
+                              obj.linecolor,True)
+        else:
+            rx=obj.width/2.0
+            ry=obj.height/2.0
+            points=np.array([[-rx,-ry],[rx,-ry],[rx,ry],[-rx,ry]])
+            points=points.dot(axes.T)+shift
+            if axes[0,1]==0 and axes[1,0]==0:
+                left,bottom=points.min(axis=0)
+                right,top=points.max(axis=0)
+                self.fillRect(left,bottom,right,top,obj.fillcolor)
+            else:
+                self.fillTriangles(points[np.array([[0,1,2],[2,3,0]])],
+                                   obj.fillcolor)
+            if obj.linewidth>0:
+                self.drawLine(points,obj.linewidth*scale,obj.linecolor,True)
+
+    def drawSimulation(self,sim):
+        """Draws a frame of the game, as Play would draw it.
+
+        The frame is cleared, then the bricks still alive, the paddle and the
+        balls are drawn.  The balls have the color of the lowest bricks left,
+        as in Play.
+
+        Only the blocks that change are drawn.  The blocks under the paddle
+        and the balls of the last frame are copied back from the copy with
+        only the bricks drawn.  Bricks destroyed since are painted over with
+        the background, in the frame and in the copy.  Then the paddle and
+        the balls are drawn where they are now.  Any shape drawn into the
+        frame since the last call (with drawObject, say) is wiped the same
+        way, by copying back the blocks it was drawn into.  The whole frame
+        is drawn again only when a brick has come back (a new game), or when
+        the frame was cleared since the last call.  This assumes that every
+        game has the same brick layout, from constants.py.
+
+        Afterwards, getDamage is the list of the blocks that were drawn.
+
+        Parameter sim: The game to draw
+        Precondition: sim is a Simulation"""
+        bricks=sim.getBricks()
+        alive=bricks.getAlive()
+        if (self._alive is None or len(self._alive)!=len(alive) or
+            (alive&~self._alive).any()):
+            self._drawBricks(bricks)
+            self._alive=alive.copy()
+            self._sprites=None
+        whole=self._sprites is None
+        if whole:
+            np.copyto(self._pixels,self._wall)
+            self._damage=[]
+        else:
+            for left,top,right,bottom in self._sprites:
+                self._pixels[top:bottom,left:right]=self._wall[top:bottom,
+                                                               left:right]
+            self._damage=list(self._sprites)
+        # Only the blocks of the paddle and balls differ from _wall (the
+        # lost bricks are painted in both)
+        self._sprites=None
+        lost=np.flatnonzero(self._alive&~alive).tolist()
+        for i in lost:
+            left,bottom,right,top=bricks.getBox(i)
+            rows=self._rows(bottom,top)
+            cols=self._cols(left,right)
+            self._paint(rows,cols,None,_background)
+            self._wall[rows,cols]=self._pixels[rows,cols]
+        self._alive[lost]=False
+        start=len(self._damage)
+        paddle=sim.getPaddle()
+        self.fillRect(paddle.left,paddle.bottom,paddle.right,paddle.top,
+                      colormodel.BLACK)
+        color=bricks.getLastColor()
+        if color is None:
+            color=colormodel.CYAN
+        for x,y in sim.getBalls().getPositions().tolist():
+            self.fillEllipse(x,y,BALL_DIAMETER/2,BALL_DIAMETER/2,color)
+        self._sprites=self._damage[start:]
+        if whole:
+            self._damage=[self._whole()]
+
+    # HELPER METHODS
+    def _drawBricks(self,bricks):
+        """Draws the bricks still alive on the background, into _wall.
+
+        The bricks are in a grid (see _brick_layout), so each brick fills one
+        cell of a grid of strips.  The cells are colored in a small array,
+        one entry per cell, which is then scaled up to pixels with np.repeat.
+        So the whole wall is filled by a few array operations, however many
+        bricks there are.
+
+        Parameter bricks: The bricks
+        Precondition: bricks is a BrickField"""
+        alive=bricks.getAlive()
+        height,width=self._pixels.shape[:2]
+        xs,ys,rows,cols,rgb=_brick_layout(bricks,width,height)
+        cells=np.empty((len(ys)-1,len(xs)-1,3),dtype=np.uint8)
+        cells[:]=_background[0]
+        live=alive&(rows>=0)
+        cells[rows[live],cols[live]]=rgb[live]
+        # Widening the few rows of cells first, and then copying whole rows
+        # of pixels, is much faster than the other way around.  The result
+        # becomes the wall, rather than being copied into it, as writing to
+        # a new array the size of the frame costs as much as filling it
+        self._wall=np.repeat(np.repeat(cells,np.diff(xs),axis=1),
+                             np.diff(ys),axis=0)
+
+    def _whole(self):
+        """Returns: the block of all the pixels of the frame"""
+        return (0,0,self._pixels.shape[1],self._pixels.shape[0])
+
+    def _cols(self,left,right):
+        """Returns: the slice of the columns whose centers are in [left,right)
+
+        Parameter left, right: The horizontal extent
+        Precondition: left and right are numbers"""
+        width=self._pixels.shape[1]
+        start=min(max(int(math.ceil(left-0.5)),0),width)
+        stop=min(max(int(math.ceil(right-0.5)),start),width)
+        return slice(start,stop)
+
+    def _rows(self,bottom,top):
+        """Returns: the slice of the rows whose centers are in [bottom,top)
+
+        Parameter bottom, top: The vertical extent
+        Precondition: bottom and top are numbers"""
+        height=self._pixels.shape[0]
+        start=min(max(int(math.floor(height-0.5-top))+1,0),height)
+        stop=min(max(int(math.floor(height-0.5-bottom))+1,start),height)
+        return slice(start,stop)
+
+    def _fillShapes(self,tris,discs,paint):
+        """Fills the union of some triangles and discs.
+
+        The coverage of every shape goes into one mask over the bounding box
+        of all of them, which is painted once.
+
+        Parameter tris: The corners of the triangles
+        Precondition: tris is a float array of shape (n,3,2)
+
+        Parameter discs: The center and radius of each disc
+        Precondition: discs is a float array of shape (m,3)
+
+        Parameter paint: The color
+        Precondition: paint is a color as returned by _paint_color"""
+        if len(tris)==0 and len(discs)==0:
+            return
+        low=np.vstack((tris.reshape(-1,2),discs[:,:2]-discs[:,2:]))
+        high=np.vstack((tris.reshape(-1,2),discs[:,:2]+discs[:,2:]))
+        rows=self._rows(low[:,1].min(),high[:,1].max())
+        cols=self._cols(low[:,0].min(),high[:,0].max())
+        xs=self._xs[cols][np.newaxis,:]
+        ys=self._ys[rows][:,np.newaxis]
+        mask=np.zeros((len(ys),xs.shape[1]),dtype=bool)
+        if mask.size==0:
+            return
+        for tri in tris:
+            # The edge functions of a counter-clockwise triangle are >= 0
+            area=np.cross(tri[1]-tri[0],tri[2]-tri[0])
+            if area==0:
+                continue
+            sign=1.0 if area>0 else -1.0
+            inside=np.ones(mask.shape,dtype=bool)
+            for k in range(3):
+                p=tri[k]
+                q=tri[(k+1)%3]
+                edge=(q[0]-p[0])*(ys-p[1])-(q[1]-p[1])*(xs-p[0])
+                inside&=sign*edge>=0
+            mask|=inside
+        for x,y,r in discs.tolist():
+            mask|=(xs-x)**2+(ys-y)**2<=r*r
+        self._paint(rows,cols,mask,paint)
+
+    def _fillAffine(self,axes,shift,rx,ry,color):
+        """Fills an ellipse given in the local coordinates of a shape.
+
+        Each pixel center is taken back to the local coordinates, where the
+        ellipse is axis-aligned and centered at the origin.
+
+        Parameter axes: The linear part of the transform of the shape
+        Precondition: axes is an invertible float array of shape (2,2)
+
+        Parameter shift: The translation of the transform of the shape
+        Precondition: shift is a float array of shape (2,)
+
+        Parameter rx, ry: The radii of the ellipse
+        Precondition: rx and ry are numbers > 0
+
+        Parameter color: The color
+        Precondition: color is a colormodel color or a list of 3 or 4 floats
+        in 0..1"""
+        # The bounding box of the transformed ellipse
+        half=np.hypot(axes[:,0]*rx,axes[:,1]*ry)
+        rows=self._rows(shift[1]-half[1],shift[1]+half[1])
+        cols=self._cols(shift[0]-half[0],shift[0]+half[0])
+        inverse=np.linalg.inv(axes)
+        dx=self._xs[cols][np.newaxis,:]-shift[0]
+        dy=self._ys[rows][:,np.newaxis]-shift[1]
+        lx=inverse[0,0]*dx+inverse[0,1]*dy
+        ly=inverse[1,0]*dx+inverse[1,1]*dy
+        self._paint(rows,cols,(lx/rx)**2+(ly/ry)**2<=1.0,_paint_color(color))
+
+    def _paint(self,rows,cols,mask,paint):
+        """Paints a block of pixels, or the pixels of a mask over it.
+
+        Parameter rows, cols: The block of pixels
+        Precondition: rows and cols are slices of the rows and columns
+
+        Parameter mask: The pixels of the block to paint, or None for all
+        Precondition: mask is None or a bool array the shape of the block
+
+        Parameter paint: The color
+        Precondition: paint is a color as returned by _paint_color"""
+        if rows.start==rows.stop or cols.start==cols.stop:
+            return
+        block=(cols.start,rows.start,cols.stop,rows.stop)
+        self._damage.append(block)
+        if self._sprites is not None:
+            self._sprites.append(block)
+        rgb,alpha=paint
+        block=self._pixels[rows,cols]
+        if alpha<1.0:
+            pixels=block[mask] if mask is not None else block
+            rgb=np.round(pixels*(1.0-alpha)+rgb*alpha).astype(np.uint8)
+        if mask is not None:
+            block[mask]=rgb
+        else:
+            block[:]=rgb
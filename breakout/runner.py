@@ -0,0 +1,279 @@
+"""Seed sweep module for Breakout
+
+This module plays many seeded games of Breakout without a window, spread over
+several processes, and gathers their results.  It is meant for checking how a
+change to the rules (such as the serve velocities or the speed-up on each
+brick) affects the game over thousands of games:
+
+    results = sweep(range(10000))
+    print results.getMeanScore(), results.getWinRate()
+
+Each worker process keeps one Simulation, which it resets for every seed it
+plays.  The workers send each result back as soon as the game ends, through a
+queue of bounded size, so a slow reader holds the workers back instead of
+letting the results pile up in memory.
+
+The games are played by a policy: a function that is given the Simulation and
+returns the action for the next tick.  The default policy, track, follows the
+lowest ball with the paddle.  A policy must be a function defined at the top
+level of a module, so that it can be sent to the workers.
+
+Like the models, this module only accesses constants.py (and the
+simulation)."""
+import multiprocessing
+import numpy as np
+from constants import *
+from simulation import Simulation
+
+
+def track(sim):
+    """Returns: the action that moves the paddle towards the lowest ball.
+
+    The paddle stays still when it is within PADDLE_SPEED of the ball, or
+    when there is no ball in play.
+
+    Parameter sim: The game to play
+    Precondition: sim is a Simulation"""
+    pos=sim.getBalls().getPositions()
+    if len(pos)==0:
+        return 0
+    x=float(pos[np.argmin(pos[:,1]),0])
+    paddle=sim.getPaddle().x
+    if x>paddle+PADDLE_SPEED:
+        return 1
+    elif x<paddle-PADDLE_SPEED:
+        return -1
+    return 0
+
+
+def play(sim,seed,policy=track,limit=100000):
+    """Returns: (seed,score,bricks,frames) for one game played to the end.
+
+    The game is started over in sim with the given seed, and played by the
+    policy until it is won, it runs out of tries, or limit ticks have gone
+    by.  A new ball is served as soon as the last one is lost.  The result
+    is the final score, the number of bricks left, and the number of ticks
+    the game lasted.
+
+    If policy is None, the paddle never moves, and the game is played with
+    Simulation.fastForward, which skips over the ticks where nothing
+    happens.
+
+    Parameter sim: The simulation to play in
+    Precondition: sim is a Simulation
+
+    Parameter seed: The seed of the game
+    Precondition: seed is a hashable value, such as an int
+
+    Parameter policy: The player
+    Precondition: policy is a function that takes a Simulation and returns
+    -1, 0 or 1, or None
+
+    Parameter limit: The most ticks to play
+    Precondition: limit is an int > 0"""
+    sim.reset(seed)
+    sim.serveBall()
+    while not sim.isOver() and sim.getFrames()<limit:
+        if policy is None:
+            sim.fastForward(limit-sim.getFrames())
+        else:
+            sim.step(policy(sim))
+        if sim.ballLost():
+            sim.loseTry()
+            if not sim.isOver():
+                sim.serveBall()
+    return seed,sim.getScore(),len(sim.getBricks()),sim.getFrames()
+
+
+def sweep(seeds,processes=None,policy=track,limit=100000,backlog=256):
+    """Returns: a SweepResults with the result of a game for each seed.
+
+    The seeds are split evenly between the worker processes.  See the
+    function results for how the games are played.
+
+    Parameter seeds: The seeds of the games
+    Precondition: seeds is a list (or other sequence) of hashable values
+
+    Parameter processes: The number of worker processes, or None for one
+    per CPU
+    Precondition: processes is None or an int > 0
+
+    Parameter policy: The player
+    Precondition: policy is a top-level function that takes a Simulation and
+    returns -1, 0 or 1, or None for a paddle that never moves
+
+    Parameter limit: The most ticks to play in each game
+    Precondition: limit is an int > 0
+
+    Parameter backlog: The most results waiting in the queue
+    Precondition: backlog is an int > 0"""
+    summary=SweepResults()
+    for result in results(seeds,processes,policy,limit,backlog):
+        summary.add(*result)
+    return summary
+
+
+def results(seeds,processes=None,policy=track,limit=100000,backlog=256):
+    """Returns: an iterator over (seed,score,bricks,frames) for each seed,
+    in the order the games finish.
+
+    The games are played in worker processes, each with a Simulation of its
+    own that it resets for every game (see the function play).  The results
+    come back through a queue that holds at most backlog of them; a worker
+    waits when it is full.  The workers are stopped if the iterator is
+    closed before the last result.
+
+    Parameter seeds: The seeds of the games
+    Precondition: seeds is a list (or other sequence) of hashable values
+
+    Parameter processes: The number of worker processes, or None for one
+    per CPU
+    Precondition: processes is None or an int > 0
+
+    Parameter policy: The player
+    Precondition: policy is a top-level function that takes a Simulation and
+    returns -1, 0 or 1, or None for a paddle that never moves
+
+    Parameter limit: The most ticks to play in each game
+    Precondition: limit is an int > 0
+
+    Parameter backlog: The most results waiting in the queue
+    Precondition: backlog is an int > 0"""
+    seeds=list(seeds)
+    if processes is None:
+        processes=multiprocessing.cpu_count()
+    processes=max(min(processes,len(seeds)),1)
+    queue=multiprocessing.Queue(backlog)
+    workers=[multiprocessing.Process(target=_work,
+                                     args=(seeds[k::processes],queue,policy,
+                                           limit))
+             for k in range(processes)]
+    for worker in workers:
+        worker.daemon=True
+        worker.start()
+    try:
+        running=processes
+        while running:
+            result=queue.get()
+            if result is None:
+                running=running-1
+            elif isinstance(result,Exception):
+                raise result
+            else:
+                yield result
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+
+
+def _work(seeds,queue,policy,limit):
+    """Plays a game for each seed, and puts each result in the queue.
+
+    This is the body of a worker process.  It puts None in the queue once it
+    is done, or the exception that stopped it followed by None.
+
+    Parameter seeds: The seeds of the games
+    Precondition: seeds is a list of hashable values
+
+    Parameter queue: The queue to send the results through
+    Precondition: queue is a multiprocessing.Queue
+
+    Parameter policy: The player
+    Precondition: policy is a function that takes a Simulation and returns
+    -1, 0 or 1
+
+    Parameter limit: The most ticks to play in each game
+    Precondition: limit is an int > 0"""
+    try:
+        sim=Simulation()
+        for seed in seeds:
+            queue.put(play(sim,seed,policy,limit))
+    except Exception as e:
+        queue.put(e)
+    finally:
+        queue.put(None)
+
+
+class SweepResults(object):
+    """An instance is the combined results of many games.
+
+    The results are kept in the order they were added, and summarized on
+    demand.
+
+    INSTANCE ATTRIBUTES:
+        _seeds  [list]: the seed of each game
+        _score  [list of int]: the final score of each game
+        _bricks [list of int]: the number of bricks left at the end of each
+                game
+        _frames [list of int]: the number of ticks each game lasted
+    """
+
+    def __init__(self):
+        """Initializes an empty set of results."""
+        self._seeds=[]
+        self._score=[]
+        self._bricks=[]
+        self._frames=[]
+
+    def __len__(self):
+        """Returns: the number of games"""
+        return len(self._seeds)
+
+    def add(self,seed,score,bricks,frames):
+        """Adds the result of one game.
+
+        Parameter seed: The seed of the game
+        Precondition: seed is a hashable value
+
+        Parameter score: The final score
+        Precondition: score is an int >= 0
+
+        Parameter bricks: The number of bricks left
+        Precondition: bricks is an int >= 0
+
+        Parameter frames: The number of ticks the game lasted
+        Precondition: frames is an int >= 0"""
+        self._seeds.append(seed)
+        self._score.append(score)
+        self._bricks.append(bricks)
+        self._frames.append(frames)
+
+    def getSeeds(self):
+        """Returns: the list of the seed of each game"""
+        return self._seeds
+
+    def getScores(self):
+        """Returns: the array of the final score of each game"""
+        return np.array(self._score,dtype=int)
+
+    def getBricksLeft(self):
+        """Returns: the array of the number of bricks left in each game"""
+        return np.array(self._bricks,dtype=int)
+
+    def getFrames(self):
+        """Returns: the array of the number of ticks each game lasted"""
+        return np.array(self._frames,dtype=int)
+
+    def getMeanScore(self):
+        """Returns: the mean final score, or 0.0 if there are no games"""
+        return float(np.mean(self._score)) if self._score else 0.0
+
+    def getMeanFrames(self):
+        """Returns: the mean length of a game in ticks, or 0.0 if there are
+        no games"""
+        return float(np.mean(self._frames)) if self._frames else 0.0
+
+    def getWinRate(self):
+        """Returns: the fraction of the games that cleared every brick, or
+        0.0 if there are no games"""
+        if not self._bricks:
+            return 0.0
+        return np.count_nonzero(self.getBricksLeft()==0)/float(len(self))
+
+    def __str__(self):
+        """Returns: a one-line summary of the results"""
+        return ('%d games: mean score %.1f, win rate %.3f, mean frames %.0f'
+                % (len(self),self.getMeanScore(),self.getWinRate(),
+                   self.getMeanFrames()))
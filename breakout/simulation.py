@@ -0,0 +1,2151 @@
+"""Simulation module for Breakout
+
+This module contains the game itself, without any of the display: the paddle,
+the balls and the bricks as plain numbers and NumPy arrays, the physics that
+moves them, and the score.  It does not use Kivy (or game2d) at all, so a game
+can be created and stepped in a script, a test, or a worker process that has
+no window.
+
+Play wraps a Simulation and draws it with the models in models.py.  Anything
+that only needs the rules of the game should use this module directly:
+
+    sim = Simulation(seed=1)
+    sim.serveBall()
+    while not sim.isOver():
+        sim.step(action)
+        if sim.ballLost():
+            sim.loseTry()
+            sim.serveBall()
+
+To run many games at once, BatchPlay keeps them all in the same arrays and
+steps them together.
+
+Like the models, this module only accesses constants.py (and colormodel, for
+the colors of the bricks)."""
+import random
+import math
+import hashlib
+import numpy as np
+import colormodel
+from constants import *
+
+
+# To handle round off error when the ball is resting against a surface
+_epsilon = 1e-9
+
+# The number of ticks to step before looking for quiet ticks again, after
+# finding none
+_busy_ticks = 4
+
+
+def sweep_box(x,y,vx,vy,hw,hh,left,bottom,right,top):
+    """Returns: (t,nx,ny), the time of impact and contact normal of a moving
+    box against a rectangle.
+
+    The box has center (x,y) and half-width hw and half-height hh, and it
+    moves by (vx,vy) between time 0 and time 1.  The rectangle is fixed.  The
+    test is continuous, so a box moving faster than the rectangle is thick
+    still hits it.  The result is the first time t in 0..1 at which the two
+    touch, and the normal (nx,ny) of the rectangle face that was hit; it is
+    always one of (1,0), (-1,0), (0,1) or (0,-1).  If the box already
+    overlaps the rectangle at time 0 (and is not moving out of it), t is 0.
+    If there is no contact, t is infinity and the normal is (0,0).
+
+    Every argument may also be a NumPy array, in which case the results are
+    arrays of the broadcast shape.  This is how a ball is tested against
+    many bricks at once.
+
+    Parameter x, y: The center of the box at time 0
+    Precondition: x, y are numbers (int or float) or arrays
+
+    Parameter vx, vy: The motion of the box between time 0 and 1
+    Precondition: vx, vy are numbers (int or float) or arrays
+
+    Parameter hw, hh: The half-width and half-height of the box
+    Precondition: hw, hh are numbers (int or float) >= 0 or arrays
+
+    Parameter left, bottom, right, top: The edges of the rectangle
+    Precondition: left, bottom, right, top are numbers (int or float) or
+    arrays, with left <= right and bottom <= top"""
+    # Grow the rectangle by the box, and cast the box center through it
+    x0=np.asarray(left-hw,dtype=float)
+    x1=np.asarray(right+hw,dtype=float)
+    y0=np.asarray(bottom-hh,dtype=float)
+    y1=np.asarray(top+hh,dtype=float)
+    with np.errstate(divide='ignore',invalid='ignore'):
+        tx0=np.where(vx>0,(x0-x)/vx,(x1-x)/vx)
+        tx1=np.where(vx>0,(x1-x)/vx,(x0-x)/vx)
+        ty0=np.where(vy>0,(y0-y)/vy,(y1-y)/vy)
+        ty1=np.where(vy>0,(y1-y)/vy,(y0-y)/vy)
+    # A box not moving on an axis is either always or never inside that slab
+    inx=(x>x0)&(x<x1)
+    iny=(y>y0)&(y<y1)
+    tx0=np.where(vx==0,np.where(inx,-np.inf,np.inf),tx0)
+    tx1=np.where(vx==0,np.where(inx,np.inf,-np.inf),tx1)
+    ty0=np.where(vy==0,np.where(iny,-np.inf,np.inf),ty0)
+    ty1=np.where(vy==0,np.where(iny,np.inf,-np.inf),ty1)
+    t0=np.maximum(tx0,ty0)
+    t1=np.minimum(tx1,ty1)
+    hit=(t0<t1)&(t0<=1)&(t1>_epsilon)&((vx!=0)|(vy!=0))
+    # The face hit is on the axis that was entered last (ties go vertical)
+    xface=tx0>ty0
+    t=np.where(hit,np.maximum(t0,0.0),np.inf)
+    nx=np.where(hit&xface,-np.sign(vx),0.0)
+    ny=np.where(hit&~xface,-np.sign(vy),0.0)
+    return t,nx,ny
+
+
+def _sweep_one(x,y,vx,vy,hw,hh,left,bottom,right,top):
+    """Returns: (t,nx,ny), the result of sweep_box for a single box.
+
+    This computes exactly what sweep_box does, with the same arithmetic, but
+    on plain floats.  For one box against a handful of rectangles it is many
+    times faster than going through NumPy.
+
+    Parameter x, y: The center of the box at time 0
+    Precondition: x, y are floats
+
+    Parameter vx, vy: The motion of the box between time 0 and 1
+    Precondition: vx, vy are floats
+
+    Parameter hw, hh: The half-width and half-height of the box
+    Precondition: hw, hh are numbers (int or float) >= 0
+
+    Parameter left, bottom, right, top: The edges of the rectangle
+    Precondition: left, bottom, right, top are floats, with left <= right and
+    bottom <= top"""
+    x0=left-hw
+    x1=right+hw
+    y0=bottom-hh
+    y1=top+hh
+    if vx>0:
+        tx0=(x0-x)/vx
+        tx1=(x1-x)/vx
+    elif vx<0:
+        tx0=(x1-x)/vx
+        tx1=(x0-x)/vx
+    elif x>x0 and x<x1:
+        tx0=-np.inf
+        tx1=np.inf
+    else:
+        return np.inf,0.0,0.0
+    if vy>0:
+        ty0=(y0-y)/vy
+        ty1=(y1-y)/vy
+    elif vy<0:
+        ty0=(y1-y)/vy
+        ty1=(y0-y)/vy
+    elif y>y0 and y<y1:
+        ty0=-np.inf
+        ty1=np.inf
+    else:
+        return np.inf,0.0,0.0
+    t0=max(tx0,ty0)
+    t1=min(tx1,ty1)
+    if not (t0<t1 and t0<=1 and t1>_epsilon) or (vx==0 and vy==0):
+        return np.inf,0.0,0.0
+    if tx0>ty0:
+        return max(t0,0.0),(-1.0 if vx>0 else 1.0),0.0
+    return max(t0,0.0),0.0,(-1.0 if vy>0 else 1.0)
+
+
+def gap_box(x,y,hw,hh,left,bottom,right,top):
+    """Returns: how far a box has to move before it can touch a rectangle.
+
+    The result is the larger of the horizontal and the vertical gap between
+    the two, or 0 if they already touch.  A box that moves less than this,
+    in any direction, cannot reach the rectangle.
+
+    Every argument may also be a NumPy array, as in sweep_box.
+
+    Parameter x, y: The center of the box
+    Precondition: x, y are numbers (int or float) or arrays
+
+    Parameter hw, hh: The half-width and half-height of the box
+    Precondition: hw, hh are numbers (int or float) >= 0 or arrays
+
+    Parameter left, bottom, right, top: The edges of the rectangle
+    Precondition: left, bottom, right, top are numbers (int or float) or
+    arrays, with left <= right and bottom <= top"""
+    gx=np.maximum(left-(x+hw),(x-hw)-right)
+    gy=np.maximum(bottom-(y+hh),(y-hh)-top)
+    return np.maximum(np.maximum(gx,gy),0.0)
+
+
+def _gap_one(x,y,hw,hh,left,bottom,right,top):
+    """Returns: the result of gap_box for a single box, on plain floats.
+
+    Parameter x, y: The center of the box
+    Precondition: x, y are floats
+
+    Parameter hw, hh: The half-width and half-height of the box
+    Precondition: hw, hh are numbers (int or float) >= 0
+
+    Parameter left, bottom, right, top: The edges of the rectangle
+    Precondition: left, bottom, right, top are floats, with left <= right and
+    bottom <= top"""
+    return max(left-(x+hw),(x-hw)-right,bottom-(y+hh),(y-hh)-top,0.0)
+
+
+def substeps(speed,gap):
+    """Returns: the number of sub-steps to split one tick of a ball into.
+
+    A ball that cannot cover the gap to the nearest thing it could hit (see
+    gap_box) moves in one step.  Otherwise its tick is split into enough
+    equal sub-steps that it moves at most BALL_MAX_STEP in each, but never
+    more than BALL_MAX_SUBSTEPS of them, so the cost of a tick stays bounded
+    however fast the ball gets.
+
+    Both arguments may be NumPy arrays, in which case the result is an int
+    array of the broadcast shape.
+
+    Parameter speed: The distance the ball moves in one tick
+    Precondition: speed is a number >= 0 or an array
+
+    Parameter gap: The distance to the nearest paddle, brick or wall
+    Precondition: gap is a number or an array"""
+    n=np.clip(np.ceil(speed/float(BALL_MAX_STEP)),1,BALL_MAX_SUBSTEPS)
+    return np.where(speed<=gap,1,n).astype(int)
+
+
+def _substeps_one(speed,gap):
+    """Returns: the result of substeps for a single ball, on plain floats.
+
+    Parameter speed: The distance the ball moves in one tick
+    Precondition: speed is a float >= 0
+
+    Parameter gap: The distance to the nearest paddle, brick or wall
+    Precondition: gap is a float"""
+    if speed<=gap:
+        return 1
+    return int(min(max(math.ceil(speed/float(BALL_MAX_STEP)),1),
+                   BALL_MAX_SUBSTEPS))
+
+
+def _make_bounce_table():
+    """Returns: the paddle bounce table, a float array of shape
+    (PADDLE_SPEED_BUCKETS,PADDLE_ZONES,2).
+
+    Entry [b,z] is the direction, as a unit vector, in which a ball in speed
+    bucket b leaves zone z of the paddle.  The angle from straight up grows
+    evenly from the middle of the paddle out to each end, where it is
+    PADDLE_MAX_ANGLE for the slowest bucket, narrowing to PADDLE_FAST_ANGLE
+    for the fastest so that a fast ball stays playable."""
+    zone=(np.arange(PADDLE_ZONES)+0.5)/PADDLE_ZONES*2-1
+    limit=np.linspace(PADDLE_MAX_ANGLE,PADDLE_FAST_ANGLE,PADDLE_SPEED_BUCKETS)
+    angle=np.radians(limit[:,np.newaxis]*zone[np.newaxis,:])
+    return np.dstack((np.sin(angle),np.cos(angle)))
+
+
+# The paddle bounce table, as an array and as nested lists of tuples (which
+# are faster to index with plain ints)
+_bounce_table = _make_bounce_table()
+_bounce_rows = [[tuple(d) for d in row] for row in _bounce_table.tolist()]
+
+
+def bounce_paddle(dx,vx,vy):
+    """Returns: (vx,vy), the velocity of a ball after it bounces off the top
+    of the paddle.
+
+    The direction depends on where the ball hit the paddle, as in the
+    classic game: straight up from the middle, and more and more to the side
+    towards the ends.  The offset dx is turned into one of PADDLE_ZONES
+    zones, the speed of the ball into one of PADDLE_SPEED_BUCKETS buckets,
+    and the direction is looked up in a table made once when this module is
+    loaded, so no trigonometry is done per bounce.  The ball keeps its speed.
+
+    Every argument may also be a NumPy array, in which case the results are
+    arrays of the broadcast shape.  Simulation, BatchPlay (and so Play) all
+    bounce off the paddle through this table.
+
+    Parameter dx: The x of the ball center minus the x of the paddle center
+    Precondition: dx is a number (int or float) or an array
+
+    Parameter vx, vy: The velocity of the ball when it hits
+    Precondition: vx, vy are numbers (int or float) or arrays"""
+    reach=PADDLE_WIDTH/2.0+BALL_DIAMETER/2
+    zone=np.floor((dx/reach+1)/2*PADDLE_ZONES)
+    zone=np.clip(zone,0,PADDLE_ZONES-1).astype(int)
+    speed=np.hypot(vx,vy)
+    bucket=np.minimum((speed/PADDLE_BUCKET_SPEED).astype(int),
+                      PADDLE_SPEED_BUCKETS-1)
+    direction=_bounce_table[bucket,zone]
+    return speed*direction[...,0],speed*direction[...,1]
+
+
+def _bounce_paddle_one(dx,vx,vy):
+    """Returns: the result of bounce_paddle for a single ball, on plain
+    floats.
+
+    Parameter dx: The x of the ball center minus the x of the paddle center
+    Precondition: dx is a float
+
+    Parameter vx, vy: The velocity of the ball when it hits
+    Precondition: vx, vy are floats"""
+    reach=PADDLE_WIDTH/2.0+BALL_DIAMETER/2
+    zone=math.floor((dx/reach+1)/2*PADDLE_ZONES)
+    zone=int(min(max(zone,0),PADDLE_ZONES-1))
+    speed=math.hypot(vx,vy)
+    bucket=min(int(speed/PADDLE_BUCKET_SPEED),PADDLE_SPEED_BUCKETS-1)
+    ux,uy=_bounce_rows[bucket][zone]
+    return speed*ux,speed*uy
+
+
+def _collide_pairs(pos,vel,a,b):
+    """Bounces the given pairs of touching balls off each other, in order.
+
+    The balls have the same mass, so two balls moving towards each other
+    swap the parts of their velocities along the line between their
+    centers, and keep the rest.  A pair that is already moving apart is
+    left alone (as are two balls with the same center).  The pairs are
+    done one after another, in the order given, so a ball in two pairs
+    bounces off the first and then the second.
+
+    Simulation and BatchPlay both bounce the balls off each other through
+    this function, so that they do the same arithmetic.
+
+    Returns: the number of pairs that bounced
+
+    Parameter pos, vel: The centers and velocities of the balls
+    Precondition: pos, vel are float arrays of shape (n,2); vel is changed
+
+    Parameter a, b: The balls of each pair
+    Precondition: a, b are int arrays of ball indices of the same length"""
+    bounced=0
+    for i,j in zip(a.tolist(),b.tolist()):
+        dx,dy=(pos[i]-pos[j]).tolist()
+        ux,uy=(vel[i]-vel[j]).tolist()
+        dot=dx*ux+dy*uy
+        if dot<0:
+            k=dot/(dx*dx+dy*dy)
+            vel[i]=(vel[i,0]-k*dx,vel[i,1]-k*dy)
+            vel[j]=(vel[j,0]+k*dx,vel[j,1]+k*dy)
+            bounced=bounced+1
+    return bounced
+
+
+class PaddleBody(object):
+    """An instance is the paddle, as far as the physics is concerned.
+
+    This is a rectangle with the same size and position as the Paddle that
+    Play draws, and the same rules for moving it.
+
+    INSTANCE ATTRIBUTES:
+        x      [float]: the horizontal coordinate of the paddle center
+        y      [float]: the vertical coordinate of the paddle center
+        width  [int or float > 0]: the width of the paddle
+        height [int or float > 0]: the height of the paddle
+    """
+
+    @property
+    def left(self):
+        """The left edge of the paddle"""
+        return self.x-self.width/2.0
+
+    @property
+    def right(self):
+        """The right edge of the paddle"""
+        return self.x+self.width/2.0
+
+    @property
+    def bottom(self):
+        """The bottom edge of the paddle"""
+        return self.y-self.height/2.0
+
+    @property
+    def top(self):
+        """The top edge of the paddle"""
+        return self.y+self.height/2.0
+
+    def __init__(self,x,y,width,height):
+        """Initializes a paddle centered at (x,y).
+
+        Parameter x, y: The center of the paddle
+        Precondition: x, y are ints or floats
+
+        Parameter width, height: The size of the paddle
+        Precondition: width, height are ints or floats > 0"""
+        self.x=float(x)
+        self.y=float(y)
+        self.width=width
+        self.height=height
+
+    def move(self,dx):
+        """Moves the paddle dx pixels to the right (left if dx < 0).
+
+        The paddle does not move if that would put it past the left or right
+        edge of the window.
+
+        Parameter dx: The distance to move
+        Precondition: dx is an int or float"""
+        if self.x+dx+self.width/2>=GAME_WIDTH:
+            self.x=self.x+min(self.right,GAME_WIDTH)-self.right
+        elif self.x+dx-self.width/2<=0:
+            self.x=self.x+max(self.left,0)-self.left
+        else:
+            self.x=self.x+dx
+
+    def sweep(self,x,y,vx,vy):
+        """Returns: (t,nx,ny) for the first contact of balls with this paddle.
+
+        See the function sweep_box for the meaning of the result; t is
+        infinity for a ball that does not reach the paddle.  The ball is a
+        square BALL_DIAMETER wide.  The arguments may be numbers for
+        one ball or arrays for many balls.
+
+        Parameter x, y: The center of the ball at the start of the motion
+        Precondition: x, y are numbers (int or float) or arrays
+
+        Parameter vx, vy: The motion of the ball
+        Precondition: vx, vy are numbers (int or float) or arrays"""
+        return sweep_box(x,y,vx,vy,BALL_DIAMETER/2,BALL_DIAMETER/2,
+                         self.left,self.bottom,self.right,self.top)
+
+
+class BrickField(object):
+    """An instance is the full set of bricks, stored as NumPy arrays.
+
+    A Brick is a GRectangle, which carries a lot of drawing machinery that
+    the game physics never needs.  This class keeps the bricks as a
+    struct-of-arrays instead: one array each for the centers, the sizes,
+    whether the brick is still alive, and its index in a small color
+    palette.  It has no drawing of its own; Play draws the bricks still
+    alive in a GBrickBatch.
+
+    The bricks are laid out in a regular grid, exactly as in the original
+    game: row 0 is the top row, and brick i is in row i/cols and column
+    i%cols.  Every brick sits inside one cell of a uniform grid whose cell
+    size is the brick size plus the separation between bricks, so looking
+    up the bricks near the ball is a matter of computing which cells its
+    bounding box overlaps.
+
+    A BrickField acts like the list of remaining bricks: len() is the number
+    of bricks left, and iterating over it produces the index of each of them.
+
+    Besides the arrays, which bricks are alive is also kept as one int per
+    row, used as a bitset: bit c of the int for row r is set while the brick
+    in column c of row r is alive.  Together with a bitset of the rows that
+    still have bricks, and running counts per row and per color, this
+    answers questions about what is left (is any brick left, how many in a
+    row or of a color, which is the lowest row) in constant time, however
+    big the grid is.
+
+    INSTANCE ATTRIBUTES:
+        _cols    [int > 0]: the number of bricks in a row
+        _rows    [int > 0]: the number of rows
+        _left    [int or float]: the left edge of column 0
+        _top     [int or float]: the top edge of row 0 (rows count downwards)
+        _cellw   [float > 0]: the width of a grid cell
+        _cellh   [float > 0]: the height of a grid cell
+        _center  [float array of shape (n,2)]: the center of each brick
+        _size    [float array of shape (n,2)]: the width and height of each
+                 brick
+        _alive   [bool array of shape (n,)]: True if the brick is still in play
+        _palette [int8 array of shape (n,)]: index of each brick's color in
+                 _colors
+        _colors  [list of colors]: the brick colors
+        _boxes   [list of tuples]: the (left,bottom,right,top) edges of each
+                 brick, as floats
+        _count   [int >= 0]: the number of bricks still alive
+        _bits    [list of int]: the bitset of the live bricks in each row
+        _rowbits [int]: the bitset of the rows with a live brick
+        _rowcount [list of int]: the number of live bricks in each row
+        _colorcount [list of int]: the number of live bricks of each color in
+                 _colors
+    """
+
+    def __init__(self,cols,rows,colors):
+        """Initializes a full field of cols x rows bricks.
+
+        Every two rows get the next color in colors, starting again from
+        the first color once they run out.
+
+        Parameter cols: The number of bricks in a row
+        Precondition: cols is an int > 0
+
+        Parameter rows: The number of rows of bricks
+        Precondition: rows is an int > 0
+
+        Parameter colors: The colors of the rows, from the top
+        Precondition: colors is a nonempty list of colors"""
+        self._cols=cols
+        self._rows=rows
+        self._left=0
+        self._top=GAME_HEIGHT-BRICK_Y_OFFSET
+        self._cellw=float(BRICK_WIDTH+BRICK_SEP_H)
+        self._cellh=float(BRICK_HEIGHT+BRICK_SEP_V)
+        row,col=np.divmod(np.arange(cols*rows),cols)
+        self._center=np.empty((cols*rows,2))
+        self._center[:,0]=BRICK_SEP_H/2+BRICK_WIDTH/2.0+col*self._cellw
+        self._center[:,1]=(GAME_HEIGHT-BRICK_Y_OFFSET-(BRICK_HEIGHT/2)-
+                           row*self._cellh)
+        self._size=np.empty((cols*rows,2))
+        self._size[:,0]=BRICK_WIDTH
+        self._size[:,1]=BRICK_HEIGHT
+        self._alive=np.ones(cols*rows,dtype=bool)
+        self._palette=((row//2)%len(colors)).astype(np.int8)
+        self._colors=list(colors)
+        half=self._size/2.0
+        self._boxes=[tuple(box) for box in np.column_stack(
+            (self._center-half,self._center+half)).tolist()]
+        self.reset()
+
+    def __len__(self):
+        """Returns: the number of bricks still alive"""
+        return self._count
+
+    def __iter__(self):
+        """Returns: an iterator over the index of each brick still alive"""
+        return iter(np.flatnonzero(self._alive).tolist())
+
+    def getAlive(self):
+        """Returns: the bool array of the bricks still in play, one entry
+        per brick.
+
+        This is the array used by the bricks, not a copy; do not modify it."""
+        return self._alive
+
+    def getBox(self,i):
+        """Returns: the (left,bottom,right,top) edges of brick i
+
+        Parameter i: The brick index
+        Precondition: i is an int in 0..cols*rows-1"""
+        return self._boxes[i]
+
+    def getColor(self,i):
+        """Returns: the color of brick i
+
+        Parameter i: The brick index
+        Precondition: i is an int in 0..cols*rows-1"""
+        return self._colors[self._palette[i]]
+
+    def isEmpty(self):
+        """Returns: True if no brick is left"""
+        return self._rowbits==0
+
+    def getRowCount(self,row):
+        """Returns: the number of bricks left in a row
+
+        Parameter row: The row (0 is the top row)
+        Precondition: row is an int in 0..rows-1"""
+        return self._rowcount[row]
+
+    def getLowestRow(self):
+        """Returns: the lowest row with a brick left, or -1 if none are.
+
+        Rows are numbered from 0 at the top, so this is the largest row
+        number with a brick."""
+        return self._rowbits.bit_length()-1
+
+    def getColorCount(self,color):
+        """Returns: the number of bricks of a color left
+
+        Parameter color: The color
+        Precondition: color is one of the colors of the field"""
+        return self._colorcount[self._colors.index(color)]
+
+    def getFloor(self):
+        """Returns: the bottom edge of the lowest brick still in play, or
+        infinity if there are none."""
+        row=self.getLowestRow()
+        if row<0:
+            return np.inf
+        return self._boxes[row*self._cols][1]
+
+    def getLastColor(self):
+        """Returns: the color of the last brick alive, or None if none are.
+
+        The last brick is the right-most brick in the lowest row."""
+        row=self.getLowestRow()
+        if row<0:
+            return None
+        return self.getColor(row*self._cols+self._bits[row].bit_length()-1)
+
+    def query(self,left,bottom,right,top):
+        """Returns: the indices of the live bricks in the cells overlapping a
+        box.
+
+        The indices are in layout order (top row first, left to right).
+
+        Parameter left, bottom, right, top: The edges of the box
+        Precondition: left, bottom, right, top are ints or floats with
+        left <= right and bottom <= top"""
+        col0=max(int(math.floor((left-self._left)/self._cellw)),0)
+        col1=min(int(math.floor((right-self._left)/self._cellw)),self._cols-1)
+        row0=max(int(math.floor((self._top-top)/self._cellh)),0)
+        row1=min(int(math.floor((self._top-bottom)/self._cellh)),self._rows-1)
+        if col0>col1 or row0>row1:
+            return []
+        cells=self._alive.reshape(self._rows,self._cols)
+        rows,cols=np.nonzero(cells[row0:row1+1,col0:col1+1])
+        return list((rows+row0)*self._cols+cols+col0)
+
+    def pairs(self,left,bottom,right,top):
+        """Returns: (owner,brick), the live bricks in the cells overlapping
+        each of several boxes.
+
+        This is the vectorized form of query.  Box k has the edges left[k],
+        bottom[k], right[k] and top[k].  The result is two int arrays of the
+        same length: brick[j] is a live brick in a cell overlapped by box
+        owner[j].  The pairs are grouped by box, in increasing box order.
+
+        Parameter left, bottom, right, top: The edges of the boxes
+        Precondition: left, bottom, right, top are float arrays of the same
+        length with left <= right and bottom <= top"""
+        owner,brick=self.cells(left,bottom,right,top)
+        live=self._alive[brick]
+        return owner[live],brick[live]
+
+    def cells(self,left,bottom,right,top):
+        """Returns: (owner,brick), every brick in the cells overlapping each
+        of several boxes, alive or not.
+
+        This is the method pairs without looking at which bricks are alive,
+        so it only depends on the layout of the bricks.  BatchPlay uses it
+        to share one layout between many games.
+
+        Parameter left, bottom, right, top: The edges of the boxes
+        Precondition: left, bottom, right, top are float arrays of the same
+        length with left <= right and bottom <= top"""
+        col0=np.floor((left-self._left)/self._cellw).astype(int)
+        col1=np.floor((right-self._left)/self._cellw).astype(int)
+        row0=np.floor((self._top-top)/self._cellh).astype(int)
+        row1=np.floor((self._top-bottom)/self._cellh).astype(int)
+        col0=np.maximum(col0,0)
+        col1=np.minimum(col1,self._cols-1)
+        row0=np.maximum(row0,0)
+        row1=np.minimum(row1,self._rows-1)
+        ncols=np.maximum(col1-col0+1,0)
+        counts=ncols*np.maximum(row1-row0+1,0)
+        owner=np.repeat(np.arange(len(counts)),counts)
+        k=np.arange(len(owner))-np.repeat(np.cumsum(counts)-counts,counts)
+        brick=((row0[owner]+k//ncols[owner])*self._cols+
+               col0[owner]+k%ncols[owner])
+        return owner,brick
+
+    def sweep(self,x,y,vx,vy,hw,hh):
+        """Returns: (t,nx,ny,i) for the first brick hit by each of several
+        moving boxes.
+
+        Box k has center (x[k],y[k]) and half-size (hw,hh), and moves by
+        (vx[k],vy[k]).  Only the bricks in the cells overlapped by the whole
+        motion of a box are tested against it.  The results are arrays with
+        one entry per box: i[k] is the brick hit by box k, or -1 if it hits
+        nothing.  See the function sweep_box for the meaning of the rest of
+        the result.
+
+        Parameter x, y: The centers of the boxes at the start of the motion
+        Precondition: x, y are float arrays of the same length
+
+        Parameter vx, vy: The motion of the boxes
+        Precondition: vx, vy are float arrays of the same length as x
+
+        Parameter hw, hh: The half-width and half-height of the boxes
+        Precondition: hw, hh are ints or floats >= 0"""
+        n=len(x)
+        t=np.empty(n)
+        t.fill(np.inf)
+        nx=np.zeros(n)
+        ny=np.zeros(n)
+        index=np.empty(n,dtype=int)
+        index.fill(-1)
+        owner,brick=self.pairs(np.minimum(x,x+vx)-hw,np.minimum(y,y+vy)-hh,
+                               np.maximum(x,x+vx)+hw,np.maximum(y,y+vy)+hh)
+        if len(owner)==0:
+            return t,nx,ny,index
+        tp,nxp,nyp=self.sweepPairs(owner,brick,x,y,vx,vy,hw,hh)
+        # Keep the earliest contact of each box
+        order=np.lexsort((tp,owner))
+        grouped=owner[order]
+        first=order[np.concatenate(([True],grouped[1:]!=grouped[:-1]))]
+        first=first[tp[first]<np.inf]
+        box=owner[first]
+        t[box]=tp[first]
+        nx[box]=nxp[first]
+        ny[box]=nyp[first]
+        index[box]=brick[first]
+        return t,nx,ny,index
+
+    def sweepPairs(self,owner,brick,x,y,vx,vy,hw,hh):
+        """Returns: (t,nx,ny), the contact of each of several moving boxes
+        with one brick each.
+
+        This is the narrow phase for the pairs produced by the method pairs:
+        for each j, box owner[j] is tested against brick[j].  The results
+        are arrays with one entry per pair; see the function sweep_box for
+        their meaning.
+
+        Parameter owner: The box of each pair
+        Precondition: owner is an int array of indices into x
+
+        Parameter brick: The brick of each pair
+        Precondition: brick is an int array of brick indices, the same
+        length as owner
+
+        Parameter x, y: The centers of the boxes at the start of the motion
+        Precondition: x, y are float arrays of the same length
+
+        Parameter vx, vy: The motion of the boxes
+        Precondition: vx, vy are float arrays of the same length as x
+
+        Parameter hw, hh: The half-width and half-height of the boxes
+        Precondition: hw, hh are ints or floats >= 0"""
+        center=self._center[brick]
+        half=self._size[brick]/2.0
+        return sweep_box(x[owner],y[owner],vx[owner],vy[owner],hw,hh,
+                         center[:,0]-half[:,0],center[:,1]-half[:,1],
+                         center[:,0]+half[:,0],center[:,1]+half[:,1])
+
+    def gapPairs(self,owner,brick,x,y,hw,hh):
+        """Returns: the float array of the gap between each of several boxes
+        and one brick each.
+
+        This is gap_box for the pairs produced by the method pairs, as
+        sweepPairs is sweep_box for them.
+
+        Parameter owner: The box of each pair
+        Precondition: owner is an int array of indices into x
+
+        Parameter brick: The brick of each pair
+        Precondition: brick is an int array of brick indices, the same
+        length as owner
+
+        Parameter x, y: The centers of the boxes
+        Precondition: x, y are float arrays of the same length
+
+        Parameter hw, hh: The half-width and half-height of the boxes
+        Precondition: hw, hh are ints or floats >= 0"""
+        center=self._center[brick]
+        half=self._size[brick]/2.0
+        return gap_box(x[owner],y[owner],hw,hh,
+                       center[:,0]-half[:,0],center[:,1]-half[:,1],
+                       center[:,0]+half[:,0],center[:,1]+half[:,1])
+
+    def cast(self,x,y,vx,vy,hw,hh,limit):
+        """Returns: the time at which a box moving in a straight line first
+        touches a live brick, or infinity if it does not by time limit.
+
+        The box has center (x,y) and half-size (hw,hh), and it moves by
+        (vx,vy) in each unit of time.  Rather than testing every brick, this
+        walks the grid cells along the path of the box, in pieces that cross
+        at most one cell along each axis.  The live bricks in the cells that
+        a piece covers are swept (see sweep_box), and the walk stops at the
+        first piece with a contact, so the cost grows with the number of
+        cells crossed and not with the number of bricks.  Only the part of
+        the path level with the live rows is walked.
+
+        A box that already touches a brick at time 0, but is moving away
+        from it, does not count as touching it (as in sweep_box).
+
+        Parameter x, y: The center of the box at time 0
+        Precondition: x, y are floats
+
+        Parameter vx, vy: The motion of the box in each unit of time
+        Precondition: vx, vy are floats
+
+        Parameter hw, hh: The half-width and half-height of the box
+        Precondition: hw, hh are numbers (int or float) >= 0
+
+        Parameter limit: The most time to look ahead
+        Precondition: limit is a number >= 0"""
+        if self._rowbits==0:
+            return np.inf
+        # The part of the path level with the live rows
+        low=self.getFloor()-hh
+        high=self._top+hh
+        start=0.0
+        stop=float(limit)
+        if vy!=0:
+            a=(low-y)/vy
+            b=(high-y)/vy
+            start=max(start,min(a,b))
+            stop=min(stop,max(a,b))
+        elif not low<y<high:
+            return np.inf
+        if vx==0 and vy==0:
+            return np.inf
+        piece=min(self._cellw/abs(vx) if vx else np.inf,
+                  self._cellh/abs(vy) if vy else np.inf)
+        while start<stop:
+            end=min(start+piece,stop)
+            x0=x+vx*start
+            y0=y+vy*start
+            dx=vx*(end-start)
+            dy=vy*(end-start)
+            first=np.inf
+            for i in self.query(min(x0,x0+dx)-hw,min(y0,y0+dy)-hh,
+                                max(x0,x0+dx)+hw,max(y0,y0+dy)+hh):
+                t=_sweep_one(x0,y0,dx,dy,hw,hh,*self._boxes[i])[0]
+                first=min(first,t)
+            if first<np.inf:
+                return start+first*(end-start)
+            start=end
+        return np.inf
+
+    def reset(self):
+        """Puts every brick back in play."""
+        self._alive.fill(True)
+        self._count=len(self._alive)
+        self._bits=[(1<<self._cols)-1]*self._rows
+        self._rowbits=(1<<self._rows)-1
+        self._rowcount=[self._cols]*self._rows
+        self._colorcount=np.bincount(self._palette,
+                                     minlength=len(self._colors)).tolist()
+
+    def remove(self,i):
+        """Removes brick i from play in constant time.
+
+        Parameter i: The brick index, or an array of distinct brick indices
+        to remove several bricks at once
+        Precondition: i is an int in 0..cols*rows-1 (or an int array of
+        such) and every brick given is alive"""
+        index=np.atleast_1d(i)
+        self._alive[index]=False
+        self._count=self._count-len(index)
+        for k in index.tolist():
+            row,col=divmod(k,self._cols)
+            self._bits[row]=self._bits[row]&~(1<<col)
+            self._rowcount[row]=self._rowcount[row]-1
+            if self._bits[row]==0:
+                self._rowbits=self._rowbits&~(1<<row)
+            color=self._palette[k]
+            self._colorcount[color]=self._colorcount[color]-1
+
+
+class BallSet(object):
+    """An instance is a group of balls in play, stored as NumPy arrays.
+
+    Each ball is a position and a velocity, with the same size as a Ball.
+    All of the physics (moving, bouncing off the walls, the paddle and the
+    bricks) is done on every ball at once with array operations, so many
+    balls cost little more than one.  This class has no drawing of its own;
+    Play draws a Ball at the position of each ball.
+
+    INSTANCE ATTRIBUTES:
+        _pos [float array of shape (n,2)]: the center of each ball
+        _vel [float array of shape (n,2)]: the velocity of each ball, in
+             pixels per physics tick
+        _substeps [int >= 0]: the number of sub-steps in the last tick stepped
+             (the most taken by any ball)
+    """
+
+    def __init__(self):
+        """Initializes an empty set of balls."""
+        self._pos=np.zeros((0,2))
+        self._vel=np.zeros((0,2))
+        self._substeps=0
+
+    def __len__(self):
+        """Returns: the number of balls in play"""
+        return len(self._pos)
+
+    def getPositions(self):
+        """Returns: the (n,2) array of ball centers.
+
+        This is the array used by the balls, not a copy; do not modify it."""
+        return self._pos
+
+    def getVelocities(self):
+        """Returns: the (n,2) array of ball velocities.
+
+        This is the array used by the balls, not a copy; do not modify it."""
+        return self._vel
+
+    def getSubsteps(self):
+        """Returns: the number of sub-steps in the last tick stepped.
+
+        This is the most sub-steps taken by any ball (see the function
+        substeps), so it measures the cost of the tick; it is never more than
+        BALL_MAX_SUBSTEPS."""
+        return self._substeps
+
+    def serve(self,x,y,count=1,rng=random):
+        """Adds count balls at (x,y), each with a random velocity.
+
+        The velocities are chosen the same way as in Ball: the ball moves
+        down at a fixed speed, and left or right at a random speed.
+
+        Parameter x, y: The starting position of the balls
+        Precondition: x, y are ints or floats
+
+        Parameter count: The number of balls to add
+        Precondition: count is an int > 0
+
+        Parameter rng: The source of the random speeds
+        Precondition: rng is a random.Random (or the module random)"""
+        pos=np.empty((count,2))
+        pos[:,0]=x
+        pos[:,1]=y
+        vel=np.empty((count,2))
+        for k in range(count):
+            vel[k,0]=rng.uniform(1.0,5.0)*rng.choice([-1,1])
+        vel[:,1]=-5.0
+        self._pos=np.concatenate((self._pos,pos))
+        self._vel=np.concatenate((self._vel,vel))
+
+    def clear(self):
+        """Takes every ball out of play."""
+        self._pos=self._pos[:0]
+        self._vel=self._vel[:0]
+        self._substeps=0
+
+    def removeLost(self):
+        """Removes the balls that have fallen below the bottom of the window.
+
+        Returns: the number of balls removed"""
+        kept=self._pos[:,1]+BALL_DIAMETER/2/2.0>0
+        lost=len(kept)-np.count_nonzero(kept)
+        if lost:
+            self._pos=self._pos[kept]
+            self._vel=self._vel[kept]
+        return lost
+
+    def quietTicks(self,paddle,bricks,limit):
+        """Returns: the number of whole ticks, up to limit, in which nothing
+        can happen to any ball.
+
+        In a quiet tick, every ball starts further than its speed from the
+        walls, the paddle and the live bricks, stays in the window, and ends
+        without touching another ball.  Stepping such a tick takes one
+        sub-step (see the function substeps) with no contact, so every ball
+        just moves by its velocity, as in drift.
+
+        The ticks are solved for from the velocities rather than by
+        stepping, with each ball grown by its speed.  The side walls, the
+        top of the window and the bottom (where the ball is lost) are
+        lines, so the time to reach them is a division.  The time to reach
+        the paddle is found with sweep_box, and the time to reach a live
+        brick by walking the grid cells along the path of the ball (see
+        BrickField.cast).  So the cost depends on the cells crossed until
+        the next contact, not on the number of ticks or bricks.  Two balls
+        cannot touch before the room between them is used up at the sum of
+        their speeds.  The result leaves a tick to spare before the first of
+        these, so that round off can never skip an event.
+
+        This does not move the paddle, so the result only holds while the
+        paddle stays still.
+
+        Parameter paddle: The paddle
+        Precondition: paddle is a PaddleBody
+
+        Parameter bricks: The bricks
+        Precondition: bricks is a BrickField
+
+        Parameter limit: The most ticks to look ahead
+        Precondition: limit is an int >= 0"""
+        if len(self)==0 or limit<=0:
+            return max(limit,0)
+        r=BALL_DIAMETER/2
+        half=BALL_DIAMETER/2/2.0
+        first=limit+1.0
+        for (x,y),(vx,vy) in zip(self._pos.tolist(),self._vel.tolist()):
+            speed=math.hypot(vx,vy)
+            # Each margin is how much room is left before a tick is no
+            # longer quiet, and rate is how fast the ball uses it up
+            for margin,rate in ((x-half-speed,-vx),
+                                (GAME_WIDTH-half-speed-x,vx),
+                                (GAME_HEIGHT-speed-y,vy),
+                                (y+vy+half,-vy)):
+                if margin<=0:
+                    return 0
+                if rate>0:
+                    first=min(first,margin/rate)
+            # The paddle and the bricks, unless the ball is already near
+            grow=r+speed
+            if _gap_one(x,y,r,r,paddle.left,paddle.bottom,paddle.right,
+                        paddle.top)<=speed:
+                return 0
+            for i in bricks.query(x-grow,y-grow,x+grow,y+grow):
+                if _gap_one(x,y,r,r,*bricks.getBox(i))<=speed:
+                    return 0
+            t=_sweep_one(x,y,vx*first,vy*first,grow,grow,paddle.left,
+                         paddle.bottom,paddle.right,paddle.top)[0]
+            first=min(first,t*first)
+            first=min(first,bricks.cast(x,y,vx,vy,grow,grow,first))
+        if len(self)>1:
+            a,b=np.triu_indices(len(self),1)
+            d=self._pos[a]-self._pos[b]
+            room=np.hypot(d[:,0],d[:,1])-2*r
+            speed=np.hypot(self._vel[:,0],self._vel[:,1])
+            with np.errstate(divide='ignore',invalid='ignore'):
+                first=min(first,np.nanmin(room/(speed[a]+speed[b])))
+        return int(min(max(math.ceil(first)-1,0),limit))
+
+    def touching(self,a,b):
+        """Returns: the bool array of which pairs of balls touch.
+
+        Pair j is ball a[j] and ball b[j].  This is the narrow phase for the
+        pairs found by a SweepAndPrune: the balls are round, so two balls
+        touch if their centers are no further apart than twice the radius
+        used for collisions.
+
+        Parameter a, b: The balls of each pair
+        Precondition: a, b are int arrays of ball indices of the same length"""
+        r=BALL_DIAMETER/2
+        d=self._pos[a]-self._pos[b]
+        return np.hypot(d[:,0],d[:,1])<=2*r
+
+    def collide(self,a,b):
+        """Bounces the given pairs of touching balls off each other.
+
+        See the function _collide_pairs: two balls that move towards each
+        other swap the parts of their velocities along the line between
+        their centers, one pair after another.
+
+        Returns: the number of pairs that bounced
+
+        Parameter a, b: The balls of each pair, as given by
+        Simulation.getBallPairs
+        Precondition: a, b are int arrays of ball indices of the same length,
+        and every pair touches"""
+        return _collide_pairs(self._pos,self._vel,a,b)
+
+    def quantize(self,scale):
+        """Rounds the position and velocity of every ball to the nearest
+        multiple of 1/scale.
+
+        Ties are rounded to even, so the result does not depend on anything
+        but the values rounded.
+
+        Parameter scale: The number of steps per pixel
+        Precondition: scale is a power of 2 (an int > 0)"""
+        for a in (self._pos,self._vel):
+            np.multiply(a,scale,out=a)
+            np.round(a,out=a)
+            np.divide(a,scale,out=a)
+
+    def drift(self,ticks):
+        """Moves every ball in a straight line for the given number of ticks.
+
+        This is only correct for ticks that are quiet (see quietTicks).  The
+        velocity is added to the position once per tick, in order, which is
+        the arithmetic that step does for a quiet tick, so the balls end up
+        exactly where stepping would put them.  (Multiplying the velocity by
+        the number of ticks would round differently.)  The additions are
+        done by np.add.accumulate, so there is no Python loop over the
+        ticks.
+
+        Parameter ticks: The number of ticks
+        Precondition: ticks is an int >= 0"""
+        if ticks<=0 or len(self)==0:
+            return
+        path=np.empty((ticks+1,)+self._pos.shape)
+        path[0]=self._pos
+        path[1:]=self._vel
+        self._pos[:]=np.add.accumulate(path,axis=0)[-1]
+        self._substeps=1
+
+    def step(self,paddle,bricks,events):
+        """Moves every ball one physics tick, and bounces it off everything.
+
+        First, the tick of each ball is split into sub-steps (see the
+        function substeps), from its speed and its gap to the walls, the
+        paddle and the nearest live brick it could reach in the tick.  A
+        ball far from everything moves in one step, while a fast ball close
+        to something is moved a short distance at a time, so that it bounces
+        off the walls where it meets them and gets BALL_MAX_CONTACTS
+        contacts in every sub-step.
+
+        Each sub-step is processed as a pipeline, for all balls at once, and
+        repeated for up to BALL_MAX_CONTACTS contacts per ball:
+
+        1. Broad phase: the grid cells covered by the motion of each ball
+           give the candidate bricks (BrickField.pairs).
+        2. Narrow phase: each ball is swept against its candidate bricks
+           and the paddle (sweep_box) to find its earliest contact.  Every
+           contact of a ball at that earliest time goes into events, so a
+           ball hitting the seam between two bricks records both.
+        3. Resolve: each ball that hit something is moved to the contact
+           and reflected once on each axis that any of its contacts has a
+           normal on, so simultaneous hits never cancel each other out.
+           A ball that hit a brick speeds up by 5%.
+           A ball that landed on top of the paddle leaves it at an angle
+           that depends on where it hit (see bounce_paddle).  All of the
+           bricks hit are then removed in one batch.
+
+        The paddle only stops balls that are moving down.  At the end of
+        each sub-step, balls that reach the top or side walls are bounced
+        back.
+
+        A single ball goes through the same pipeline with plain floats
+        instead of arrays (see _stepOne), which gives the same result in a
+        fraction of the time.
+
+        Parameter paddle: The paddle
+        Precondition: paddle is a PaddleBody
+
+        Parameter bricks: The bricks
+        Precondition: bricks is a BrickField
+
+        Parameter events: The buffer to record the collisions in; it is
+        cleared first
+        Precondition: events is a CollisionEvents"""
+        events.clear()
+        if len(self)==1:
+            self._stepOne(paddle,bricks,events)
+            return
+        r=BALL_DIAMETER/2
+        count=self._countSubsteps(paddle,bricks)
+        self._substeps=int(count.max()) if len(count) else 0
+        elapsed=np.zeros(len(self))
+        end=np.ones(len(self))
+        for step in range(self._substeps):
+            active=np.flatnonzero(count>step)
+            elapsed[active]=step/count[active].astype(float)
+            end[active]=(step+1)/count[active].astype(float)
+            for contact in range(BALL_MAX_CONTACTS):
+                if len(active)==0:
+                    break
+                x=self._pos[active,0]
+                y=self._pos[active,1]
+                left=end[active]-elapsed[active]
+                vx=self._vel[active,0]*left
+                vy=self._vel[active,1]*left
+
+                # Broad phase
+                owner,brick=bricks.pairs(np.minimum(x,x+vx)-r,
+                                         np.minimum(y,y+vy)-r,
+                                         np.maximum(x,x+vx)+r,
+                                         np.maximum(y,y+vy)+r)
+
+                # Narrow phase
+                t,nx,ny=bricks.sweepPairs(owner,brick,x,y,vx,vy,r,r)
+                tp,nxp,nyp=paddle.sweep(x,y,vx,vy)
+                tp=np.where(vy<0,tp,np.inf)
+                first=tp.copy()
+                np.minimum.at(first,owner,t)
+                hit=first<np.inf
+                onbrick=(t<np.inf)&(t<=first[owner]+_epsilon)
+                onpaddle=hit&(tp<=first+_epsilon)
+                owner=owner[onbrick]
+                events.add(active[owner],brick[onbrick],
+                           elapsed[active[owner]]+t[onbrick]*left[owner],
+                           nx[onbrick],ny[onbrick])
+                events.add(active[onpaddle],-1,
+                           elapsed[active[onpaddle]]+
+                           tp[onpaddle]*left[onpaddle],
+                           nxp[onpaddle],nyp[onpaddle])
+
+                # Resolve
+                frac=np.where(hit,first,1.0)
+                self._pos[active,0]=x+vx*frac
+                self._pos[active,1]=y+vy*frac
+                m=len(active)
+                flipx=((np.bincount(owner,nx[onbrick]!=0,m)>0)|
+                       (onpaddle&(nxp!=0)))
+                flipy=np.bincount(owner,ny[onbrick]!=0,m)>0
+                fast=active[np.unique(owner)]
+                self._vel[fast]=self._vel[fast]*1.05
+                self._vel[active[flipx],0]=-self._vel[active[flipx],0]
+                self._vel[active[flipy],1]=-self._vel[active[flipy],1]
+                landed=active[onpaddle&(nyp!=0)]
+                if len(landed):
+                    self._vel[landed,0],self._vel[landed,1]=bounce_paddle(
+                        self._pos[landed,0]-paddle.x,self._vel[landed,0],
+                        self._vel[landed,1])
+                struck=np.unique(brick[onbrick])
+                if len(struck):
+                    bricks.remove(struck)
+                elapsed[active]=elapsed[active]+frac*left
+                active=active[hit]
+            self._bounceEdge()
+
+    def _countSubsteps(self,paddle,bricks):
+        """Returns: the int array of the number of sub-steps for each ball in
+        the coming tick.
+
+        The gap of a ball is the smallest of its gaps to the walls, to the
+        paddle, and to the live bricks in the cells covered by its motion in
+        the tick (bricks further away cannot be reached in it).  The bricks
+        are only looked up for the balls that could reach the lowest row.
+
+        Parameter paddle: The paddle
+        Precondition: paddle is a PaddleBody
+
+        Parameter bricks: The bricks
+        Precondition: bricks is a BrickField"""
+        r=BALL_DIAMETER/2
+        half=BALL_DIAMETER/2/2.0
+        x=self._pos[:,0]
+        y=self._pos[:,1]
+        vx=self._vel[:,0]
+        vy=self._vel[:,1]
+        gap=np.minimum(np.minimum(x-half,GAME_WIDTH-half-x),GAME_HEIGHT-y)
+        gap=np.minimum(gap,gap_box(x,y,r,r,paddle.left,paddle.bottom,
+                                   paddle.right,paddle.top))
+        speed=np.hypot(vx,vy)
+        near=np.flatnonzero(speed>bricks.getFloor()-(y+r))
+        owner,brick=bricks.pairs(np.minimum(x,x+vx)[near]-r,
+                                 np.minimum(y,y+vy)[near]-r,
+                                 np.maximum(x,x+vx)[near]+r,
+                                 np.maximum(y,y+vy)[near]+r)
+        owner=near[owner]
+        np.minimum.at(gap,owner,bricks.gapPairs(owner,brick,x,y,r,r))
+        return substeps(speed,gap)
+
+    def _stepOne(self,paddle,bricks,events):
+        """Moves the only ball one physics tick, and bounces it off
+        everything.
+
+        This is the method step for a set of one ball, written with plain
+        floats.  It does the same arithmetic in the same order, so the ball
+        ends up in exactly the same place.
+
+        Parameter paddle: The paddle
+        Precondition: paddle is a PaddleBody
+
+        Parameter bricks: The bricks
+        Precondition: bricks is a BrickField
+
+        Parameter events: The (empty) buffer to record the collisions in
+        Precondition: events is a CollisionEvents"""
+        r=BALL_DIAMETER/2
+        half=BALL_DIAMETER/2/2.0
+        x,y=self._pos[0].tolist()
+        vx0,vy0=self._vel[0].tolist()
+
+        # Split the tick into sub-steps, as in _countSubsteps.  The bricks
+        # are only looked up if the ball could reach the lowest row.
+        speed=math.hypot(vx0,vy0)
+        gap=min(x-half,GAME_WIDTH-half-x,GAME_HEIGHT-y,
+                _gap_one(x,y,r,r,paddle.left,paddle.bottom,paddle.right,
+                         paddle.top))
+        if speed>bricks.getFloor()-(y+r):
+            for i in bricks.query(min(x,x+vx0)-r,min(y,y+vy0)-r,
+                                  max(x,x+vx0)+r,max(y,y+vy0)+r):
+                gap=min(gap,_gap_one(x,y,r,r,*bricks.getBox(i)))
+        count=_substeps_one(speed,gap)
+        self._substeps=count
+
+        for step in range(count):
+            elapsed=step/float(count)
+            end=(step+1)/float(count)
+            for contact in range(BALL_MAX_CONTACTS):
+                left=end-elapsed
+                vx=vx0*left
+                vy=vy0*left
+
+                # Broad and narrow phase
+                first=np.inf
+                contacts=[]
+                for i in bricks.query(min(x,x+vx)-r,min(y,y+vy)-r,
+                                      max(x,x+vx)+r,max(y,y+vy)+r):
+                    t,nx,ny=_sweep_one(x,y,vx,vy,r,r,*bricks.getBox(i))
+                    if t<np.inf:
+                        contacts.append((i,t,nx,ny))
+                        first=min(first,t)
+                tp,nxp,nyp=np.inf,0.0,0.0
+                if vy<0:
+                    tp,nxp,nyp=_sweep_one(x,y,vx,vy,r,r,paddle.left,
+                                          paddle.bottom,paddle.right,
+                                          paddle.top)
+                    first=min(first,tp)
+                if first==np.inf:
+                    x=x+vx
+                    y=y+vy
+                    break
+                contacts=[c for c in contacts if c[1]<=first+_epsilon]
+                onpaddle=tp<=first+_epsilon
+                if contacts:
+                    ball,brick,time,nx,ny=zip(*[(0,i,elapsed+t*left,nx,ny)
+                                                for i,t,nx,ny in contacts])
+                    events.add(ball,brick,time,nx,ny)
+                if onpaddle:
+                    events.add((0,),-1,(elapsed+tp*left,),(nxp,),(nyp,))
+
+                # Resolve
+                x=x+vx*first
+                y=y+vy*first
+                flipx=any(c[2]!=0 for c in contacts) or (onpaddle and nxp!=0)
+                flipy=any(c[3]!=0 for c in contacts)
+                if contacts:
+                    vx0=vx0*1.05
+                    vy0=vy0*1.05
+                    bricks.remove(sorted(set(c[0] for c in contacts)))
+                if flipx:
+                    vx0=-vx0
+                if flipy:
+                    vy0=-vy0
+                if onpaddle and nyp!=0:
+                    vx0,vy0=_bounce_paddle_one(x-paddle.x,vx0,vy0)
+                elapsed=elapsed+first*left
+
+            # Bounce off the walls, as in _bounceEdge
+            if vy0>0 and y>=GAME_HEIGHT:
+                vy0=-vy0
+            if (vx0>0 and x+half>=GAME_WIDTH) or (vx0<0 and x-half<=0):
+                vx0=-vx0
+        self._pos[0]=(x,y)
+        self._vel[0]=(vx0,vy0)
+
+    def _bounceEdge(self):
+        """Reverses the velocity of each ball that has reached the top, left
+        or right edge of the window while moving towards it."""
+        half=BALL_DIAMETER/2/2.0
+        x=self._pos[:,0]
+        y=self._pos[:,1]
+        vx=self._vel[:,0]
+        vy=self._vel[:,1]
+        flipy=(vy>0)&(y>=GAME_HEIGHT)
+        flipx=((vx>0)&(x+half>=GAME_WIDTH))|((vx<0)&(x-half<=0))
+        self._vel[flipy,1]=-vy[flipy]
+        self._vel[flipx,0]=-vx[flipx]
+
+
+class CollisionEvents(object):
+    """An instance is a buffer of the collisions found in a physics tick.
+
+    Each event is a ball touching a brick or the paddle: the ball, the brick
+    (or -1 for the paddle), the time of impact as a fraction of the tick, and
+    the contact normal.  The buffer is meant to be kept and reused every tick;
+    its arrays only grow when a tick has more events than any before it.
+
+    INSTANCE ATTRIBUTES:
+        _ball  [int array]: the ball in each event
+        _brick [int array]: the brick hit in each event, or -1 for the paddle
+        _time  [float array]: the time of impact of each event, in 0..1
+        _nx    [float array]: the x part of the contact normal of each event
+        _ny    [float array]: the y part of the contact normal of each event
+        _size  [int >= 0]: the number of events in the buffer; only the first
+               _size entries of each array are used
+    """
+
+    def __init__(self,capacity=16):
+        """Initializes an empty buffer.
+
+        Parameter capacity: The number of events to make room for
+        Precondition: capacity is an int > 0"""
+        self._ball=np.zeros(capacity,dtype=int)
+        self._brick=np.zeros(capacity,dtype=int)
+        self._time=np.zeros(capacity)
+        self._nx=np.zeros(capacity)
+        self._ny=np.zeros(capacity)
+        self._size=0
+
+    def __len__(self):
+        """Returns: the number of events in the buffer"""
+        return self._size
+
+    def getBalls(self):
+        """Returns: the array of the ball in each event"""
+        return self._ball[:self._size]
+
+    def getBricks(self):
+        """Returns: the array of the brick in each event (-1 for the paddle)"""
+        return self._brick[:self._size]
+
+    def getTimes(self):
+        """Returns: the array of the time of impact of each event"""
+        return self._time[:self._size]
+
+    def getNormals(self):
+        """Returns: the (nx,ny) arrays of the contact normal of each event"""
+        return self._nx[:self._size],self._ny[:self._size]
+
+    def getDestroyed(self):
+        """Returns: the array of distinct bricks hit, in increasing order"""
+        bricks=self.getBricks()
+        if len(bricks)==0:
+            return bricks
+        return np.unique(bricks[bricks>=0])
+
+    def getPaddleHits(self):
+        """Returns: the number of times a ball hit the paddle"""
+        return int(np.count_nonzero(self.getBricks()<0))
+
+    def clear(self):
+        """Empties the buffer, keeping its storage."""
+        self._size=0
+
+    def add(self,ball,brick,time,nx,ny):
+        """Adds a group of events to the buffer.
+
+        Parameter ball: The ball of each event
+        Precondition: ball is an int array
+
+        Parameter brick: The brick of each event, or -1 for the paddle
+        Precondition: brick is an int or an int array as long as ball
+
+        Parameter time: The time of impact of each event
+        Precondition: time is a float array as long as ball
+
+        Parameter nx, ny: The contact normal of each event
+        Precondition: nx, ny are float arrays as long as ball"""
+        end=self._size+len(ball)
+        if end>len(self._ball):
+            capacity=max(end,2*len(self._ball))
+            self._ball=np.resize(self._ball,capacity)
+            self._brick=np.resize(self._brick,capacity)
+            self._time=np.resize(self._time,capacity)
+            self._nx=np.resize(self._nx,capacity)
+            self._ny=np.resize(self._ny,capacity)
+        self._ball[self._size:end]=ball
+        self._brick[self._size:end]=brick
+        self._time[self._size:end]=time
+        self._nx[self._size:end]=nx
+        self._ny[self._size:end]=ny
+        self._size=end
+
+
+class SweepAndPrune(object):
+    """An instance is a broad phase for many moving bodies, by sort and sweep
+    along x.
+
+    Each body is given by its bounding box.  The bodies are kept sorted by
+    the left edge of their box, and two bodies can only touch if the left
+    edge of one comes before the right edge of the other in this order, so
+    the candidate pairs of a body are found by a binary search instead of by
+    testing it against every other body.  All of this is done with array
+    operations, so thousands of bodies take a few sorts and searches.
+
+    The order is kept from one update to the next.  Bodies move little
+    between ticks, so the order is nearly sorted already, and it is sorted
+    again with a stable merge sort starting from the old order.  If the
+    number of bodies changes, the order starts over.
+
+    INSTANCE ATTRIBUTES:
+        _order [int array of shape (n,)]: the bodies, sorted by left edge
+        _boxes [float array of shape (n,4)]: the (left,bottom,right,top) of
+               each body, as of the last update
+    """
+
+    def __init__(self):
+        """Initializes a broad phase with no bodies."""
+        self._order=np.zeros(0,dtype=int)
+        self._boxes=np.zeros((0,4))
+
+    def __len__(self):
+        """Returns: the number of bodies"""
+        return len(self._order)
+
+    def getOrder(self):
+        """Returns: the int array of the bodies, sorted by the left edge of
+        their boxes as of the last update.
+
+        This is the array used by the broad phase, not a copy; do not modify
+        it."""
+        return self._order
+
+    def update(self,left,bottom,right,top):
+        """Sets the boxes of the bodies, and sorts them again.
+
+        Body k has the edges left[k], bottom[k], right[k] and top[k].
+
+        Parameter left, bottom, right, top: The edges of the boxes
+        Precondition: left, bottom, right, top are float arrays of the same
+        length with left <= right and bottom <= top"""
+        self._boxes=np.column_stack((left,bottom,right,top))
+        if len(self._order)!=len(self._boxes):
+            self._order=np.arange(len(self._boxes))
+        keys=self._boxes[self._order,0]
+        self._order=self._order[np.argsort(keys,kind='mergesort')]
+
+    def pairs(self):
+        """Returns: (a,b), the pairs of bodies whose boxes overlap.
+
+        The result is two int arrays of the same length, with a[j] < b[j]
+        for every pair j.  Each pair is only given once, and the pairs are
+        sorted by a and then by b, so the result does not depend on the
+        order of the sweep.  These are the candidates for a narrow phase,
+        such as BallSet.touching.
+
+        The boxes are those of the last update."""
+        order=self._order
+        boxes=self._boxes[order]
+        # The bodies after each one in the order that start before it ends
+        end=np.searchsorted(boxes[:,0],boxes[:,2],side='right')
+        counts=np.maximum(end-np.arange(len(order))-1,0)
+        first=np.repeat(np.arange(len(order)),counts)
+        second=(np.arange(len(first))-np.repeat(np.cumsum(counts)-counts,
+                                                counts)+first+1)
+        # Keep the pairs that overlap on y too
+        keep=((boxes[first,1]<=boxes[second,3])&
+              (boxes[second,1]<=boxes[first,3]))
+        a=order[first[keep]]
+        b=order[second[keep]]
+        a,b=np.minimum(a,b),np.maximum(a,b)
+        sort=np.lexsort((b,a))
+        return a[sort],b[sort]
+
+
+class Simulation(object):
+    """An instance is a single game of breakout, without any display.
+
+    This holds everything that makes up the state of a game (the paddle, the
+    bricks, the balls, the score and the number of tries left) and the rules
+    that advance it one physics tick at a time.  All of the randomness comes
+    from a random.Random of its own, so two simulations made with the same
+    seed and given the same actions play exactly the same game.
+
+    On one machine, that is.  The physics is done in floats, and two
+    machines (or two builds of NumPy) may round the last bit of a result
+    differently, a difference that the bounces then grow until the games
+    part ways.  In fixed-point mode, the positions and velocities of the
+    balls are rounded to multiples of 1/FIXED_POINT_SCALE of a pixel after
+    every serve and every tick, which wipes out such differences as soon as
+    they appear.  The paddle (which moves by whole pixels) and the bricks
+    (whose edges are on half pixels) are always on this grid.  Two machines
+    playing the same seed and actions in lockstep then only need to compare
+    the actions and, now and then, getStateHash.
+
+    A game begins waiting for a serve.  Each call to serveBall puts balls in
+    play, and each call to step moves the paddle and the balls by one tick.
+    Once every ball is lost, the game waits for loseTry and the next serve.
+
+    INSTANCE ATTRIBUTES:
+        _paddle [PaddleBody]: the paddle
+        _bricks [BrickField]: the bricks still remaining
+        _balls  [BallSet]: the balls in play (empty if waiting for a serve)
+        _events [CollisionEvents]: the collisions found in the last tick
+        _random [random.Random]: the source of the ball velocities
+        _tries  [int >= 0]: the number of tries left
+        _score  [int >= 0]: the player's score
+        _served [bool]: True once the first ball has been served
+        _start  [int >= 0]: the number of tries the game started with
+        _frames [int >= 0]: the number of ticks stepped in this game
+        _fixed  [bool]: True if the game is in fixed-point mode
+        _bodies [SweepAndPrune]: the broad phase for the balls
+    """
+
+    # GETTERS AND SETTERS
+    def getPaddle(self):
+        """Returns: the paddle (a PaddleBody)"""
+        return self._paddle
+
+    def getBricks(self):
+        """Returns: the bricks still remaining (a BrickField)"""
+        return self._bricks
+
+    def getBalls(self):
+        """Returns: the balls in play (a BallSet)"""
+        return self._balls
+
+    def getEvents(self):
+        """Returns: the collisions found in the last tick (a
+        CollisionEvents)"""
+        return self._events
+
+    def getScore(self):
+        """Returns: the player's score"""
+        return self._score
+
+    def getTries(self):
+        """Returns: the number of tries left"""
+        return self._tries
+
+    def getFrames(self):
+        """Returns: the number of ticks stepped in this game"""
+        return self._frames
+
+    def getSubsteps(self):
+        """Returns: the number of sub-steps the balls took in the last tick
+        (see BallSet.getSubsteps)"""
+        return self._balls.getSubsteps()
+
+    def isFixed(self):
+        """Returns: True if the game is in fixed-point mode"""
+        return self._fixed
+
+    def getStateHash(self):
+        """Returns: a hash of the state of the game, as a string of hex
+        digits.
+
+        The hash covers the paddle, the balls, the bricks still in play, the
+        score, the tries left and the number of ticks, so two games with the
+        same hash are (all but certainly) in the same state.  In fixed-point
+        mode, the coordinates are hashed as integer multiples of
+        1/FIXED_POINT_SCALE, and the hash is the same on every machine."""
+        coords=np.concatenate(([self._paddle.x],
+                               self._balls.getPositions().ravel(),
+                               self._balls.getVelocities().ravel()))
+        if self._fixed:
+            coords=np.round(coords*FIXED_POINT_SCALE).astype('<i8')
+        else:
+            coords=coords.astype('<f8')
+        counts=np.array([self._frames,self._score,self._tries,self._served,
+                         len(self._balls)],dtype='<i8')
+        digest=hashlib.sha1(counts.tobytes())
+        digest.update(coords.tobytes())
+        digest.update(np.packbits(self._bricks.getAlive()).tobytes())
+        return digest.hexdigest()
+
+    def getBallPairs(self):
+        """Returns: (a,b), the pairs of balls in play that touch each other.
+
+        The result is two int arrays of the same length, with a[j] < b[j],
+        sorted by a and then by b.  The pairs are found with a sort and
+        sweep broad phase (see SweepAndPrune) that is kept sorted from one
+        call to the next, and then tested with BallSet.touching.  The cost
+        grows with the number of balls and of pairs found, not with the
+        number of all pairs."""
+        r=BALL_DIAMETER/2
+        pos=self._balls.getPositions()
+        x=pos[:,0]
+        y=pos[:,1]
+        self._bodies.update(x-r,y-r,x+r,y+r)
+        a,b=self._bodies.pairs()
+        touch=self._balls.touching(a,b)
+        return a[touch],b[touch]
+
+    def waitingForServe(self):
+        """Returns: True if no ball has been served in this game yet"""
+        return not self._served
+
+    def ballLost(self):
+        """Returns: True if balls have been served but none are left in play"""
+        return self._served and len(self._balls)==0
+
+    def isOver(self):
+        """Returns: True if the game is won (no bricks are left) or lost (no
+        tries are left)"""
+        return self._bricks.isEmpty() or self._tries==0
+
+    # INITIALIZER
+    def __init__(self,tries=NUMBER_TURNS,seed=None,fixed=False):
+        """Initializes a new game: the paddle in the middle and a full field
+        of bricks, with no ball in play.
+
+        Parameter tries: The number of tries in the game
+        Precondition: tries is an int >= 0
+
+        Parameter seed: The seed of the random ball velocities, or None for
+        an unpredictable game
+        Precondition: seed is a hashable value, such as an int, or None
+
+        Parameter fixed: True for fixed-point mode
+        Precondition: fixed is a bool"""
+        assert isinstance(tries,int) and tries>=0
+        self._paddle=PaddleBody(GAME_WIDTH/2,PADDLE_OFFSET+PADDLE_HEIGHT/2,
+                                PADDLE_WIDTH,PADDLE_HEIGHT)
+        self._bricks=BrickField(BRICKS_IN_ROW,BRICK_ROWS,
+                                [colormodel.RED,colormodel.ORANGE,
+                                 colormodel.YELLOW,colormodel.GREEN,
+                                 colormodel.CYAN])
+        self._balls=BallSet()
+        self._events=CollisionEvents()
+        self._random=random.Random(seed)
+        self._start=tries
+        self._tries=tries
+        self._score=0
+        self._served=False
+        self._frames=0
+        self._fixed=fixed
+        self._bodies=SweepAndPrune()
+
+    def reset(self,seed=None):
+        """Starts a new game in this simulation, as if it had just been
+        made with the given seed.
+
+        This reuses the arrays of the bricks and the balls, so it is cheaper
+        than making a new Simulation.
+
+        Parameter seed: The seed of the random ball velocities, or None for
+        an unpredictable game
+        Precondition: seed is a hashable value, such as an int, or None"""
+        self._paddle.x=float(GAME_WIDTH/2)
+        self._bricks.reset()
+        self._balls.clear()
+        self._events.clear()
+        self._random.seed(seed)
+        self._tries=self._start
+        self._score=0
+        self._served=False
+        self._frames=0
+
+    # UPDATE METHODS
+    def serveBall(self):
+        """Puts BALLS_PER_SERVE new balls in play in the middle of the
+        window, each moving down in a random direction."""
+        self._served=True
+        self._balls.serve(GAME_WIDTH/2,GAME_HEIGHT/2,BALLS_PER_SERVE,
+                          self._random)
+        if self._fixed:
+            self._balls.quantize(FIXED_POINT_SCALE)
+
+    def loseTry(self):
+        """Uses up one try, if there are any left."""
+        if self._tries>0:
+            self._tries=self._tries-1
+
+    def movePaddle(self,action):
+        """Moves the paddle for one tick.
+
+        The paddle moves PADDLE_SPEED pixels in the direction of the action,
+        but never past the edges of the window.
+
+        Parameter action: The direction to move the paddle: -1 for left,
+        1 for right and 0 to stay still
+        Precondition: action is -1, 0 or 1"""
+        if action:
+            self._paddle.move(action*PADDLE_SPEED)
+
+    def stepBalls(self):
+        """Moves the balls for one tick.
+
+        The balls bounce off the walls, the paddle and the bricks, and each
+        brick hit is destroyed and scores 10 points.  The collisions are
+        recorded in the events.  At the end of the tick, balls that touch
+        (see getBallPairs) and move towards each other bounce off each other
+        (see BallSet.collide).  Balls that fall out of the bottom of the
+        window are taken out of play.
+
+        Returns: the number of bricks destroyed"""
+        self._balls.step(self._paddle,self._bricks,self._events)
+        if len(self._balls)>1:
+            a,b=self.getBallPairs()
+            self._balls.collide(a,b)
+        if self._fixed:
+            self._balls.quantize(FIXED_POINT_SCALE)
+        destroyed=len(self._events.getDestroyed())
+        self._score=self._score+10*destroyed
+        self._balls.removeLost()
+        return destroyed
+
+    def fastForward(self,frames):
+        """Advances the game by up to frames ticks, with the paddle still.
+
+        Rather than stepping every tick, this jumps over the ticks in which
+        nothing happens (see BallSet.quietTicks) and only steps the ticks
+        around a collision, a bounce off a wall or a lost ball.  The cost
+        depends on the number of these events, not on the number of ticks.
+        The game ends up in exactly the state that stepping every tick with
+        action 0 would put it in (and so with the same getStateHash), in
+        fixed-point mode or not.
+
+        The game stops early if it is over or no ball is in play (so that
+        the caller can take a try and serve).
+
+        Returns: the number of ticks advanced
+
+        Parameter frames: The most ticks to advance
+        Precondition: frames is an int >= 0"""
+        done=0
+        while done<frames and len(self._balls) and not self.isOver():
+            skip=self._balls.quietTicks(self._paddle,self._bricks,frames-done)
+            if skip:
+                self._balls.drift(skip)
+                self._events.clear()
+                self._frames=self._frames+skip
+                done=done+skip
+            # After a miss, the balls are busy: step a few ticks before
+            # looking again
+            busy=1 if skip else _busy_ticks
+            while (busy and done<frames and len(self._balls) and
+                   not self.isOver()):
+                self.step(0)
+                done=done+1
+                busy=busy-1
+        return done
+
+    def step(self,action=0):
+        """Advances the game by one physics tick: moves the paddle by the
+        action, and then the balls.
+
+        Returns: the number of bricks destroyed
+
+        Parameter action: The direction to move the paddle: -1 for left,
+        1 for right and 0 to stay still
+        Precondition: action is -1, 0 or 1"""
+        self._frames=self._frames+1
+        self.movePaddle(action)
+        return self.stepBalls()
+
+
+class BatchPlay(object):
+    """An instance is many independent games of breakout, stepped together.
+
+    A Simulation is cheap, but stepping thousands of them one at a time still
+    costs a Python call per game per tick.  This class stores every game in
+    the same set of NumPy arrays instead (the paddles, the balls and the
+    brick alive masks, stacked along a first axis of games) and moves all of
+    them with a single call to step.  The bricks of all the games share one
+    BrickField, which is only used for its layout.
+
+    The games play by themselves: balls are served as soon as a game starts
+    and as soon as the last ball of a try is lost.  A game that ends (won or
+    out of tries) is reset in place during the step it ends in; its final
+    score is kept, and it carries on with a new game from the same random
+    stream.  Until then, game k plays exactly the same game as a
+    Simulation with the same seed given the same actions.
+
+    Each game owns BALLS_PER_SERVE ball slots: game k owns the slots
+    k*BALLS_PER_SERVE up to (k+1)*BALLS_PER_SERVE-1 of the ball arrays.
+
+    INSTANCE ATTRIBUTES:
+        _size     [int > 0]: the number of games
+        _start    [int > 0]: the number of tries each game starts with
+        _layout   [BrickField]: the layout of the bricks; its own bricks are
+                  never removed
+        _nbricks  [int > 0]: the number of bricks in a full field
+        _paddle   [float array of shape (n,)]: the x of each paddle
+        _alive    [bool array of shape (n*nbricks,)]: the bricks still in
+                  play; brick i of game k is entry k*nbricks+i
+        _count    [int array of shape (n,)]: the number of bricks left in
+                  each game
+        _pos      [float array of shape (n*BALLS_PER_SERVE,2)]: the center of
+                  the ball in each slot
+        _vel      [float array of shape (n*BALLS_PER_SERVE,2)]: the velocity
+                  of the ball in each slot
+        _live     [bool array of shape (n*BALLS_PER_SERVE,)]: True for the
+                  slots with a ball in play
+        _score    [int array of shape (n,)]: the score of each game
+        _tries    [int array of shape (n,)]: the tries left in each game
+        _random   [list of random.Random]: the source of the ball velocities
+                  of each game
+        _done     [bool array of shape (n,)]: True for the games that ended
+                  (and were reset) in the last step
+        _final    [int array of shape (n,)]: the final score of the last game
+                  that ended in each slot, or 0 if none has
+        _episodes [int array of shape (n,)]: the number of games that have
+                  ended in each slot
+        _substeps [int >= 0]: the number of sub-steps in the last step (the
+                  most taken by any ball)
+        _bodies   [SweepAndPrune]: the broad phase for the balls of all of
+                  the games
+    """
+
+    # GETTERS
+    def __len__(self):
+        """Returns: the number of games"""
+        return self._size
+
+    def getPaddles(self):
+        """Returns: the (n,) array of paddle x positions.
+
+        This is the array used by the games, not a copy; do not modify it."""
+        return self._paddle
+
+    def getBallPositions(self):
+        """Returns: the (n,BALLS_PER_SERVE,2) array of ball centers.
+
+        Only the entries marked in getBallsInPlay hold a ball.  This is a
+        view of the array used by the games; do not modify it."""
+        return self._pos.reshape(self._size,BALLS_PER_SERVE,2)
+
+    def getBallVelocities(self):
+        """Returns: the (n,BALLS_PER_SERVE,2) array of ball velocities.
+
+        Only the entries marked in getBallsInPlay hold a ball.  This is a
+        view of the array used by the games; do not modify it."""
+        return self._vel.reshape(self._size,BALLS_PER_SERVE,2)
+
+    def getBallsInPlay(self):
+        """Returns: the (n,BALLS_PER_SERVE) bool array of the ball slots in
+        play.
+
+        This is a view of the array used by the games; do not modify it."""
+        return self._live.reshape(self._size,BALLS_PER_SERVE)
+
+    def getAlive(self):
+        """Returns: the (n,number of bricks) bool array of the bricks still
+        in play, in the brick order of BrickField.
+
+        This is a view of the array used by the games; do not modify it."""
+        return self._alive.reshape(self._size,self._nbricks)
+
+    def getBricksLeft(self):
+        """Returns: the (n,) array of the number of bricks left in each game"""
+        return self._count
+
+    def getScores(self):
+        """Returns: the (n,) array of the score of each game"""
+        return self._score
+
+    def getTries(self):
+        """Returns: the (n,) array of the tries left in each game"""
+        return self._tries
+
+    def getDone(self):
+        """Returns: the (n,) bool array of the games that ended in the last
+        step.  These games have already been reset."""
+        return self._done
+
+    def getFinalScores(self):
+        """Returns: the (n,) array of the final score of the last game that
+        ended in each slot (0 if none has)"""
+        return self._final
+
+    def getEpisodes(self):
+        """Returns: the (n,) array of the number of games ended in each slot"""
+        return self._episodes
+
+    def getSubsteps(self):
+        """Returns: the number of sub-steps in the last step, the most taken
+        by any ball in any game (see BallSet.getSubsteps)"""
+        return self._substeps
+
+    # INITIALIZER
+    def __init__(self,size,tries=NUMBER_TURNS,seeds=None):
+        """Initializes size new games, each with a ball already served.
+
+        Parameter size: The number of games
+        Precondition: size is an int > 0
+
+        Parameter tries: The number of tries in each game
+        Precondition: tries is an int > 0
+
+        Parameter seeds: The seed of each game, or None for unpredictable
+        games
+        Precondition: seeds is None or a list of size hashable values"""
+        assert isinstance(size,int) and size>0
+        assert isinstance(tries,int) and tries>0
+        self._size=size
+        self._start=tries
+        self._layout=BrickField(BRICKS_IN_ROW,BRICK_ROWS,
+                                [colormodel.RED,colormodel.ORANGE,
+                                 colormodel.YELLOW,colormodel.GREEN,
+                                 colormodel.CYAN])
+        self._nbricks=BRICKS_IN_ROW*BRICK_ROWS
+        self._paddle=np.empty(size)
+        self._alive=np.empty(size*self._nbricks,dtype=bool)
+        self._count=np.empty(size,dtype=int)
+        self._pos=np.zeros((size*BALLS_PER_SERVE,2))
+        self._vel=np.zeros((size*BALLS_PER_SERVE,2))
+        self._live=np.zeros(size*BALLS_PER_SERVE,dtype=bool)
+        self._score=np.empty(size,dtype=int)
+        self._tries=np.empty(size,dtype=int)
+        self._done=np.zeros(size,dtype=bool)
+        self._final=np.zeros(size,dtype=int)
+        self._episodes=np.zeros(size,dtype=int)
+        self._substeps=0
+        self._bodies=SweepAndPrune()
+        self.reset(seeds)
+
+    # UPDATE METHODS
+    def reset(self,seeds=None):
+        """Starts a new game in every slot, each with a ball already served.
+
+        Parameter seeds: The seed of each game, or None for unpredictable
+        games
+        Precondition: seeds is None or a list of len(self) hashable values"""
+        if seeds is None:
+            seeds=[None]*self._size
+        assert len(seeds)==self._size
+        self._random=[random.Random(seed) for seed in seeds]
+        self._done[:]=False
+        self._final[:]=0
+        self._episodes[:]=0
+        for k in range(self._size):
+            self._restart(k)
+
+    def step(self,actions):
+        """Advances every game by one physics tick.
+
+        Each paddle is moved by its action, and then every ball.  This does
+        for all of the games what Simulation.step does for one.  Games that
+        lose their last ball get a new one, and games that end are reset.
+
+        Returns: the (n,) array of the number of bricks destroyed in each game
+
+        Parameter actions: The direction to move each paddle: -1 for left,
+        1 for right and 0 to stay still
+        Precondition: actions is an int array of shape (n,), with values in
+        -1..1"""
+        actions=np.asarray(actions)
+        assert actions.shape==(self._size,)
+        self._movePaddles(actions)
+        destroyed=self._stepBalls()
+        if BALLS_PER_SERVE>1:
+            self._collideBalls()
+        self._score+=10*destroyed
+        half=BALL_DIAMETER/2/2.0
+        self._live&=self._pos[:,1]+half>0
+        lost=~self.getBallsInPlay().any(axis=1)
+        self._tries[lost]-=1
+        self._done=(self._count==0)|(self._tries==0)
+        for k in np.flatnonzero(lost&~self._done):
+            self._serve(k)
+        for k in np.flatnonzero(self._done):
+            self._final[k]=self._score[k]
+            self._episodes[k]+=1
+            self._restart(k)
+        return destroyed
+
+    # HELPER METHODS
+    def _restart(self,k):
+        """Starts a new game in slot k, with a ball already served.
+
+        Parameter k: The game
+        Precondition: k is an int in 0..n-1"""
+        self._paddle[k]=GAME_WIDTH/2
+        self._alive[k*self._nbricks:(k+1)*self._nbricks]=True
+        self._count[k]=self._nbricks
+        self._score[k]=0
+        self._tries[k]=self._start
+        self._serve(k)
+
+    def _serve(self,k):
+        """Puts BALLS_PER_SERVE new balls in play in game k, as
+        Simulation.serveBall does.
+
+        Parameter k: The game
+        Precondition: k is an int in 0..n-1"""
+        rng=self._random[k]
+        for j in range(k*BALLS_PER_SERVE,(k+1)*BALLS_PER_SERVE):
+            self._pos[j]=(GAME_WIDTH/2,GAME_HEIGHT/2)
+            self._vel[j]=(rng.uniform(1.0,5.0)*rng.choice([-1,1]),-5.0)
+            self._live[j]=True
+
+    def _movePaddles(self,actions):
+        """Moves every paddle by its action, as PaddleBody.move does.
+
+        Parameter actions: The direction to move each paddle
+        Precondition: actions is an int array of shape (n,), with values in
+        -1..1"""
+        x=self._paddle
+        dx=actions*PADDLE_SPEED
+        left=x-PADDLE_WIDTH/2.0
+        right=x+PADDLE_WIDTH/2.0
+        atright=x+dx+PADDLE_WIDTH/2>=GAME_WIDTH
+        atleft=x+dx-PADDLE_WIDTH/2<=0
+        moved=np.where(atright,x+np.minimum(right,GAME_WIDTH)-right,
+                       np.where(atleft,x+np.maximum(left,0)-left,x+dx))
+        self._paddle=np.where(dx!=0,moved,x)
+
+    def _stepBalls(self):
+        """Moves every ball in play one physics tick, and bounces it off
+        everything.
+
+        This is the pipeline of BallSet.step, sub-steps and all, run on the
+        balls of all of the games at once.  Each ball is only tested against
+        the paddle and the bricks of its own game.
+
+        Returns: the (n,) array of the number of bricks destroyed in each
+        game"""
+        r=BALL_DIAMETER/2
+        half=BALL_DIAMETER/2/2.0
+        nbricks=self._nbricks
+        destroyed=np.zeros(self._size,dtype=int)
+        bottom=float(PADDLE_OFFSET+PADDLE_HEIGHT/2)-PADDLE_HEIGHT/2.0
+        top=float(PADDLE_OFFSET+PADDLE_HEIGHT/2)+PADDLE_HEIGHT/2.0
+
+        # Split the tick of each ball into sub-steps, as in BallSet
+        count=np.zeros(len(self._live),dtype=int)
+        active=np.flatnonzero(self._live)
+        game=active//BALLS_PER_SERVE
+        x=self._pos[active,0]
+        y=self._pos[active,1]
+        vx=self._vel[active,0]
+        vy=self._vel[active,1]
+        px=self._paddle[game]
+        gap=np.minimum(np.minimum(x-half,GAME_WIDTH-half-x),GAME_HEIGHT-y)
+        gap=np.minimum(gap,gap_box(x,y,r,r,px-PADDLE_WIDTH/2.0,bottom,
+                                   px+PADDLE_WIDTH/2.0,top))
+        speed=np.hypot(vx,vy)
+        near=np.flatnonzero(speed>self._layout.getFloor()-(y+r))
+        x=x[near]
+        y=y[near]
+        vx=vx[near]
+        vy=vy[near]
+        owner,brick=self._layout.cells(np.minimum(x,x+vx)-r,
+                                       np.minimum(y,y+vy)-r,
+                                       np.maximum(x,x+vx)+r,
+                                       np.maximum(y,y+vy)+r)
+        live=self._alive[game[near[owner]]*nbricks+brick]
+        owner=near[owner[live]]
+        np.minimum.at(gap,owner,
+                      self._layout.gapPairs(owner,brick[live],
+                                            self._pos[active,0],
+                                            self._pos[active,1],r,r))
+        count[active]=substeps(speed,gap)
+        self._substeps=int(count.max())
+
+        elapsed=np.zeros(len(self._live))
+        end=np.ones(len(self._live))
+        for step in range(self._substeps):
+            active=np.flatnonzero(count>step)
+            elapsed[active]=step/count[active].astype(float)
+            end[active]=(step+1)/count[active].astype(float)
+            for contact in range(BALL_MAX_CONTACTS):
+                if len(active)==0:
+                    break
+                game=active//BALLS_PER_SERVE
+                x=self._pos[active,0]
+                y=self._pos[active,1]
+                left=end[active]-elapsed[active]
+                vx=self._vel[active,0]*left
+                vy=self._vel[active,1]*left
+
+                # Broad phase, in the bricks of the game of each ball
+                owner,brick=self._layout.cells(np.minimum(x,x+vx)-r,
+                                               np.minimum(y,y+vy)-r,
+                                               np.maximum(x,x+vx)+r,
+                                               np.maximum(y,y+vy)+r)
+                key=game[owner]*nbricks+brick
+                live=self._alive[key]
+                owner=owner[live]
+                brick=brick[live]
+                key=key[live]
+
+                # Narrow phase
+                t,nx,ny=self._layout.sweepPairs(owner,brick,x,y,vx,vy,r,r)
+                px=self._paddle[game]
+                tp,nxp,nyp=sweep_box(x,y,vx,vy,r,r,px-PADDLE_WIDTH/2.0,bottom,
+                                     px+PADDLE_WIDTH/2.0,top)
+                tp=np.where(vy<0,tp,np.inf)
+                first=tp.copy()
+                np.minimum.at(first,owner,t)
+                hit=first<np.inf
+                onbrick=(t<np.inf)&(t<=first[owner]+_epsilon)
+                onpaddle=hit&(tp<=first+_epsilon)
+                owner=owner[onbrick]
+
+                # Resolve
+                frac=np.where(hit,first,1.0)
+                self._pos[active,0]=x+vx*frac
+                self._pos[active,1]=y+vy*frac
+                m=len(active)
+                flipx=((np.bincount(owner,nx[onbrick]!=0,m)>0)|
+                       (onpaddle&(nxp!=0)))
+                flipy=np.bincount(owner,ny[onbrick]!=0,m)>0
+                fast=active[np.unique(owner)]
+                self._vel[fast]=self._vel[fast]*1.05
+                self._vel[active[flipx],0]=-self._vel[active[flipx],0]
+                self._vel[active[flipy],1]=-self._vel[active[flipy],1]
+                landed=onpaddle&(nyp!=0)
+                if landed.any():
+                    ball=active[landed]
+                    self._vel[ball,0],self._vel[ball,1]=bounce_paddle(
+                        self._pos[ball,0]-px[landed],self._vel[ball,0],
+                        self._vel[ball,1])
+                struck=np.unique(key[onbrick])
+                if len(struck):
+                    self._alive[struck]=False
+                    destroyed+=np.bincount(struck//nbricks,
+                                           minlength=self._size)
+                elapsed[active]=elapsed[active]+frac*left
+                active=active[hit]
+
+            # Bounce off the walls, as in BallSet._bounceEdge
+            x=self._pos[:,0]
+            y=self._pos[:,1]
+            vx=self._vel[:,0]
+            vy=self._vel[:,1]
+            flipy=self._live&(vy>0)&(y>=GAME_HEIGHT)
+            flipx=self._live&(((vx>0)&(x+half>=GAME_WIDTH))|
+                              ((vx<0)&(x-half<=0)))
+            self._vel[flipy,1]=-vy[flipy]
+            self._vel[flipx,0]=-vx[flipx]
+        self._count-=destroyed
+        return destroyed
+
+    def _collideBalls(self):
+        """Bounces the touching balls of each game off each other, as
+        Simulation.stepBalls does.
+
+        The balls of all of the games go through one SweepAndPrune, with the
+        boxes of game k moved 2*k*GAME_WIDTH to the right, so that balls of
+        different games are not paired.  The boxes are a pixel wider than
+        the balls, so that the round off of this move never loses a pair."""
+        r=BALL_DIAMETER/2
+        slots=np.flatnonzero(self._live)
+        x=self._pos[slots,0]+(slots//BALLS_PER_SERVE)*2.0*GAME_WIDTH
+        y=self._pos[slots,1]
+        self._bodies.update(x-r-1,y-r-1,x+r+1,y+r+1)
+        a,b=self._bodies.pairs()
+        a=slots[a]
+        b=slots[b]
+        d=self._pos[a]-self._pos[b]
+        touch=((a//BALLS_PER_SERVE==b//BALLS_PER_SERVE)&
+               (np.hypot(d[:,0],d[:,1])<=2*r))
+        _collide_pairs(self._pos,self._vel,a[touch],b[touch])
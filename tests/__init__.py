@@ -0,0 +1,16 @@
+"""Tests for Breakout
+
+These tests cover the modules that do not need Kivy: the simulation, the
+environment, the seed sweep runner and the software rasterizer.  The tests of
+game2d are skipped where Kivy is not installed.  Run them from the top of the
+repository with
+
+    python -m unittest discover -s tests -t .
+
+The modules of the game import each other by name, so the folder breakout is
+put on the path here, before any test imports them."""
+import os
+import sys
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))),'breakout'))
@@ -0,0 +1,103 @@
+"""Unit tests for env.py"""
+import unittest
+import numpy as np
+from constants import *
+from env import BreakoutEnv
+
+
+class BreakoutEnvTest(unittest.TestCase):
+    """Tests for the step-by-step environment, BreakoutEnv"""
+
+    def testReset(self):
+        """A new episode starts with the paddle in the middle, a ball served
+        and every brick in play"""
+        env=BreakoutEnv()
+        obs=env.reset(seed=1)
+        nbricks=BRICKS_IN_ROW*BRICK_ROWS
+        self.assertEqual(obs.shape,(1+4*BALLS_PER_SERVE+nbricks,))
+        self.assertEqual(obs.dtype,np.float32)
+        self.assertEqual(obs[0],GAME_WIDTH/2)
+        self.assertEqual(tuple(obs[1:3]),(GAME_WIDTH/2,GAME_HEIGHT/2))
+        self.assertEqual(obs[4],-5.0)
+        self.assertTrue((obs[1+4*BALLS_PER_SERVE:]==1).all())
+        self.assertEqual(env.getSimulation().getFrames(),0)
+
+    def testStep(self):
+        """A step repeats the action for frameskip ticks, and returns the
+        same observation and info on every step"""
+        env=BreakoutEnv(frameskip=4)
+        obs=env.reset(seed=1)
+        obs2,reward,done,info=env.step(BreakoutEnv.LEFT)
+        self.assertTrue(obs2 is obs)
+        self.assertEqual(obs[0],GAME_WIDTH/2-4*PADDLE_SPEED)
+        self.assertEqual(info['frames'],4)
+        self.assertEqual((reward,done),(0,False))
+        obs3,reward,done,info2=env.step(BreakoutEnv.RIGHT)
+        self.assertTrue(info2 is info)
+        self.assertEqual(obs[0],GAME_WIDTH/2)
+        self.assertRaises(AssertionError,env.step,3)
+
+    def testEpisode(self):
+        """The rewards add up to the score, and the episode is done when the
+        game is over"""
+        env=BreakoutEnv(frameskip=2,tries=1)
+        env.reset(seed=2)
+        total=0
+        done=False
+        while not done:
+            obs,reward,done,info=env.step(BreakoutEnv.NOOP)
+            total=total+reward
+        sim=env.getSimulation()
+        self.assertTrue(sim.isOver())
+        self.assertEqual(total,info['score'])
+        self.assertEqual(info['score'],sim.getScore())
+        self.assertEqual(info['tries'],0)
+        bricks=obs[1+4*BALLS_PER_SERVE:]
+        self.assertEqual(int(bricks.sum()),len(sim.getBricks()))
+        # Stepping a finished episode changes nothing
+        frames=info['frames']
+        self.assertEqual(env.step(BreakoutEnv.LEFT)[1:3],(0,True))
+        self.assertEqual(info['frames'],frames)
+
+    def testLimit(self):
+        """An episode with a limit is done after that many ticks, and
+        stepping it again does nothing"""
+        env=BreakoutEnv(frameskip=3,limit=10)
+        env.reset(seed=1)
+        steps=0
+        done=False
+        while not done:
+            obs,reward,done,info=env.step(BreakoutEnv.NOOP)
+            steps=steps+1
+        self.assertEqual((steps,info['frames']),(4,10))
+        score=info['score']
+        obs,reward,done,info=env.step(BreakoutEnv.RIGHT)
+        self.assertTrue(done)
+        self.assertEqual(reward,0)
+        self.assertEqual((info['frames'],info['score']),(10,score))
+
+    def testSeed(self):
+        """Two episodes with the same seed and actions are the same"""
+        first=BreakoutEnv()
+        second=BreakoutEnv()
+        first.reset(seed=9)
+        second.reset(seed=9)
+        for k in range(500):
+            a=first.step(k%3)
+            b=second.step(k%3)
+            self.assertTrue(np.array_equal(a[0],b[0]))
+            self.assertEqual(a[1:3],b[1:3])
+
+    def testRender(self):
+        """render draws the game into one array of pixels"""
+        env=BreakoutEnv()
+        env.reset(seed=1)
+        pixels=env.render()
+        self.assertEqual(pixels.shape,(GAME_HEIGHT,GAME_WIDTH,3))
+        self.assertEqual(pixels.dtype,np.uint8)
+        env.step(BreakoutEnv.NOOP)
+        self.assertTrue(env.render() is pixels)
+
+
+if __name__ == '__main__':
+    unittest.main()
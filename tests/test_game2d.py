@@ -0,0 +1,51 @@
+"""Unit tests for game2d.py
+
+game2d needs Kivy, so these tests are skipped where Kivy is not installed."""
+import unittest
+
+try:
+    import game2d
+except ImportError:
+    game2d = None
+
+
+@unittest.skipIf(game2d is None,'game2d needs Kivy')
+class SkipDrawTest(unittest.TestCase):
+    """Tests for the pacing of the draws in GameApp, _skip_draw"""
+
+    def testOnTime(self):
+        """A frame that is on time is drawn, however long the work takes"""
+        self.assertFalse(game2d._skip_draw(1/60.0,1/60.0,0.01,0.0066,0,3))
+        self.assertFalse(game2d._skip_draw(1/60.0,1/60.0,0.02,0.02,0,3))
+        self.assertFalse(game2d._skip_draw(0.01,1/60.0,0.02,0.02,0,3))
+
+    def testLate(self):
+        """A late frame is skipped only if drawing would make the next frame
+        late too"""
+        self.assertTrue(game2d._skip_draw(0.025,1/60.0,0.005,0.005,0,3))
+        self.assertFalse(game2d._skip_draw(0.018,1/60.0,0.001,0.001,0,3))
+
+    def testLimit(self):
+        """No more than limit draws are skipped in a row"""
+        self.assertTrue(game2d._skip_draw(0.05,1/60.0,0.01,0.01,2,3))
+        self.assertFalse(game2d._skip_draw(0.05,1/60.0,0.01,0.01,3,3))
+        self.assertFalse(game2d._skip_draw(0.05,1/60.0,0.01,0.01,0,0))
+
+    def testSteady(self):
+        """With update and draw taking about a period, every frame that
+        comes in on time is drawn"""
+        period=1/60.0
+        skips=0
+        drawn=0
+        for frame in range(100):
+            if game2d._skip_draw(period,period,0.5*period,0.49*period,
+                                 skips,3):
+                skips=skips+1
+            else:
+                skips=0
+                drawn=drawn+1
+        self.assertEqual(drawn,100)
+
+
+if __name__ == '__main__':
+    unittest.main()
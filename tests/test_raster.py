@@ -0,0 +1,236 @@
+"""Unit tests for raster.py"""
+import unittest
+import numpy as np
+from constants import *
+import colormodel
+from raster import Framebuffer
+from simulation import Simulation
+
+
+class FramebufferTest(unittest.TestCase):
+    """Tests for drawing games with Framebuffer.drawSimulation"""
+
+    def play(self,sim,ticks,frame=None):
+        """Steps the game for the given number of ticks, serving again when
+        the ball is lost, and draws every tick into frame (if not None).
+
+        Parameter ticks: The number of ticks
+        Precondition: ticks is an int >= 0"""
+        rng=np.random.RandomState(3)
+        for action in rng.randint(-1,2,ticks).tolist():
+            sim.step(action)
+            if sim.ballLost():
+                sim.loseTry()
+                if sim.isOver():
+                    sim.reset(1)
+                sim.serveBall()
+            if frame is not None:
+                frame.drawSimulation(sim)
+
+    def scratch(self,sim):
+        """Returns: the pixels of sim drawn in a new Framebuffer"""
+        frame=Framebuffer()
+        frame.drawSimulation(sim)
+        return frame.getPixels()
+
+    def testBricks(self):
+        """A new frame has the same pixels as filling the background, each
+        brick alive, the paddle and the balls one shape at a time"""
+        sim=Simulation(seed=2)
+        sim.serveBall()
+        self.play(sim,600)
+        bricks=sim.getBricks()
+        self.assertLess(len(bricks),len(bricks.getAlive()))
+        expected=Framebuffer()
+        for i in bricks:
+            expected.fillRect(*(bricks.getBox(i)+(bricks.getColor(i),)))
+        paddle=sim.getPaddle()
+        expected.fillRect(paddle.left,paddle.bottom,paddle.right,paddle.top,
+                          colormodel.BLACK)
+        for x,y in sim.getBalls().getPositions().tolist():
+            expected.fillEllipse(x,y,BALL_DIAMETER/2,BALL_DIAMETER/2,
+                                 bricks.getLastColor())
+        self.assertTrue(np.array_equal(self.scratch(sim),
+                                       expected.getPixels()))
+
+    def testIncremental(self):
+        """Drawing every tick into the same frame gives the same pixels as a
+        new frame, through lost bricks, lost balls and new games"""
+        sim=Simulation(tries=1,seed=4)
+        sim.serveBall()
+        frame=Framebuffer()
+        frame.drawSimulation(sim)
+        for check in range(12):
+            self.play(sim,250,frame)
+            self.assertTrue(np.array_equal(frame.getPixels(),
+                                           self.scratch(sim)))
+
+    def testDamage(self):
+        """Only the pixels in the damage of a frame differ from the frame
+        before it"""
+        sim=Simulation(seed=5)
+        sim.serveBall()
+        frame=Framebuffer()
+        frame.drawSimulation(sim)
+        self.assertEqual(frame.getDamage(),[(0,0,GAME_WIDTH,GAME_HEIGHT)])
+        for tick in range(300):
+            before=frame.getPixels().copy()
+            self.play(sim,1,frame)
+            damaged=np.zeros((GAME_HEIGHT,GAME_WIDTH),dtype=bool)
+            for left,top,right,bottom in frame.getDamage():
+                damaged[top:bottom,left:right]=True
+            self.assertFalse(damaged.all())
+            same=(frame.getPixels()==before).all(axis=2)
+            self.assertTrue(same[~damaged].all())
+
+    def testOverlay(self):
+        """A shape drawn between two frames only damages its own block, and
+        the next frame wipes it without drawing the whole frame again"""
+        sim=Simulation(seed=6)
+        sim.serveBall()
+        frame=Framebuffer()
+        frame.drawSimulation(sim)
+        frame.resetDamage()
+        frame.fillRect(100,200,140,230,colormodel.RED)
+        frame.fillEllipse(300,100,20,10,[0,0,1,0.5])
+        self.assertEqual(frame.getDamage(),[(100,390,140,420),
+                                            (290,515,310,525)])
+        self.play(sim,1,frame)
+        self.assertNotIn((0,0,GAME_WIDTH,GAME_HEIGHT),frame.getDamage())
+        self.assertIn((100,390,140,420),frame.getDamage())
+        self.assertTrue(np.array_equal(frame.getPixels(),self.scratch(sim)))
+        frame.clear()
+        self.play(sim,1,frame)
+        self.assertEqual(frame.getDamage(),[(0,0,GAME_WIDTH,GAME_HEIGHT)])
+        self.assertTrue(np.array_equal(frame.getPixels(),self.scratch(sim)))
+
+class Matrix(object):
+    """A stand-in for GMatrix: the affine map (x,y) to
+    (a*x+b*y+e, c*x+d*y+f)"""
+
+    def __init__(self,a=1,b=0,c=0,d=1,e=0,f=0):
+        """Initializes the map with the given parts"""
+        self.parts=(a,b,c,d,e,f)
+
+    def _transform(self,x=0,y=0,z=0):
+        """Returns: [x,y,z] moved by the map, as GMatrix._transform does"""
+        a,b,c,d,e,f=self.parts
+        return [a*x+b*y+e,c*x+d*y+f,z]
+
+
+class GRectangle(object):
+    """A stand-in for the GRectangle of game2d, with the attributes that
+    drawObject reads"""
+
+    def __init__(self,matrix,width=0,height=0,points=(),
+                 fillcolor=colormodel.RED,linecolor=colormodel.BLUE,
+                 linewidth=0):
+        """Initializes a shape with the given matrix and attributes"""
+        self.matrix=matrix
+        self.width=width
+        self.height=height
+        self.points=points
+        self.fillcolor=fillcolor
+        self.linecolor=linecolor
+        self.linewidth=linewidth
+
+
+class GImage(GRectangle):
+    """A stand-in for GImage, drawn as its background rectangle"""
+
+
+class GEllipse(GRectangle):
+    """A stand-in for GEllipse"""
+
+
+class GPath(GRectangle):
+    """A stand-in for GPath"""
+
+
+class GTriangle(GPath):
+    """A stand-in for GTriangle"""
+
+
+class GPolygon(GPath):
+    """A stand-in for GPolygon"""
+
+
+class DrawObjectTest(unittest.TestCase):
+    """Tests for drawing game2d shapes with Framebuffer.drawObject, using
+    stand-ins for the shapes"""
+
+    def assertSame(self,obj,expected):
+        """Asserts that drawing obj gives the same pixels as the frame
+        expected"""
+        frame=Framebuffer()
+        frame.drawObject(obj)
+        self.assertTrue(np.array_equal(frame.getPixels(),
+                                       expected.getPixels()))
+
+    def testRectangle(self):
+        """A moved and scaled rectangle, and an image, fill their box"""
+        expected=Framebuffer()
+        expected.fillRect(80,190,120,210,colormodel.RED)
+        self.assertSame(GRectangle(Matrix(e=100,f=200),40,20),expected)
+        self.assertSame(GImage(Matrix(a=2,d=0.5,e=100,f=200),20,40),
+                        expected)
+
+    def testRotated(self):
+        """A rectangle turned a quarter turn fills the turned box"""
+        expected=Framebuffer()
+        expected.fillRect(90,180,110,220,colormodel.RED)
+        self.assertSame(GRectangle(Matrix(0,-1,1,0,100,200),40,20),expected)
+
+    def testBorder(self):
+        """The border of a rectangle is drawn around it, as wide as the
+        line width times the scale"""
+        expected=Framebuffer()
+        expected.fillRect(80,190,120,210,colormodel.RED)
+        expected.drawLine([(80,190),(120,190),(120,210),(80,210)],6,
+                          colormodel.BLUE,True)
+        self.assertSame(GRectangle(Matrix(a=2,d=2,e=100,f=200),20,10,
+                                   linewidth=3),expected)
+
+    def testEllipse(self):
+        """An ellipse fills the ellipse of its box, turned or not"""
+        expected=Framebuffer()
+        expected.fillEllipse(200,300,60,20,colormodel.RED)
+        self.assertSame(GEllipse(Matrix(a=2,d=2,e=200,f=300),30,10),expected)
+        self.assertSame(GEllipse(Matrix(0,-1,1,0,200,300),20,60),expected)
+
+    def testTriangle(self):
+        """A triangle fills its points, moved by its matrix"""
+        expected=Framebuffer()
+        expected.fillTriangles([[(110,210),(150,210),(110,250)]],
+                               colormodel.RED)
+        self.assertSame(GTriangle(Matrix(e=100,f=200),
+                                  points=(10,10,50,10,10,50)),expected)
+
+    def testPolygon(self):
+        """A polygon fills its outline"""
+        expected=Framebuffer()
+        expected.fillRect(90,190,130,230,colormodel.RED)
+        self.assertSame(GPolygon(Matrix(a=2,d=2,e=100,f=200),
+                                 points=(-5,-5,15,-5,15,15,-5,15)),expected)
+
+    def testPath(self):
+        """A path draws its line, but not its fill, and its width is scaled"""
+        expected=Framebuffer()
+        expected.drawLine([(100,200),(160,200),(160,260)],4,colormodel.BLUE)
+        self.assertSame(GPath(Matrix(a=2,d=2,e=100,f=200),
+                              points=(0,0,30,0,30,30),linewidth=2),expected)
+
+    def testDamage(self):
+        """A shape only damages its own block"""
+        frame=Framebuffer()
+        frame.resetDamage()
+        frame.drawObject(GRectangle(Matrix(e=100,f=200),40,20))
+        self.assertEqual(frame.getDamage(),[(80,410,120,430)])
+
+    def testUnknown(self):
+        """Other objects cannot be drawn"""
+        self.assertRaises(AssertionError,Framebuffer().drawObject,Matrix())
+
+
+if __name__ == '__main__':
+    unittest.main()
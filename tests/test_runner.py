@@ -0,0 +1,74 @@
+"""Unit tests for runner.py"""
+import unittest
+import numpy as np
+import runner
+from simulation import Simulation
+
+
+class SweepResultsTest(unittest.TestCase):
+    """Tests for the summary of many games, SweepResults"""
+
+    def testEmpty(self):
+        """An empty summary has no games and means of 0"""
+        results=runner.SweepResults()
+        self.assertEqual(len(results),0)
+        self.assertEqual(results.getMeanScore(),0.0)
+        self.assertEqual(results.getMeanFrames(),0.0)
+        self.assertEqual(results.getWinRate(),0.0)
+
+    def testAdd(self):
+        """The summary keeps the games in order and averages them"""
+        results=runner.SweepResults()
+        results.add(7,100,0,500)
+        results.add(8,30,5,200)
+        results.add(9,50,0,800)
+        self.assertEqual(len(results),3)
+        self.assertEqual(results.getSeeds(),[7,8,9])
+        self.assertEqual(results.getScores().tolist(),[100,30,50])
+        self.assertEqual(results.getBricksLeft().tolist(),[0,5,0])
+        self.assertEqual(results.getFrames().tolist(),[500,200,800])
+        self.assertAlmostEqual(results.getMeanScore(),60.0)
+        self.assertAlmostEqual(results.getMeanFrames(),500.0)
+        self.assertAlmostEqual(results.getWinRate(),2/3.0)
+        self.assertEqual(str(results),
+                         '3 games: mean score 60.0, win rate 0.667, '
+                         'mean frames 500')
+
+
+class SweepTest(unittest.TestCase):
+    """Tests for playing games in worker processes, sweep and results"""
+
+    def testSameAsPlay(self):
+        """The workers play each seed as play does in this process"""
+        seeds=range(6)
+        sim=Simulation()
+        expected=[runner.play(sim,seed,limit=3000) for seed in seeds]
+        results=runner.sweep(seeds,processes=3,limit=3000,backlog=2)
+        self.assertEqual(len(results),len(seeds))
+        got=sorted(zip(results.getSeeds(),results.getScores().tolist(),
+                       results.getBricksLeft().tolist(),
+                       results.getFrames().tolist()))
+        self.assertEqual(got,expected)
+        self.assertAlmostEqual(results.getMeanScore(),
+                               np.mean([e[1] for e in expected]))
+
+    def testStill(self):
+        """A paddle that never moves plays by fast forward, with the same
+        result as stepping with action 0"""
+        sim=Simulation()
+        seed,score,bricks,frames=runner.play(sim,4,policy=None,limit=5000)
+        sim.reset(4)
+        sim.serveBall()
+        while not sim.isOver() and sim.getFrames()<5000:
+            sim.step(0)
+            if sim.ballLost():
+                sim.loseTry()
+                if not sim.isOver():
+                    sim.serveBall()
+        self.assertEqual((score,bricks,frames),
+                         (sim.getScore(),len(sim.getBricks()),
+                          sim.getFrames()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,379 @@
+"""Unit tests for simulation.py"""
+import unittest
+import numpy as np
+from constants import *
+import simulation
+from simulation import sweep_box, _sweep_one, substeps, _substeps_one
+
+
+class SweepBoxTest(unittest.TestCase):
+    """Tests for the swept box test, sweep_box"""
+
+    def testHit(self):
+        """A box moving into a rectangle hits the face it crosses first"""
+        t,nx,ny=sweep_box(0.0,0.0,10.0,0.0,1,1,5,-1,6,1)
+        self.assertAlmostEqual(t,0.4)
+        self.assertEqual((nx,ny),(-1,0))
+        t,nx,ny=sweep_box(0.0,0.0,0.0,-10.0,1,1,-2,-6,2,-5)
+        self.assertAlmostEqual(t,0.4)
+        self.assertEqual((nx,ny),(0,1))
+
+    def testMiss(self):
+        """A box that stops short, or moves away, does not hit"""
+        self.assertEqual(sweep_box(0.0,0.0,3.0,0.0,1,1,5,-1,6,1),
+                         (np.inf,0,0))
+        self.assertEqual(sweep_box(0.0,0.0,-10.0,0.0,1,1,5,-1,6,1),
+                         (np.inf,0,0))
+
+    def testGrazeEdge(self):
+        """A box sliding along the edge of a rectangle does not hit it"""
+        t,nx,ny=sweep_box(0.0,0.0,10.0,0.0,1,1,5,1,6,2)
+        self.assertEqual(t,np.inf)
+
+    def testGrazeCorner(self):
+        """A box whose path only touches the corner of a rectangle does not
+        hit it, while one that clips the corner does"""
+        # The grown rectangle has its top left corner on the path y = x
+        t,nx,ny=sweep_box(0.0,0.0,10.0,10.0,1,1,4,-5,6,2)
+        self.assertEqual(t,np.inf)
+        t,nx,ny=sweep_box(0.0,0.0,10.0,10.0,1,1,4,-5,6,2.5)
+        self.assertAlmostEqual(t,0.3)
+        self.assertEqual((nx,ny),(-1,0))
+
+    def testTunnel(self):
+        """A box that moves past a thin rectangle in one step still hits
+        it"""
+        t,nx,ny=sweep_box(0.0,0.0,0.0,100.0,1,1,-5,10,5,12)
+        self.assertAlmostEqual(t,0.09)
+        self.assertEqual((nx,ny),(0,-1))
+
+    def testOverlap(self):
+        """A box that already overlaps a rectangle hits it at time 0"""
+        t,nx,ny=sweep_box(0.0,0.0,0.0,1.0,1,1,-2,0.5,2,3)
+        self.assertEqual(t,0)
+
+    def testResting(self):
+        """A box resting against a rectangle hits it at time 0 if it moves
+        into it, and not at all if it moves away"""
+        t,nx,ny=sweep_box(0.0,4.0,0.0,-1.0,1,1,-2,0.5,2,3)
+        self.assertEqual(t,0)
+        self.assertEqual((nx,ny),(0,1))
+        t,nx,ny=sweep_box(0.0,4.0,0.0,1.0,1,1,-2,0.5,2,3)
+        self.assertEqual(t,np.inf)
+
+    def testStill(self):
+        """A box that does not move hits nothing"""
+        self.assertEqual(sweep_box(0.0,0.0,0.0,0.0,1,1,-2,-2,2,2)[0],np.inf)
+
+    def testArrays(self):
+        """sweep_box on arrays, and _sweep_one on floats, agree with
+        sweep_box on each box"""
+        rng=np.random.RandomState(1)
+        x,y,vx,vy=rng.uniform(-20,20,(4,500))
+        vx[::7]=0
+        vy[::11]=0
+        t,nx,ny=sweep_box(x,y,vx,vy,2,2,-3.0,-1.0,4.0,5.0)
+        for k in range(len(x)):
+            one=sweep_box(x[k],y[k],vx[k],vy[k],2,2,-3.0,-1.0,4.0,5.0)
+            self.assertEqual((t[k],nx[k],ny[k]),tuple(map(float,one)))
+            one=_sweep_one(float(x[k]),float(y[k]),float(vx[k]),float(vy[k]),
+                           2,2,-3.0,-1.0,4.0,5.0)
+            self.assertEqual((t[k],nx[k],ny[k]),one)
+
+    def testFastBall(self):
+        """A ball fast enough to pass through a brick in one tick hits the
+        lowest brick in its path"""
+        bricks=simulation.BrickField(BRICKS_IN_ROW,BRICK_ROWS,['red'])
+        left,bottom,right,top=bricks.getBox(len(bricks.getAlive())-1)
+        x=np.array([(left+right)/2.0])
+        y=np.array([bottom-50.0])
+        t,nx,ny,i=bricks.sweep(x,y,np.zeros(1),np.array([200.0]),2,2)
+        self.assertEqual(i[0],len(bricks.getAlive())-1)
+        self.assertEqual((nx[0],ny[0]),(0,-1))
+        self.assertAlmostEqual(y[0]+200*t[0],bottom-2)
+
+
+class SubstepsTest(unittest.TestCase):
+    """Tests for the number of sub-steps in a tick, substeps"""
+
+    def testSlow(self):
+        """A ball that cannot cover the gap moves in one step"""
+        self.assertEqual(substeps(5.0,5.0),1)
+        self.assertEqual(substeps(100.0,200.0),1)
+        self.assertEqual(substeps(0.0,0.0),1)
+
+    def testSplit(self):
+        """A ball that can cover the gap moves at most BALL_MAX_STEP in each
+        sub-step"""
+        self.assertEqual(substeps(BALL_MAX_STEP*3.0,0.0),3)
+        self.assertEqual(substeps(BALL_MAX_STEP*3.0+0.5,0.0),4)
+        self.assertEqual(substeps(1.0,0.5),1)
+        self.assertEqual(substeps(1.0,-3.0),1)
+
+    def testCap(self):
+        """A very fast ball never takes more than BALL_MAX_SUBSTEPS"""
+        self.assertEqual(substeps(BALL_MAX_STEP*BALL_MAX_SUBSTEPS+1.0,0.0),
+                         BALL_MAX_SUBSTEPS)
+        self.assertEqual(substeps(1e9,0.0),BALL_MAX_SUBSTEPS)
+
+    def testArrays(self):
+        """The array version gives the same answers as _substeps_one"""
+        speed,gap=np.meshgrid(np.linspace(0,150,31),np.linspace(-10,150,33))
+        n=substeps(speed,gap)
+        self.assertEqual(n.dtype.kind,'i')
+        for k in range(speed.size):
+            self.assertEqual(n.flat[k],
+                             _substeps_one(float(speed.flat[k]),
+                                           float(gap.flat[k])))
+
+    def testFastBall(self):
+        """A ball moving more than a brick's height in a tick takes the lowest
+        brick in its path and bounces back down"""
+        sim=simulation.Simulation(seed=1)
+        bricks=sim.getBricks()
+        lowest=len(bricks.getAlive())-1
+        left,bottom,right,top=bricks.getBox(lowest)
+        balls=sim.getBalls()
+        balls.serve((left+right)/2.0,bottom-BALL_DIAMETER)
+        balls.getVelocities()[:]=(0.0,60.0)
+        sim.step(0)
+        self.assertGreater(balls.getSubsteps(),1)
+        self.assertFalse(bricks.getAlive()[lowest])
+        self.assertEqual(len(bricks),len(bricks.getAlive())-1)
+        self.assertLess(balls.getVelocities()[0,1],0)
+        self.assertLess(balls.getPositions()[0,1],bottom)
+
+
+class StateHashTest(unittest.TestCase):
+    """Tests for Simulation.getStateHash and fixed-point mode"""
+
+    def play(self,seed,fixed,ticks=2000):
+        """Returns: a Simulation after ticks ticks of a game with the given
+        seed, played with a fixed sequence of actions"""
+        sim=simulation.Simulation(seed=seed,fixed=fixed)
+        sim.serveBall()
+        rng=np.random.RandomState(11)
+        for action in rng.randint(-1,2,ticks).tolist():
+            if sim.isOver():
+                break
+            sim.step(action)
+            if sim.ballLost():
+                sim.loseTry()
+                if not sim.isOver():
+                    sim.serveBall()
+        return sim
+
+    def testSame(self):
+        """The same seed and actions give the same hash"""
+        for fixed in [False,True]:
+            a=self.play(4,fixed)
+            b=self.play(4,fixed)
+            self.assertEqual(a.getStateHash(),b.getStateHash())
+            self.assertEqual(len(a.getStateHash()),40)
+
+    def testDifferent(self):
+        """Different seeds, or one more tick, give a different hash"""
+        a=self.play(4,True)
+        self.assertNotEqual(a.getStateHash(),self.play(5,True).getStateHash())
+        before=a.getStateHash()
+        a.step(0)
+        self.assertNotEqual(a.getStateHash(),before)
+
+    def testGrid(self):
+        """In fixed-point mode, the balls stay on the 1/FIXED_POINT_SCALE
+        grid"""
+        sim=simulation.Simulation(seed=8,fixed=True)
+        self.assertTrue(sim.isFixed())
+        sim.serveBall()
+        for tick in range(1000):
+            sim.step(tick%3-1)
+            if sim.ballLost():
+                break
+            for coords in [sim.getBalls().getPositions(),
+                           sim.getBalls().getVelocities()]:
+                scaled=coords*FIXED_POINT_SCALE
+                self.assertTrue(np.array_equal(scaled,np.round(scaled)))
+
+
+class BallPairsTest(unittest.TestCase):
+    """Tests for the broad phase SweepAndPrune and the bounces between
+    balls"""
+
+    def testPairs(self):
+        """The pairs are the boxes that overlap, each once, in sorted order,
+        and stay right as the boxes move"""
+        rng=np.random.RandomState(2)
+        bodies=simulation.SweepAndPrune()
+        x=rng.uniform(0,400,200)
+        y=rng.uniform(0,400,200)
+        for tick in range(3):
+            bodies.update(x-10,y-10,x+10,y+10)
+            a,b=bodies.pairs()
+            i,j=np.triu_indices(len(x),1)
+            near=(abs(x[i]-x[j])<=20)&(abs(y[i]-y[j])<=20)
+            self.assertEqual(list(zip(a,b)),list(zip(i[near],j[near])))
+            x=x+rng.uniform(-3,3,200)
+            y=y+rng.uniform(-3,3,200)
+
+    def testHeadOn(self):
+        """Two balls meeting head on swap their velocities"""
+        balls=simulation.BallSet()
+        balls.serve(100.0,100.0,2)
+        balls.getPositions()[1]=(120.0,100.0)
+        balls.getVelocities()[:]=[(3.0,1.0),(-2.0,-1.0)]
+        self.assertTrue(balls.touching(np.array([0]),np.array([1]))[0])
+        self.assertEqual(balls.collide(np.array([0]),np.array([1])),1)
+        self.assertEqual(balls.getVelocities().tolist(),
+                         [[-2.0,1.0],[3.0,-1.0]])
+
+    def testApart(self):
+        """Two touching balls that move apart keep their velocities"""
+        balls=simulation.BallSet()
+        balls.serve(100.0,100.0,2)
+        balls.getPositions()[1]=(120.0,100.0)
+        balls.getVelocities()[:]=[(-3.0,1.0),(2.0,-1.0)]
+        self.assertEqual(balls.collide(np.array([0]),np.array([1])),0)
+        self.assertEqual(balls.getVelocities().tolist(),
+                         [[-3.0,1.0],[2.0,-1.0]])
+
+    def testSimulation(self):
+        """Two balls served at once in a Simulation bounce off each other
+        when they meet"""
+        sim=simulation.Simulation(seed=1)
+        sim.serveBall()
+        sim.serveBall()
+        balls=sim.getBalls()
+        balls.getPositions()[:]=[(100.0,300.0),(140.0,300.0)]
+        balls.getVelocities()[:]=[(5.0,0.0),(-5.0,0.0)]
+        sim.step(0)
+        sim.step(0)
+        self.assertEqual(balls.getVelocities().tolist(),
+                         [[-5.0,0.0],[5.0,0.0]])
+
+
+class FastForwardTest(unittest.TestCase):
+    """Tests for Simulation.fastForward against stepping every tick"""
+
+    def play(self,seed,fixed,fast,frames=5000):
+        """Returns: (hash,frames,steps) after an end game of a few bricks
+        and a wide paddle, played by fastForward if fast or by step if not.
+
+        steps is the number of calls to step."""
+        sim=simulation.Simulation(seed=seed,fixed=fixed)
+        sim.getPaddle().width=GAME_WIDTH-10
+        bricks=sim.getBricks()
+        bricks.remove(np.flatnonzero(bricks.getAlive())[3:])
+        sim.serveBall()
+        steps=[0]
+        step=sim.step
+        def counted(action=0):
+            steps[0]=steps[0]+1
+            return step(action)
+        sim.step=counted
+        while not sim.isOver() and sim.getFrames()<frames:
+            if fast:
+                sim.fastForward(frames-sim.getFrames())
+            else:
+                sim.step(0)
+            if sim.ballLost():
+                sim.loseTry()
+                if not sim.isOver():
+                    sim.serveBall()
+        return sim.getStateHash(),sim.getFrames(),steps[0]
+
+    def testSameState(self):
+        """fastForward ends in the same state as stepping, in fixed-point
+        mode or not, with far fewer steps"""
+        for seed in [1,3,5]:
+            for fixed in [False,True]:
+                slow=self.play(seed,fixed,False)
+                fast=self.play(seed,fixed,True)
+                self.assertEqual(fast[:2],slow[:2])
+                self.assertLess(fast[2]*4,slow[2])
+
+    def testStops(self):
+        """fastForward stops when the ball is lost, and does nothing with no
+        ball in play"""
+        sim=simulation.Simulation(seed=7)
+        self.assertEqual(sim.fastForward(100),0)
+        sim.serveBall()
+        done=sim.fastForward(10000)
+        self.assertTrue(sim.ballLost())
+        self.assertEqual(done,sim.getFrames())
+        self.assertLess(done,10000)
+
+
+class BatchPlayTest(unittest.TestCase):
+    """Tests for BatchPlay against Simulation"""
+
+    def testSameGames(self):
+        """Each game of a BatchPlay plays the same game as a Simulation with
+        the same seed and the same actions, until it ends"""
+        self.compare()
+
+    def testManyBalls(self):
+        """The games are still the same with several balls per serve, which
+        bounce off each other"""
+        serve=simulation.BALLS_PER_SERVE
+        simulation.BALLS_PER_SERVE=3
+        try:
+            self.compare()
+        finally:
+            simulation.BALLS_PER_SERVE=serve
+
+    def compare(self):
+        """Plays BatchPlay and Simulation games side by side, and checks
+        that they stay the same"""
+        seeds=[3,17,42,99]
+        batch=simulation.BatchPlay(len(seeds),seeds=seeds)
+        sims=[simulation.Simulation(seed=seed) for seed in seeds]
+        for sim in sims:
+            sim.serveBall()
+        rng=np.random.RandomState(5)
+        playing=np.ones(len(seeds),dtype=bool)
+        for tick in range(3000):
+            actions=rng.randint(-1,2,len(seeds))
+            batch.step(actions)
+            for k,sim in enumerate(sims):
+                if not playing[k]:
+                    continue
+                sim.step(int(actions[k]))
+                if sim.ballLost():
+                    sim.loseTry()
+                    if not sim.isOver():
+                        sim.serveBall()
+                if sim.isOver():
+                    self.assertTrue(batch.getDone()[k])
+                    self.assertEqual(batch.getFinalScores()[k],sim.getScore())
+                    playing[k]=False
+                    continue
+                self.assertFalse(batch.getDone()[k])
+                self.assertEqual(batch.getPaddles()[k],sim.getPaddle().x)
+                self.assertEqual(batch.getScores()[k],sim.getScore())
+                self.assertEqual(batch.getTries()[k],sim.getTries())
+                self.assertTrue(np.array_equal(batch.getAlive()[k],
+                                               sim.getBricks().getAlive()))
+                live=batch.getBallsInPlay()[k]
+                pos=batch.getBallPositions()[k][live]
+                vel=batch.getBallVelocities()[k][live]
+                self.assertTrue(np.array_equal(pos,
+                                               sim.getBalls().getPositions()))
+                self.assertTrue(np.array_equal(vel,
+                                               sim.getBalls().getVelocities()))
+        self.assertGreater(sum(sim.getScore() for sim in sims),0)
+
+    def testRestart(self):
+        """A game that ends is reset in place, keeping its final score"""
+        batch=simulation.BatchPlay(2,tries=1,seeds=[1,2])
+        while not batch.getDone().any():
+            batch.step(np.zeros(2,dtype=int))
+        k=int(np.flatnonzero(batch.getDone())[0])
+        self.assertEqual(batch.getEpisodes()[k],1)
+        self.assertEqual(batch.getScores()[k],0)
+        self.assertEqual(batch.getTries()[k],1)
+        self.assertEqual(batch.getBricksLeft()[k],BRICKS_IN_ROW*BRICK_ROWS)
+        self.assertTrue(batch.getBallsInPlay()[k].all())
+
+
+if __name__ == '__main__':
+    unittest.main()